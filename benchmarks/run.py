@@ -0,0 +1,245 @@
+"""Frame-time benchmarks with seeded, reproducible scenarios.
+
+Run from the repository root:
+
+    python -m benchmarks.run                       # all scenarios, compare to baseline
+    python -m benchmarks.run --only casino_room    # a single scenario
+    python -m benchmarks.run --save-baseline       # record a new baseline
+
+Scenarios run through SDL's dummy video driver, so no window is opened.
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import pygame
+from game.constants import *
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Slower than baseline by more than this fraction counts as a regression
+REGRESSION_THRESHOLD = 0.20
+
+def percentiles(samples):
+    """p50/p95/p99 of a list of durations in seconds, reported in milliseconds"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    def pick(p):
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 4)
+    return {'p50': pick(50), 'p95': pick(95), 'p99': pick(99), 'samples': len(ordered)}
+
+def time_frames(frames, update, draw=None):
+    """Call update (and draw) once per frame, timing each separately"""
+    update_times = []
+    draw_times = []
+    clock = time.perf_counter
+    for _ in range(frames):
+        start = clock()
+        update()
+        update_times.append(clock() - start)
+        if draw is not None:
+            start = clock()
+            draw()
+            draw_times.append(clock() - start)
+    return update_times, draw_times
+
+def build_room(theme, connections=('north', 'south', 'east', 'west')):
+    """An empty, initialized room of the given theme with the given exits"""
+    from game.room import Room
+    room = Room(1)
+    room.theme = theme
+    room.has_fake_exit = False
+    for i, direction in enumerate(connections):
+        room.add_connection(direction, i + 2)
+    room.initialized = True
+    return room
+
+def bench_maze(num_rooms, repeats):
+    def scenario(seed):
+        from game.maze import Maze
+        random.seed(seed)
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            Maze(num_rooms)
+            samples.append(time.perf_counter() - start)
+        return samples, []
+    return scenario
+
+def bench_casino_room(seed, frames=600):
+    """Casino room with 6 slot machines and 10 wandering obstacles"""
+    from game.obstacle import Obstacle
+    from game.geometry import Rect
+    random.seed(seed)
+    room = build_room('casino')
+    for i in range(6):
+        room.static_obstacles.append({
+            'type': 'slot_machine',
+            'x': 170 + (i % 3) * 190,
+            'y': 150 + (i // 3) * 220,
+            'width': 40,
+            'height': 50
+        })
+    room.invalidate_background()
+    types = list(Obstacle.COLORS)
+    for i in range(10):
+        obstacle = Obstacle(150 + (i % 5) * 110, 200 + (i // 5) * 150, types[i % len(types)])
+        obstacle.room = room
+        room.obstacles.append(obstacle)
+
+    screen = pygame.display.get_surface()
+    player_rect = Rect(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, PLAYER_SIZE, PLAYER_SIZE)
+    def update():
+        room.update(player_rect)
+        room.check_collisions(player_rect)
+        room.check_static_collision(player_rect)
+    return time_frames(frames, update, lambda: room.draw(screen))
+
+def bench_expo_room(seed, frames=600):
+    """Expo room with 4 NPCs, all showing dialogue"""
+    from game.maze import Maze
+    from game.npc import NPC
+    from game.geometry import Rect
+    random.seed(seed)
+    maze = Maze(30)
+    room = build_room('expo')
+    room.id = maze.start_room_id
+    for i in range(4):
+        npc = NPC(180 + i * 140, 250 + (i % 2) * 120, room.id, maze)
+        room.npcs.append(npc)
+
+    screen = pygame.display.get_surface()
+    player_rect = Rect(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, PLAYER_SIZE, PLAYER_SIZE)
+    def update():
+        for npc in room.npcs:
+            npc.interact()
+        room.update(player_rect)
+        room.check_npc_interaction(player_rect)
+    return time_frames(frames, update, lambda: room.draw(screen))
+
+def bench_particle_burst(seed, frames=300):
+    """Full game frames with a collision burst every half second"""
+    from game.game import Game
+    random.seed(seed)
+    game = Game(seed=seed)
+    game.sim.invincibility_frames = frames * 2  # Keep obstacles from resetting the player
+    frame = [0]
+    def update():
+        if frame[0] % 30 == 0:
+            game.on_collision()
+        frame[0] += 1
+        game.sim.begin_frame()
+        game.update()
+    return time_frames(frames, update, game.draw)
+
+def bench_win_screen(seed, frames=300):
+    """The celebration screen with its continuous particles"""
+    from game.game import Game
+    random.seed(seed)
+    game = Game(seed=seed)
+    game.sim.won = True
+    return time_frames(frames, game.update, game.draw)
+
+SCENARIOS = {
+    'maze_30': bench_maze(30, 200),
+    'maze_10k': bench_maze(10_000, 5),
+    'maze_1m': bench_maze(1_000_000, 1),
+    'casino_room': bench_casino_room,
+    'expo_room': bench_expo_room,
+    'particle_burst': bench_particle_burst,
+    'win_screen': bench_win_screen,
+}
+
+def run_scenarios(names, seed):
+    results = {}
+    for name in names:
+        print(f"  {name}...", file=sys.stderr, flush=True)
+        update_times, draw_times = SCENARIOS[name](seed)
+        results[name] = {'update': percentiles(update_times), 'draw': percentiles(draw_times)}
+    return results
+
+def compare(results, baseline):
+    """Per-scenario p50/p95/p99 ratios against the baseline (>1 means slower)"""
+    comparison = {}
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        entry = {}
+        for phase in ('update', 'draw'):
+            if not result.get(phase) or not base.get(phase):
+                continue
+            ratios = {}
+            for p in ('p50', 'p95', 'p99'):
+                if base[phase][p] > 0:
+                    ratios[p] = round(result[phase][p] / base[phase][p], 3)
+            entry[phase] = ratios
+            if ratios.get('p50', 0) > 1 + REGRESSION_THRESHOLD:
+                regressions.append(f"{name}.{phase}")
+        comparison[name] = entry
+    return comparison, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the frame-time benchmark suite")
+    parser.add_argument('--only', nargs='+', choices=sorted(SCENARIOS), help="scenarios to run")
+    parser.add_argument('--skip', nargs='+', default=[], choices=sorted(SCENARIOS), help="scenarios to leave out")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help=f"exit 1 if any p50 is more than {REGRESSION_THRESHOLD:.0%}% slower than baseline")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    names = [name for name in (args.only or SCENARIOS) if name not in args.skip]
+    results = run_scenarios(names, args.seed)
+    report = {
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'scenarios': results
+    }
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['baseline'], regressions = compare(results, baseline)
+        report['regressions'] = regressions
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    if args.save_baseline:
+        # Merge so a partial run only replaces the scenarios it measured
+        baseline = {'scenarios': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update({k: v for k, v in report.items() if k != 'scenarios'})
+        baseline['scenarios'].update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+
+    pygame.quit()
+    return 1 if args.fail_on_regression and regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+import pygame
+
+# Image assets live in the project directory next to the game package
+ASSET_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class AssetManager:
+    """Loads each image asset once and hands out display-format, scaled copies.
+
+    Files are resolved against ASSET_DIR, so the game runs from any working
+    directory. Decoded images are kept as loaded; get() converts them to
+    the display pixel format (keeping alpha) and caches one copy per size,
+    so every blit takes the same-format fast path and restarts reuse the
+    surfaces. preload() can decode in a background thread while the rest
+    of startup runs; get() waits for it if it has not finished yet.
+    """
+
+    def __init__(self, asset_dir=ASSET_DIR):
+        self.asset_dir = asset_dir
+        self.images = {}  # name: Surface as decoded
+        self.variants = {}  # (name, size): Surface in display format, scaled to size
+        self.errors = {}  # name: exception raised while loading
+        self.lock = threading.Lock()
+        self.loader = None
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.load_seconds = {}  # name: time spent decoding
+
+    def get_path(self, name):
+        return os.path.join(self.asset_dir, name)
+
+    def load(self, name):
+        """Decode an image once; raises FileNotFoundError or pygame.error if it cannot be loaded"""
+        with self.lock:
+            image = self.images.get(name)
+            if image is not None:
+                return image
+            if name in self.errors:
+                raise self.errors[name]
+            start = time.perf_counter()
+            try:
+                image = pygame.image.load(self.get_path(name))
+            except (FileNotFoundError, pygame.error) as error:
+                self.errors[name] = error
+                raise
+            self.load_seconds[name] = time.perf_counter() - start
+            self.images[name] = image
+            return image
+
+    def preload(self, names, background=True):
+        """Decode images ahead of use, on a daemon thread if background is set"""
+        def load_all():
+            for name in names:
+                try:
+                    self.load(name)
+                except (FileNotFoundError, pygame.error):
+                    pass  # Reported again by get()
+
+        if background:
+            self.loader = threading.Thread(target=load_all, name='asset-loader', daemon=True)
+            self.loader.start()
+        else:
+            load_all()
+
+    def get(self, name, size=None):
+        """The image in the display format, scaled to size (width, height) if given"""
+        key = (name, size)
+        variant = self.variants.get(key)
+        if variant is not None:
+            self.hits += 1
+            return variant
+
+        self.misses += 1
+        if self.loader is not None:
+            self.loader.join()
+            self.loader = None
+        variant = self.load(name)
+        if size is not None and variant.get_size() != tuple(size):
+            variant = pygame.transform.scale(variant, size)
+
+        # Only cache display-format copies; before the display exists the format is unknown
+        if pygame.display.get_surface() is not None:
+            variant = variant.convert_alpha()
+            self.variants[key] = variant
+        return variant
+
+    def clear(self):
+        """Drop converted and scaled copies (decoded images are kept)"""
+        self.variants.clear()
+
+    def get_stats(self):
+        return {
+            'images': len(self.images),
+            'variants': len(self.variants),
+            'hits': self.hits,
+            'misses': self.misses,
+            'load_ms': {name: round(seconds * 1000, 2) for name, seconds in self.load_seconds.items()},
+            'failed': sorted(self.errors)
+        }
+
+# Shared manager used by the player and anything else drawing image files
+assets = AssetManager()
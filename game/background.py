@@ -0,0 +1,52 @@
+import pygame
+from collections import OrderedDict
+from game.constants import *
+
+class BackgroundCache:
+    """Shared LRU of pre-rendered room backgrounds.
+
+    Rooms describe their static layout with a hashable key, so rooms that
+    share a theme, exit set and fixtures also share one surface.
+    """
+
+    def __init__(self, max_backgrounds=32):
+        self.max_backgrounds = max_backgrounds
+        self.backgrounds = OrderedDict()  # layout key: Surface
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """Return the background for key, calling render(surface) to build it on a miss"""
+        background = self.backgrounds.get(key)
+        if background is not None:
+            self.backgrounds.move_to_end(key)
+            self.hits += 1
+            return background
+
+        self.misses += 1
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        render(background)
+
+        # Match the display pixel format so the per-frame blit is a straight copy
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+
+        self.backgrounds[key] = background
+        if len(self.backgrounds) > self.max_backgrounds:
+            self.backgrounds.popitem(last=False)
+        return background
+
+    def clear(self):
+        self.backgrounds.clear()
+
+    def get_stats(self):
+        return {
+            'backgrounds': len(self.backgrounds),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+# Shared cache used by every room
+background_cache = BackgroundCache()
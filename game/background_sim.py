@@ -0,0 +1,178 @@
+import random
+import time
+from collections import deque
+from game.constants import *
+
+OPPOSITE_DIRECTION = {'north': 'south', 'south': 'north', 'east': 'west', 'west': 'east'}
+
+class BackgroundSimulation:
+    """Keeps rooms the player is not in alive, within a fixed CPU budget per frame.
+
+    Only rooms whose contents are live in the room cache are simulated.
+    Rooms within near_radius exits of the player run the whole crowd with a
+    coarse step every near_interval ticks. Farther rooms only move their
+    through-traffic, every far_interval ticks. Each update covers all the
+    ticks since the room last ran (up to max_ticks), so a room that had to
+    wait simply takes a bigger step.
+
+    Rooms are updated most overdue first. budget_us is shared by every
+    tick of a frame: begin_frame refills it, and each tick spends from what
+    the earlier ones left. The scheduler keeps a running estimate of what
+    each room costs, hand-offs included (default_cost_us for a room that
+    has not run yet), and skips any room that would not fit in what is
+    left. Nothing with an unbounded cost runs inside the budget: flow
+    fields a room is missing are queued in navigation_cache for the
+    prefetcher to build in idle time, and its through-traffic walks
+    straight at the exit meanwhile. A frame still overruns by however much
+    its last room took beyond its estimate (a spawn, a walker handed in
+    since it was measured, the machine stalling), which in practice stays
+    within one room update. Through-traffic that reaches an exit is handed
+    off to the room behind it, if that room is live.
+
+    Spawns and hand-offs draw from rng (the simulation's random stream).
+
+    With deterministic set, the budget is max_updates room updates per tick
+    instead of measured time, so what happens in other rooms (and what
+    walks in from them) depends only on the ticks, as replays require.
+    Flow fields are then built when needed, since whether one is already
+    cached depends on whatever else ran in the process.
+    """
+
+    def __init__(self, budget_us=BACKGROUND_BUDGET_US, near_radius=BACKGROUND_NEAR_RADIUS,
+                 near_interval=BACKGROUND_NEAR_INTERVAL, far_interval=BACKGROUND_FAR_INTERVAL,
+                 max_ticks=BACKGROUND_MAX_TICKS, deterministic=False, max_updates=BACKGROUND_MAX_UPDATES,
+                 default_cost_us=BACKGROUND_DEFAULT_COST_US, rng=random):
+        self.rng = rng
+        self.budget = budget_us / 1_000_000
+        self.remaining = self.budget  # Left of this frame's budget
+        self.default_cost = default_cost_us / 1_000_000
+        self.deterministic = deterministic
+        self.max_updates = max_updates
+        self.near_radius = near_radius
+        self.near_interval = near_interval
+        self.far_interval = far_interval
+        self.max_ticks = max_ticks
+
+        self.ticks = 0
+        self.last_update = {}  # room_id: tick the room was last simulated
+        self.costs = {}  # room_id: estimated seconds per update (decaying maximum)
+        self.distances = {}  # room_id: exits from the focus room, up to near_radius
+        self.focus_room_id = None
+
+        # Statistics
+        self.near_updates = 0
+        self.far_updates = 0
+        self.deferred = 0
+        self.handoffs = 0
+        self.dropped = 0
+        self.frame_seconds = 0.0  # Spent so far this frame
+        self.last_frame_us = 0.0
+        self.max_frame_us = 0.0
+
+    def get_distances(self, maze, room_id):
+        """Exits from room_id to every room within near_radius (BFS, cached per room)"""
+        if room_id != self.focus_room_id:
+            distances = {room_id: 0}
+            queue = deque([room_id])
+            while queue:
+                current = queue.popleft()
+                if distances[current] >= self.near_radius:
+                    continue
+                for neighbor_id in maze.get_connections(current).values():
+                    if neighbor_id not in distances:
+                        distances[neighbor_id] = distances[current] + 1
+                        queue.append(neighbor_id)
+            self.distances = distances
+            self.focus_room_id = room_id
+        return self.distances
+
+    def begin_frame(self):
+        """Refill the budget for a new frame, recording what the last one spent"""
+        self.last_frame_us = self.frame_seconds * 1_000_000
+        self.max_frame_us = max(self.max_frame_us, self.last_frame_us)
+        self.frame_seconds = 0.0
+        self.remaining = self.budget
+
+    def tick(self, maze, room_cache, current_room_id, departed=()):
+        """Spend up to what is left of the frame's budget advancing other live rooms.
+
+        departed are the walkers that left the player's room this tick; they
+        are handed off first, inside the budget.
+        """
+        start = time.perf_counter()
+        if departed:
+            self.hand_off(maze.get_room(current_room_id), departed, room_cache)
+        self.ticks += 1
+        distances = self.get_distances(maze, current_room_id)
+        self.last_update[current_room_id] = self.ticks
+
+        # Rooms that are due, most overdue (relative to their interval) first
+        due = []
+        for room_id, room in room_cache.rooms.items():
+            # Skip the player's room, and rooms a streaming maze has already dropped
+            if room_id == current_room_id or maze.live_rooms.get(room_id) is not room:
+                continue
+            near = room_id in distances
+            interval = self.near_interval if near else self.far_interval
+            waited = self.ticks - self.last_update.setdefault(room_id, self.ticks)
+            if waited >= interval:
+                due.append((waited / interval, room_id, room, near))
+        due.sort(reverse=True)
+
+        deadline = start + self.remaining
+        updates = 0
+        for _, room_id, room, near in due:
+            now = time.perf_counter()
+            estimate = self.costs.get(room_id, self.default_cost)
+            if self.deterministic:
+                if updates >= self.max_updates:
+                    self.deferred += 1
+                    continue
+                updates += 1
+            elif now + estimate > deadline:
+                # An estimate above the whole budget never fits; bring it down until the room
+                # can run first thing in a frame, so one slow outlier cannot starve it for good
+                if estimate > self.budget * 0.9:
+                    self.costs[room_id] = max(estimate * 0.9, self.budget * 0.9)
+                self.deferred += 1
+                continue
+            ticks = min(self.ticks - self.last_update[room_id], self.max_ticks)
+            departed = room.update_background(ticks, detailed=near, rng=self.rng, build_fields=self.deterministic)
+            self.last_update[room_id] = self.ticks
+            if near:
+                self.near_updates += 1
+            else:
+                self.far_updates += 1
+            self.hand_off(room, departed, room_cache)
+
+            # Decaying maximum of this room's cost (hand-off included): quick to rise, slow to trust a cheap run
+            self.costs[room_id] = max(time.perf_counter() - now, estimate * 0.9)
+
+        # Forget rooms that left the cache
+        if len(self.last_update) > 2 * len(room_cache.rooms):
+            self.last_update = {room_id: tick for room_id, tick in self.last_update.items() if room_id in room_cache.rooms}
+            self.costs = {room_id: cost for room_id, cost in self.costs.items() if room_id in room_cache.rooms}
+
+        spent = time.perf_counter() - start
+        self.frame_seconds += spent
+        self.remaining = max(self.remaining - spent, 0.0)
+
+    def hand_off(self, room, departed, room_cache):
+        """Move walkers that left room into the live room behind their exit"""
+        for obstacle in departed:
+            neighbor = room_cache.rooms.get(room.connections.get(obstacle.exit_direction))
+            if neighbor is not None and neighbor.accept_walker(obstacle, OPPOSITE_DIRECTION[obstacle.exit_direction], self.rng):
+                self.handoffs += 1
+            else:
+                self.dropped += 1
+
+    def get_stats(self):
+        return {
+            'near_updates': self.near_updates,
+            'far_updates': self.far_updates,
+            'deferred': self.deferred,
+            'handoffs': self.handoffs,
+            'dropped': self.dropped,
+            'last_frame_us': round(self.last_frame_us, 1),
+            'max_frame_us': round(self.max_frame_us, 1)
+        }
@@ -0,0 +1,257 @@
+"""Monte Carlo balance runs: scripted bots playing many seeded mazes.
+
+Every combination of the swept settings is played by every strategy on
+every seed, one simulation per run, sharded over a process pool with one
+worker per core. Runs are deterministic (seed, settings and strategy fix
+the whole game), so any run can be reproduced alone. Results stream back
+as runs finish: each one can be appended to a JSON lines file, progress
+is printed as it goes, and Ctrl+C stops the sweep and still reports what
+finished.
+
+    python -m game.batch --seeds 200 --lying-rate 0.2,0.4,0.6 --lives 3,5
+    python -m game.batch --seeds 1000 --obstacles 0.5,1,1.5 --out runs.jsonl --report report.json
+
+Settings: --lying-rate (NPC.LYING_RATE), --loop-chance (Maze loop_chance),
+--lives (Simulation max_lives) and --obstacles (a scale applied to
+Room.OBSTACLE_COUNTS).
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import signal
+import sys
+import time
+from game.constants import *
+from game.npc import NPC
+from game.room import Room
+from game.simulation import Simulation
+from game.bots import STRATEGIES
+
+# Settings a job sweeps over, in report order
+SETTINGS = ('lying_rate', 'loop_chance', 'lives', 'obstacles')
+
+def scale_obstacle_counts(scale):
+    """ROOM_OBSTACLE_COUNTS with both ends of every range multiplied by scale"""
+    return {theme: (round(low * scale), round(high * scale)) for theme, (low, high) in ROOM_OBSTACLE_COUNTS.items()}
+
+def play(job):
+    """Play one run to a win, a game over or max_ticks. Runs in a worker process.
+
+    The swept NPC and Room class settings are put back afterwards, so
+    nothing leaks into the next run in the same process.
+    """
+    lying_rate = NPC.LYING_RATE
+    obstacle_counts = Room.OBSTACLE_COUNTS
+    NPC.LYING_RATE = job['lying_rate']
+    Room.OBSTACLE_COUNTS = scale_obstacle_counts(job['obstacles'])
+    try:
+        return play_run(job)
+    finally:
+        NPC.LYING_RATE = lying_rate
+        Room.OBSTACLE_COUNTS = obstacle_counts
+
+def play_run(job):
+    start_time = time.perf_counter()
+    sim = Simulation(job['rooms'], max_lives=job['lives'], seed=job['seed'], deterministic=True,
+                     loop_chance=job['loop_chance'])
+    bot = STRATEGIES[job['strategy']](job['seed'])
+    goal_distance = sim.maze.distance_to_goal(sim.maze.start_room_id)
+
+    # A game over starts a new game, so progress is read before the tick that ends the run
+    outcome = 'timeout'
+    collisions = 0
+    rooms_explored = len(sim.rooms_visited)
+    while sim.ticks < job['max_ticks']:
+        events = sim.tick(bot(sim))
+        collisions += events.count('collision')
+        if 'game_over' in events:
+            outcome = 'game_over'
+            break
+        rooms_explored = len(sim.rooms_visited)
+        if sim.won:
+            outcome = 'won'
+            break
+
+    return dict(job, outcome=outcome, ticks=sim.ticks, rooms_explored=rooms_explored, collisions=collisions,
+                goal_distance=goal_distance, seconds=round(time.perf_counter() - start_time, 4))
+
+def init_worker():
+    # Ctrl+C is handled once, by the parent stopping the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def iter_jobs(strategies, seeds, sweep, rooms, max_ticks):
+    """One job per seed, setting combination and strategy.
+
+    Seeds vary slowest, so a sweep stopped early has about as many runs
+    in every group.
+    """
+    for seed in seeds:
+        for values in itertools.product(*(sweep[name] for name in SETTINGS)):
+            for strategy in strategies:
+                job = {'strategy': strategy, 'seed': seed, 'rooms': rooms, 'max_ticks': max_ticks}
+                job.update(zip(SETTINGS, values))
+                yield job
+
+class BatchReport:
+    """Running totals of finished runs, grouped by strategy and settings"""
+
+    def __init__(self):
+        self.groups = {}  # (strategy, *settings): totals
+        self.runs = 0
+        self.start_time = time.perf_counter()
+
+    def add(self, result):
+        key = (result['strategy'],) + tuple(result[name] for name in SETTINGS)
+        totals = self.groups.get(key)
+        if totals is None:
+            totals = self.groups[key] = {'runs': 0, 'won': 0, 'game_over': 0, 'timeout': 0, 'rooms_explored': 0,
+                                         'collisions': 0, 'ticks': 0, 'win_ticks': []}
+        totals['runs'] += 1
+        totals[result['outcome']] += 1
+        totals['rooms_explored'] += result['rooms_explored']
+        totals['collisions'] += result['collisions']
+        totals['ticks'] += result['ticks']
+        if result['outcome'] == 'won':
+            totals['win_ticks'].append(result['ticks'])
+        self.runs += 1
+
+    def get_report(self):
+        seconds = time.perf_counter() - self.start_time
+        groups = []
+        for key in sorted(self.groups):
+            totals = self.groups[key]
+            runs = totals['runs']
+            win_ticks = sorted(totals['win_ticks'])
+            group = {'strategy': key[0]}
+            group.update(zip(SETTINGS, key[1:]))
+            group.update({
+                'runs': runs,
+                'win_rate': round(totals['won'] / runs, 4),
+                'game_over_rate': round(totals['game_over'] / runs, 4),
+                'timeout_rate': round(totals['timeout'] / runs, 4),
+                'rooms_explored': round(totals['rooms_explored'] / runs, 2),
+                'collisions': round(totals['collisions'] / runs, 2),
+                # Seconds of play at TICK_RATE, over won runs only
+                'time_to_goal': round(sum(win_ticks) / len(win_ticks) / TICK_RATE, 2) if win_ticks else None,
+                'time_to_goal_p50': round(win_ticks[len(win_ticks) // 2] / TICK_RATE, 2) if win_ticks else None
+            })
+            groups.append(group)
+        return {
+            'runs': self.runs,
+            'seconds': round(seconds, 2),
+            'runs_per_second': round(self.runs / max(seconds, 1e-9), 2),
+            'ticks_per_second': round(sum(totals['ticks'] for totals in self.groups.values()) / max(seconds, 1e-9)),
+            'groups': groups
+        }
+
+def run_batch(jobs, workers=None, out=None, progress=None):
+    """Play jobs on a pool of workers, streaming results as they finish.
+
+    out is a file each result is written to as a JSON line; progress is
+    called with the report after every finished run. Jobs go out one at a
+    time (a run takes far longer than the round trip), so results arrive
+    as soon as each run ends. Returns (report,
+    whether every job finished); on Ctrl+C the pool is stopped and the
+    report covers the runs that finished.
+    """
+    workers = workers or os.cpu_count() or 1
+    report = BatchReport()
+    finished = True
+    pool = multiprocessing.Pool(workers, init_worker) if workers > 1 else None
+    results = pool.imap_unordered(play, jobs) if pool is not None else map(play, jobs)
+    try:
+        for result in results:
+            report.add(result)
+            if out is not None:
+                out.write(json.dumps(result) + '\n')
+                out.flush()
+            if progress is not None:
+                progress(report)
+    except KeyboardInterrupt:
+        finished = False
+        if pool is not None:
+            pool.terminate()
+    else:
+        if pool is not None:
+            pool.close()
+    if pool is not None:
+        pool.join()
+    return report, finished
+
+def parse_list(kind):
+    def parse(text):
+        return [kind(value) for value in text.split(',')]
+    return parse
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many seeded mazes with scripted bots and report balance statistics")
+    parser.add_argument('--strategies', type=parse_list(str), default=list(STRATEGIES),
+                        help="comma-separated bots (%(default)s)")
+    parser.add_argument('--seeds', type=int, default=100, help="mazes per setting combination")
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--rooms', type=int, default=MAZE_ROOMS)
+    parser.add_argument('--lying-rate', type=parse_list(float), default=[NPC_LYING_RATE])
+    parser.add_argument('--loop-chance', type=parse_list(float), default=[MAZE_LOOP_CHANCE])
+    parser.add_argument('--lives', type=parse_list(int), default=[3])
+    parser.add_argument('--obstacles', type=parse_list(float), default=[1.0],
+                        help="scales of the per-theme obstacle counts")
+    parser.add_argument('--max-ticks', type=int, default=5 * 60 * TICK_RATE, help="give up on a run after this many ticks")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: one per core)")
+    parser.add_argument('--out', metavar='JSONL', help="append every run's result to this file as it finishes")
+    parser.add_argument('--report', metavar='JSON', help="write the aggregated report to this file")
+    parser.add_argument('--progress-interval', type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.strategies if name not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategies {unknown}, choose from {list(STRATEGIES)}")
+    sweep = {'lying_rate': args.lying_rate, 'loop_chance': args.loop_chance, 'lives': args.lives,
+             'obstacles': args.obstacles}
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    total = len(args.strategies) * len(seeds)
+    for values in sweep.values():
+        total *= len(values)
+
+    last_progress = [time.perf_counter()]
+    def progress(report):
+        now = time.perf_counter()
+        if now - last_progress[0] >= args.progress_interval or report.runs == total:
+            last_progress[0] = now
+            elapsed = now - report.start_time
+            remaining = (total - report.runs) * elapsed / report.runs
+            print(f"{report.runs}/{total} runs, {report.runs / elapsed:.1f} runs/s, ~{remaining:.0f} s left",
+                  file=sys.stderr)
+
+    jobs = iter_jobs(args.strategies, seeds, sweep, args.rooms, args.max_ticks)
+    out = open(args.out, 'a') if args.out else None
+    try:
+        report, finished = run_batch(jobs, args.workers, out, progress)
+    finally:
+        if out is not None:
+            out.close()
+
+    result = report.get_report()
+    result['complete'] = finished
+    if not finished:
+        print(f"stopped early after {report.runs} of {total} runs", file=sys.stderr)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(result, f, indent=2)
+    print(f"{'strategy':<10}" + "".join(f"{name:>12}" for name in SETTINGS) +
+          f"{'runs':>7}{'win':>7}{'over':>7}{'rooms':>7}{'hits':>7}{'goal s':>8}")
+    for group in result['groups']:
+        time_to_goal = '-' if group['time_to_goal'] is None else f"{group['time_to_goal']:.1f}"
+        print(f"{group['strategy']:<10}" + "".join(f"{group[name]:>12}" for name in SETTINGS) +
+              f"{group['runs']:>7}{group['win_rate']:>7.0%}{group['game_over_rate']:>7.0%}"
+              f"{group['rooms_explored']:>7.1f}{group['collisions']:>7.1f}{time_to_goal:>8}")
+    print(f"{result['runs']} runs in {result['seconds']:.1f} s ({result['runs_per_second']:.2f} runs/s, "
+          f"{result['ticks_per_second']} ticks/s)")
+
+if __name__ == '__main__':
+    main()
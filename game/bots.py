@@ -0,0 +1,244 @@
+"""Scripted players for running the simulation without anyone at the keys.
+
+A bot is a callable taking the simulation and returning the input bitmask
+for its next tick, so it can be passed straight to Simulation.step. Every
+bot picks one exit per room and walks there along the room's flow field
+(the same one through-traffic steers by), sidestepping walkers about to
+cross its path; strategies only differ in how they pick the exit.
+"""
+import math
+import random
+from game.geometry import Rect
+from game.navigation import NAV_CELL
+from game.player import Player
+from game.simulation import INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_INTERACT
+from game.maze_generator import DIRECTIONS
+
+# A heading component above this presses its arrow key (about 22 degrees off the axis)
+STEER_THRESHOLD = 0.38
+
+# How far ahead (in ticks of movement) bots look for walkers, and the extra room they keep
+LOOKAHEAD_TICKS = 6
+LOOKAHEAD_MARGIN = 6
+
+# Bots start sidestepping walkers this many ticks before their invincibility runs out
+INVINCIBILITY_MARGIN_TICKS = 30
+
+# Ticks without moving before a bot wanders off in a random direction, and for how long
+STUCK_TICKS = 20
+WANDER_TICKS = 30
+
+# Every combination of arrow keys, as (inputs, dx, dy)
+MOVES = [
+    (0, 0, 0), (INPUT_UP, 0, -1), (INPUT_DOWN, 0, 1), (INPUT_LEFT, -1, 0), (INPUT_RIGHT, 1, 0),
+    (INPUT_UP | INPUT_LEFT, -1, -1), (INPUT_UP | INPUT_RIGHT, 1, -1),
+    (INPUT_DOWN | INPUT_LEFT, -1, 1), (INPUT_DOWN | INPUT_RIGHT, 1, 1)]
+
+def get_inputs(heading_x, heading_y):
+    """Arrow key bits closest to a heading"""
+    inputs = 0
+    if heading_x > STEER_THRESHOLD:
+        inputs |= INPUT_RIGHT
+    elif heading_x < -STEER_THRESHOLD:
+        inputs |= INPUT_LEFT
+    if heading_y > STEER_THRESHOLD:
+        inputs |= INPUT_DOWN
+    elif heading_y < -STEER_THRESHOLD:
+        inputs |= INPUT_UP
+    return inputs
+
+def get_walker_paths(room, ticks):
+    """Rects each walker may cover over the next ticks.
+
+    Through-traffic keeps heading for its exit; a wanderer can turn (or
+    bounce) at any tick, so it may go anywhere within reach.
+    """
+    paths = []
+    for obstacle in room.obstacles:
+        travel = obstacle.speed * ticks
+        if obstacle.movement_mode != 'through_traffic':
+            paths.append(Rect(obstacle.x - travel, obstacle.y - travel,
+                              obstacle.width + 2 * travel, obstacle.height + 2 * travel))
+            continue
+        dx = obstacle.target_x - obstacle.x
+        dy = obstacle.target_y - obstacle.y
+        distance = max(math.hypot(dx, dy), 1e-9)
+        heading_x = dx / distance
+        heading_y = dy / distance
+        if distance > NAV_CELL * 2:
+            # Steering by the flow field, like Crowd does away from the doorway
+            heading_x, heading_y = room.get_flow_field(obstacle.exit_direction).get_heading(
+                obstacle.x + obstacle.width / 2, obstacle.y + obstacle.height / 2)
+        step_x = heading_x * travel
+        step_y = heading_y * travel
+        paths.append(Rect(obstacle.x + min(step_x, 0), obstacle.y + min(step_y, 0),
+                          obstacle.width + abs(step_x), obstacle.height + abs(step_y)))
+    return paths
+
+class Bot:
+    """Walks to one exit per room; subclasses choose the exit"""
+
+    name = 'bot'
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.room_id = None
+        self.exit = None
+        self.last_position = None
+        self.still_ticks = 0
+        self.wander_ticks = 0
+        self.wander_inputs = 0
+
+    def __call__(self, sim):
+        if sim.won:
+            return 0
+        room = sim.get_current_room()
+        if sim.current_room_id != self.room_id:
+            self.room_id = sim.current_room_id
+            self.exit = None
+            self.enter_room(sim, room)
+
+        # Wander while stuck against something the flow field does not know about
+        player = sim.player
+        position = (player.x, player.y)
+        self.still_ticks = self.still_ticks + 1 if position == self.last_position else 0
+        self.last_position = position
+        if self.still_ticks >= STUCK_TICKS and not self.wander_ticks:
+            self.wander_ticks = WANDER_TICKS
+            self.wander_inputs = self.rng.choice([INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT])
+        if self.wander_ticks:
+            self.wander_ticks -= 1
+            self.still_ticks = 0
+            return self.avoid(sim, room, self.wander_inputs)
+
+        return self.avoid(sim, room, self.act(sim, room))
+
+    def enter_room(self, sim, room):
+        """Called on the first tick in a room"""
+        pass
+
+    def act(self, sim, room):
+        """Inputs for a tick that is not spent wandering"""
+        if self.exit is None:
+            self.exit = self.choose_exit(sim, room)
+        return self.walk_to_exit(sim, room, self.exit)
+
+    def choose_exit(self, sim, room):
+        raise NotImplementedError
+
+    def avoid(self, sim, room, inputs):
+        """inputs, or the closest move to them that keeps clear of where walkers can get to.
+
+        Each move is played out for LOOKAHEAD_TICKS on a scratch player (so
+        walls and slot machines stop it like the real one), and is clear
+        when the rect it sweeps misses every walker's get_walker_paths rect.
+        With no clear move the bot takes the one ending farthest from the
+        nearest walker.
+        """
+        if sim.invincibility_frames > INVINCIBILITY_MARGIN_TICKS or not room.initialized or not room.obstacles:
+            return inputs
+        walkers = get_walker_paths(room, LOOKAHEAD_TICKS)
+        player = sim.player
+        def sweep(dx, dy):
+            """(rect the move sweeps, where it ends)"""
+            scratch = Player(player.x, player.y)
+            for _ in range(LOOKAHEAD_TICKS):
+                scratch.move(dx, dy, room)
+            rect = Rect(min(player.x, scratch.x) - LOOKAHEAD_MARGIN, min(player.y, scratch.y) - LOOKAHEAD_MARGIN,
+                        abs(scratch.x - player.x) + player.width + 2 * LOOKAHEAD_MARGIN,
+                        abs(scratch.y - player.y) + player.height + 2 * LOOKAHEAD_MARGIN)
+            return rect, scratch.get_rect().center
+        def is_clear(rect):
+            return not any(rect.colliderect(walker) for walker in walkers)
+        def clearance(end):
+            return min((walker.centerx - end[0]) ** 2 + (walker.centery - end[1]) ** 2 for walker in walkers)
+        wanted_x = bool(inputs & INPUT_RIGHT) - bool(inputs & INPUT_LEFT)
+        wanted_y = bool(inputs & INPUT_DOWN) - bool(inputs & INPUT_UP)
+        if is_clear(sweep(wanted_x, wanted_y)[0]):
+            return inputs
+        # Most aligned with the wanted move first; standing still ranks in the middle
+        moves = sorted(MOVES, key=lambda move: -(move[1] * wanted_x + move[2] * wanted_y))
+        sweeps = [sweep(dx, dy) for _, dx, dy in moves]
+        for (move_inputs, _, _), (rect, _) in zip(moves, sweeps):
+            if is_clear(rect):
+                return move_inputs
+        best = max(range(len(moves)), key=lambda index: clearance(sweeps[index][1]))
+        return moves[best][0]
+
+    def walk_to_exit(self, sim, room, direction):
+        player = sim.player
+        heading_x, heading_y = room.get_flow_field(direction).get_heading(
+            player.x + player.width / 2, player.y + player.height / 2)
+        return get_inputs(heading_x, heading_y)
+
+    def walk_to(self, sim, x, y):
+        player = sim.player
+        dx = x - player.x
+        dy = y - player.y
+        length = max(abs(dx), abs(dy), 1e-9)
+        return get_inputs(dx / length, dy / length)
+
+class OracleBot(Bot):
+    """Always takes the exit on a shortest path to the goal"""
+
+    name = 'oracle'
+
+    def choose_exit(self, sim, room):
+        direction = sim.maze.next_direction(sim.current_room_id)
+        if direction not in room.connections:
+            return self.rng.choice(sorted(room.connections))
+        return direction
+
+class ExplorerBot(Bot):
+    """Prefers exits to rooms it has not seen, and avoids going back the way it came"""
+
+    name = 'explorer'
+
+    def choose_exit(self, sim, room):
+        exits = sorted(room.connections)
+        unvisited = [d for d in exits if room.connections[d] not in sim.rooms_visited]
+        if unvisited:
+            return self.rng.choice(unvisited)
+        onward = [d for d in exits if d != room.last_entrance]
+        return self.rng.choice(onward or exits)
+
+class AdviceBot(ExplorerBot):
+    """Asks the nearest NPC for directions and follows them, lies included.
+
+    Rooms without NPCs, and advice pointing at a wall, are explored like
+    ExplorerBot would.
+    """
+
+    name = 'advice'
+
+    def enter_room(self, sim, room):
+        self.npc = None
+        self.asked = False
+
+    def act(self, sim, room):
+        if self.exit is None and not self.asked:
+            if not room.initialized:
+                return 0  # Contents are built on the room's first tick
+            if self.npc is None:
+                player = sim.player
+                npcs = sorted(room.npcs, key=lambda npc: (npc.x - player.x) ** 2 + (npc.y - player.y) ** 2)
+                if not npcs:
+                    self.asked = True
+                    return super().act(sim, room)
+                self.npc = npcs[0]
+            if not self.npc.check_interaction(sim.player.get_rect()):
+                return self.walk_to(sim, self.npc.x, self.npc.y)
+            self.asked = True
+            self.exit = self.parse_advice(self.npc.get_current_dialogue(), room)
+            return INPUT_INTERACT
+        return super().act(sim, room)
+
+    @staticmethod
+    def parse_advice(dialogue, room):
+        """Direction named in dialogue if the room has that exit, else None"""
+        for direction in DIRECTIONS:
+            if direction in dialogue and direction in room.connections:
+                return direction
+        return None
+
+STRATEGIES = {bot.name: bot for bot in (OracleBot, ExplorerBot, AdviceBot)}
@@ -1,7 +1,42 @@
 # Game constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60  # Frames drawn per second
+TICK_RATE = 60  # Simulation ticks per second (speeds and timers are per tick)
+MAX_TICKS_PER_FRAME = 5  # Ticks run to catch up before a frame; time beyond that is dropped
+
+# Rendering
+DIRTY_RECT_RENDERING = False  # Only redraw and push the regions that changed
+USE_SPRITE_CACHE = True  # Blit pre-baked obstacle/NPC sprites (F4 toggles immediate-mode drawing)
+SPRITE_ATLAS = False  # Pack pre-baked sprites into a single atlas surface
+PRELOAD_ASSETS_IN_BACKGROUND = True  # Decode image files on a thread while the maze is generated
+
+# Maze
+MAZE_ROOMS = 30
+MAZE_LOOP_CHANCE = 0.2  # Chance a new room also opens a door to another neighbor
+STREAMING_MAZE = False  # Endless maze generated in chunks around the player instead of MAZE_ROOMS rooms
+STREAMING_GOAL_DISTANCE = 40  # Exits between the start room and the goal
+MAZE_CHUNK_SIZE = 16  # Rooms per side of a streaming maze chunk
+MAZE_KEEP_CHUNKS = 1  # Chunks kept loaded in every direction around the player's chunk
+MAZE_SNAPSHOT = None  # Path of a saved maze (see game.maze_snapshot) to play instead of generating one
+ROOM_CACHE_SIZE = 16  # Rooms that keep their obstacles and NPCs; older ones are rebuilt from their seed
+
+# Background simulation of rooms the player is not in
+BACKGROUND_BUDGET_US = 300  # CPU time per frame the scheduler may spend on other rooms, over all of the frame's ticks
+BACKGROUND_DEFAULT_COST_US = 150  # Assumed cost of a room that has not run yet (about the p99 of a nearby room's update)
+BACKGROUND_NEAR_RADIUS = 2  # Rooms this many exits away or closer get the coarse crowd model
+BACKGROUND_NEAR_INTERVAL = 4  # Ticks between coarse updates of a nearby room
+BACKGROUND_FAR_INTERVAL = 30  # Ticks between through-traffic-only updates of a far room
+BACKGROUND_MAX_TICKS = 60  # Longest stretch of time a single background update covers
+BACKGROUND_MAX_UPDATES = 3  # Room updates per tick when the budget is counted, not timed (recording and replay)
+
+# Prefetching of the rooms behind the current room's exits
+PREFETCH_BUDGET_MS = 4  # Idle time per frame spent preparing neighboring rooms
+PREFETCH_APPROACH_DISTANCE = 150  # Closer than this to an exit, its room is prepared even without idle time
+
+# Profiler (F1 overlay, F2 dump recent frames, F3 cProfile window)
+PROFILER_DUMP_SECONDS = 10
+PROFILER_CPROFILE_FRAMES = 600
 
 # Colors (Kiro brand)
 PURPLE_500 = (121, 14, 203)
@@ -14,7 +49,18 @@ PREY_300 = (180, 180, 185)
 # Player
 PLAYER_SIZE = 40
 PLAYER_SPEED = 4
+PLAYER_IMAGE = 'kiro-logo.png'
 
 # Room
 ROOM_PADDING = 50
 EXIT_SIZE = 60
+SAFE_ZONE_RADIUS = 95  # Moving obstacles keep out of this area around each exit
+PLACEMENT_CELL = 10  # Spacing of the lattice room contents are placed on
+PLACEMENT_MAX_RADIUS = 60  # Largest spacing radius a placed item may ask for
+MAX_ROOM_OBSTACLES = 10  # Through-traffic stops spawning at this many moving obstacles
+CROWD_SCALAR_MAX = 48  # Crowds up to this size update walker by walker; NumPy only pays off above it
+MAX_SPEECH_BUBBLES = 16  # Speech bubbles drawn per room per frame
+ROOM_OBSTACLE_COUNTS = {'casino': (1, 3), 'expo': (2, 4), 'corridor': (2, 4)}  # Wandering obstacles placed per theme
+
+# NPCs
+NPC_LYING_RATE = 0.4  # Chance an NPC gives the opposite direction
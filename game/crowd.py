@@ -0,0 +1,526 @@
+import math
+import random
+import numpy as np
+from game.constants import *
+from game.navigation import NAV_CELL
+from game.maze_generator import DIRECTIONS
+
+# Movement modes
+WANDER = 0
+THROUGH_TRAFFIC = 1
+
+# Fields copied when an obstacle moves between crowds
+FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'direction', 'speed', 'target_x', 'target_y', 'size', 'kind',
+          'mode', 'exit', 'change_timer', 'change_interval', 'speech_timer', 'speech_cooldown', 'reached')
+
+# Separation: walkers sharing a cell are nudged away from the cell's centroid
+SEPARATION_CELL = 32
+SEPARATION_STRENGTH = 0.1
+SEPARATION_MAX_STEP = 1.0
+
+class Crowd:
+    """A room's moving obstacles stored as parallel NumPy arrays.
+
+    Obstacle objects are thin views: their position, heading, timers and
+    movement mode live in slot obstacle.slot of these arrays. update()
+    advances every walker at once (wander, wall bounce, safe-zone repulsion,
+    through-traffic steering, speech timers and separation). Slots stay
+    dense and in insertion order, so obstacles[i] is the view of slot i.
+
+    A crowd of at most max_scalar walkers (every room in normal play) runs
+    the same model walker by walker in plain Python instead, since a
+    handful of walkers costs less than NumPy's fixed overhead per call.
+    """
+
+    def __init__(self, room=None, capacity=16, seed=None, max_scalar=CROWD_SCALAR_MAX):
+        self.room = room
+        self.capacity = capacity
+        self.max_scalar = max_scalar
+        self.count = 0
+        self.obstacles = []  # Obstacle view of each slot
+
+        # Structure of arrays, one slot per walker
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)  # Position before the last real-time tick, for interpolation
+        self.prev_y = np.zeros(capacity)
+        self.direction = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.target_x = np.zeros(capacity)
+        self.target_y = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.kind = np.zeros(capacity, dtype=np.int8)  # Index into Obstacle.TYPES
+        self.mode = np.zeros(capacity, dtype=np.int8)
+        self.exit = np.full(capacity, -1, dtype=np.int8)  # DIRECTIONS index of a through-traffic walker's exit
+        self.change_timer = np.zeros(capacity, dtype=np.int32)
+        self.change_interval = np.zeros(capacity, dtype=np.int32)
+        self.speech_timer = np.zeros(capacity, dtype=np.int32)
+        self.speech_cooldown = np.zeros(capacity, dtype=np.int32)
+        self.reached = np.zeros(capacity, dtype=bool)
+
+        self.seed = seed
+        self.rng = None  # Created on first update
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, capacity):
+        for name in FIELDS:
+            array = getattr(self, name)
+            grown = np.full(capacity, -1 if name == 'exit' else 0, dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def allocate(self, obstacle):
+        """Give obstacle the next free slot"""
+        if self.count == self.capacity:
+            self.grow(self.capacity * 2)
+        slot = self.count
+        self.count += 1
+        self.obstacles.append(obstacle)
+        obstacle.crowd = self
+        obstacle.slot = slot
+        return slot
+
+    def copy_in(self, obstacle):
+        """Allocate a slot for obstacle holding a copy of its current state"""
+        source = obstacle.crowd
+        old_slot = obstacle.slot
+        slot = self.allocate(obstacle)
+        if source is not None:
+            for name in FIELDS:
+                getattr(self, name)[slot] = getattr(source, name)[old_slot]
+
+    def adopt(self, obstacle):
+        """Move obstacle's state from its current crowd into this one"""
+        source = obstacle.crowd
+        if source is self:
+            return
+        old_slot = obstacle.slot
+        self.copy_in(obstacle)
+        if source is not None:
+            source.discard([old_slot])
+
+    def discard(self, slots):
+        """Drop slots and close the gaps, keeping the rest in order"""
+        keep = np.ones(self.count, dtype=bool)
+        keep[slots] = False
+        kept = int(keep.sum())
+        for name in FIELDS:
+            array = getattr(self, name)
+            array[:kept] = array[:self.count][keep]
+        self.obstacles = [obstacle for obstacle, k in zip(self.obstacles, keep.tolist()) if k]
+        self.count = kept
+        for slot in range(int(np.min(slots)), kept):
+            self.obstacles[slot].slot = slot
+
+    def clear(self):
+        """Drop every walker, leaving each with a crowd of its own"""
+        for obstacle in self.obstacles:
+            Crowd(capacity=1).copy_in(obstacle)
+        self.count = 0
+        self.obstacles = []
+
+    def sync(self):
+        """Adopt obstacles appended to the obstacles list behind the crowd's back"""
+        if len(self.obstacles) == self.count:
+            return
+        appended = self.obstacles[self.count:]
+        del self.obstacles[self.count:]
+        for obstacle in appended:
+            self.adopt(obstacle)
+
+    def remove_reached(self):
+        """Remove through-traffic walkers that reached their exit; returns them"""
+        if not self.reached[:self.count].any():
+            return []
+        reached = np.flatnonzero(self.reached[:self.count])
+        removed = [self.obstacles[slot] for slot in reached.tolist()]
+        for obstacle in removed:
+            # Removed walkers keep their last state in a crowd of their own
+            Crowd(capacity=1).copy_in(obstacle)
+        self.discard(reached)
+        return removed
+
+    def save_positions(self):
+        """Remember where every walker is before a tick, so drawing can interpolate"""
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def get_rng(self):
+        if self.rng is None:
+            seed = self.seed if self.seed is not None else random.getrandbits(64)
+            self.rng = np.random.default_rng(seed)
+        return self.rng
+
+    def get_safe_zone_mask(self, cx, cy):
+        """Which walker centers are in a safe zone around one of the room's exits"""
+        connections = self.room.connections if self.room is not None else {}
+        center_x = SCREEN_WIDTH // 2
+        center_y = SCREEN_HEIGHT // 2
+        mask = np.zeros(len(cx), dtype=bool)
+        if 'north' in connections or 'south' in connections:
+            near_x = np.abs(cx - center_x) < SAFE_ZONE_RADIUS
+            if 'north' in connections:
+                mask |= near_x & (cy < ROOM_PADDING + SAFE_ZONE_RADIUS)
+            if 'south' in connections:
+                mask |= near_x & (cy > SCREEN_HEIGHT - ROOM_PADDING - SAFE_ZONE_RADIUS)
+        if 'east' in connections or 'west' in connections:
+            near_y = np.abs(cy - center_y) < SAFE_ZONE_RADIUS
+            if 'east' in connections:
+                mask |= near_y & (cx > SCREEN_WIDTH - ROOM_PADDING - SAFE_ZONE_RADIUS)
+            if 'west' in connections:
+                mask |= near_y & (cx < ROOM_PADDING + SAFE_ZONE_RADIUS)
+        return mask
+
+    def update(self, ticks=1, coarse=False, build_fields=True):
+        """Advance every walker by ticks frames.
+
+        coarse is the off-screen model: movement only, without separation or
+        speech, which only matter to what is drawn. With build_fields False
+        through-traffic whose flow field is not built yet walks straight at
+        its exit, and the field is queued in navigation_cache rather than
+        built in the middle of a budgeted update.
+        """
+        n = self.count
+        if not n:
+            return
+        if n <= self.max_scalar:
+            self.update_scalar(ticks, coarse, build_fields=build_fields)
+            return
+        rng = self.get_rng()
+        x = self.x[:n]
+        y = self.y[:n]
+        direction = self.direction[:n]
+        speed = self.speed[:n]
+        size = self.size[:n]
+        through = self.mode[:n] == THROUGH_TRAFFIC
+        wander = ~through
+
+        if through.any():
+            self.update_through_traffic(through, ticks, build_fields)
+        if wander.any():
+            self.update_wander(wander, x, y, direction, speed * ticks, size, rng, ticks, coarse)
+        if not coarse:
+            self.update_speech(rng, ticks)
+
+    def advance_traffic(self, ticks, build_fields=True):
+        """Cheapest model for far rooms: only through-traffic moves, everyone else is frozen"""
+        if not self.count:
+            return
+        if self.count <= self.max_scalar:
+            self.update_scalar(ticks, traffic_only=True, build_fields=build_fields)
+            return
+        through = self.mode[:self.count] == THROUGH_TRAFFIC
+        if through.any():
+            self.update_through_traffic(through, ticks, build_fields)
+
+    def update_through_traffic(self, through, ticks=1, build_fields=True):
+        """Walk to the target exit along the room's flow field; arriving marks the walker as reached"""
+        n = self.count
+        dx = self.target_x[:n] - self.x[:n]
+        dy = self.target_y[:n] - self.y[:n]
+        distance = np.hypot(dx, dy)
+        arrived = through & (distance < 5)
+        self.reached[:n] |= arrived
+        moving = through & ~arrived
+
+        # Straight at the target by default
+        heading_x = np.divide(dx, distance, out=np.zeros(n), where=moving)
+        heading_y = np.divide(dy, distance, out=np.zeros(n), where=moving)
+
+        # Away from the doorway, steer around slot machines and safe zones
+        steering = moving & (distance > NAV_CELL * 2)
+        if self.room is not None and steering.any():
+            exits = self.exit[:n]
+            half = self.size[:n] / 2
+            for exit_index in np.unique(exits[steering]).tolist():
+                if exit_index < 0:
+                    continue
+                field = self.room.get_flow_field(DIRECTIONS[exit_index], build_fields)
+                if field is None:
+                    continue  # Straight at the exit until the field is built
+                routed = steering & (exits == exit_index)
+                heading_x[routed], heading_y[routed] = field.get_headings(
+                    self.x[:n][routed] + half[routed], self.y[:n][routed] + half[routed])
+
+        # Never overshoot the target, however many ticks are covered at once
+        travel = np.minimum(self.speed[:n] * ticks, distance)
+        self.x[:n] += heading_x * travel
+        self.y[:n] += heading_y * travel
+
+    def update_wander(self, wander, x, y, direction, speed, size, rng, ticks=1, coarse=False):
+        """Aimless wandering with wall bounces, safe-zone repulsion and separation"""
+        timer = self.change_timer[:self.count]
+        interval = self.change_interval[:self.count]
+
+        # Randomly change direction
+        timer += wander * ticks
+        change = wander & (timer >= interval)
+        if change.any():
+            changed = int(change.sum())
+            direction[change] = rng.uniform(0, 2 * math.pi, changed)
+            timer[change] = 0
+            interval[change] = rng.integers(60, 181, changed)
+
+        # Step in the current direction
+        new_x = x + np.cos(direction) * speed
+        new_y = y + np.sin(direction) * speed
+
+        # Stepping into a safe zone turns the walker around at random instead
+        half = size // 2
+        repelled = wander & self.get_safe_zone_mask(new_x + half, new_y + half)
+        if repelled.any():
+            direction[repelled] = rng.uniform(0, 2 * math.pi, int(repelled.sum()))
+            free = wander & ~repelled
+        else:
+            free = wander
+
+        # Bounce off walls
+        min_x = ROOM_PADDING + 10
+        max_x = SCREEN_WIDTH - ROOM_PADDING - size - 10
+        min_y = ROOM_PADDING + 10
+        max_y = SCREEN_HEIGHT - ROOM_PADDING - size - 10
+        bounce_x = free & ((new_x < min_x) | (new_x > max_x))
+        bounce_y = free & ~bounce_x & ((new_y < min_y) | (new_y > max_y))
+        if bounce_x.any():
+            direction[bounce_x] = math.pi - direction[bounce_x]
+        if bounce_y.any():
+            direction[bounce_y] = -direction[bounce_y]
+
+        moving = free & ~bounce_x & ~bounce_y
+        np.copyto(x, new_x, where=moving)
+        np.copyto(y, new_y, where=moving)
+
+        if not coarse:
+            self.separate(wander, x, y, min_x, max_x, min_y, max_y)
+
+    def separate(self, wander, x, y, min_x, max_x, min_y, max_y):
+        """Nudge wanderers that share a grid cell apart from the cell's centroid"""
+        slots = np.flatnonzero(wander)
+        if len(slots) < 2:
+            return
+        wx = x[slots]
+        wy = y[slots]
+        # np.minimum/np.maximum rather than np.clip: a fraction of the call overhead
+        cells_x = np.minimum(np.maximum(wx // SEPARATION_CELL, 0), SCREEN_WIDTH // SEPARATION_CELL)
+        cells_y = np.minimum(np.maximum(wy // SEPARATION_CELL, 0), SCREEN_HEIGHT // SEPARATION_CELL)
+        cells = (cells_x * (SCREEN_HEIGHT // SEPARATION_CELL + 1) + cells_y).astype(np.int64)
+        counts = np.bincount(cells)
+        if counts.max() < 2:
+            return
+        shared = counts[cells] > 1
+        mean_x = np.bincount(cells, weights=wx)[cells] / counts[cells]
+        mean_y = np.bincount(cells, weights=wy)[cells] / counts[cells]
+        push_x = np.clip((wx - mean_x) * SEPARATION_STRENGTH, -SEPARATION_MAX_STEP, SEPARATION_MAX_STEP)
+        push_y = np.clip((wy - mean_y) * SEPARATION_STRENGTH, -SEPARATION_MAX_STEP, SEPARATION_MAX_STEP)
+        x[slots] = np.where(shared, np.clip(wx + push_x, min_x, max_x[slots]), wx)
+        y[slots] = np.where(shared, np.clip(wy + push_y, min_y, max_y[slots]), wy)
+
+    def update_speech(self, rng, ticks=1):
+        """Count down speech bubbles and start new quotes"""
+        n = self.count
+        timer = self.speech_timer[:n]
+        cooldown = self.speech_cooldown[:n]
+        talking = timer > 0
+        timer -= np.minimum(timer, ticks)
+        finished = talking & (timer == 0)
+        if finished.any():
+            for slot in np.flatnonzero(finished).tolist():
+                self.obstacles[slot].speech_text = ""
+
+        quiet = ~talking
+        cooldown -= quiet * ticks
+        starting = quiet & (cooldown <= 0)
+        if starting.any():
+            starting = np.flatnonzero(starting)
+            picks = rng.random(len(starting)).tolist()
+            for slot, pick in zip(starting.tolist(), picks):
+                quotes = self.obstacles[slot].quotes
+                self.obstacles[slot].speech_text = quotes[int(pick * len(quotes))]
+            timer[starting] = 180  # Show for 3 seconds
+            cooldown[starting] = rng.integers(120, 241, len(starting))  # 2-4 seconds between quotes
+
+    def update_scalar(self, ticks=1, coarse=False, traffic_only=False, build_fields=True):
+        """update() (or advance_traffic() with traffic_only) one walker at a time, for small crowds"""
+        n = self.count
+        room = self.room
+        rng = None if traffic_only else self.get_rng()
+        xs = self.x[:n].tolist()
+        ys = self.y[:n].tolist()
+        speeds = self.speed[:n].tolist()
+        sizes = self.size[:n].tolist()
+        modes = self.mode[:n].tolist()
+        if not traffic_only:
+            directions = self.direction[:n].tolist()
+            timers = self.change_timer[:n].tolist()
+            intervals = self.change_interval[:n].tolist()
+        targets = None  # (target x, target y, exit) lists, read on the first through-traffic walker
+        fields = {}  # exit index: FlowField (None while not built), looked up once per update
+        wanderers = []
+        arrived = []
+        turned = False
+        min_x = ROOM_PADDING + 10
+        min_y = ROOM_PADDING + 10
+        # Safe zones hug the exits, so walkers inside this box never need the full test
+        inner_left = ROOM_PADDING + SAFE_ZONE_RADIUS
+        inner_right = SCREEN_WIDTH - ROOM_PADDING - SAFE_ZONE_RADIUS
+        inner_top = ROOM_PADDING + SAFE_ZONE_RADIUS
+        inner_bottom = SCREEN_HEIGHT - ROOM_PADDING - SAFE_ZONE_RADIUS
+        cos = math.cos
+        sin = math.sin
+
+        for i in range(n):
+            x = xs[i]
+            y = ys[i]
+            if modes[i] == THROUGH_TRAFFIC:
+                if targets is None:
+                    targets = (self.target_x[:n].tolist(), self.target_y[:n].tolist(), self.exit[:n].tolist())
+                dx = targets[0][i] - x
+                dy = targets[1][i] - y
+                distance = math.hypot(dx, dy)
+                if distance < 5:
+                    arrived.append(i)
+                    continue
+                heading_x = dx / distance
+                heading_y = dy / distance
+                exit_index = targets[2][i]
+                if room is not None and exit_index >= 0 and distance > NAV_CELL * 2:
+                    if exit_index in fields:
+                        field = fields[exit_index]
+                    else:
+                        field = fields[exit_index] = room.get_flow_field(DIRECTIONS[exit_index], build_fields)
+                    if field is not None:
+                        half = sizes[i] / 2
+                        heading_x, heading_y = field.get_heading(x + half, y + half)
+                travel = min(speeds[i] * ticks, distance)
+                xs[i] = x + heading_x * travel
+                ys[i] = y + heading_y * travel
+                continue
+            if traffic_only:
+                continue
+
+            # Wander: timed direction changes, safe-zone repulsion, wall bounces
+            wanderers.append(i)
+            direction = directions[i]
+            timer = timers[i] + ticks
+            if timer >= intervals[i]:
+                direction = rng.uniform(0, 2 * math.pi)
+                timer = 0
+                intervals[i] = int(rng.integers(60, 181))
+                turned = True
+            timers[i] = timer
+            step = speeds[i] * ticks
+            new_x = x + cos(direction) * step
+            new_y = y + sin(direction) * step
+            size = sizes[i]
+            half = size // 2
+            center_x = new_x + half
+            center_y = new_y + half
+            if (room is not None and not (inner_left <= center_x <= inner_right and inner_top <= center_y <= inner_bottom)
+                    and room.is_in_safe_zone(center_x, center_y)):
+                direction = rng.uniform(0, 2 * math.pi)
+            elif new_x < min_x or new_x > SCREEN_WIDTH - ROOM_PADDING - size - 10:
+                direction = math.pi - direction
+            elif new_y < min_y or new_y > SCREEN_HEIGHT - ROOM_PADDING - size - 10:
+                direction = -direction
+            else:
+                xs[i] = new_x
+                ys[i] = new_y
+                if direction == directions[i]:
+                    continue
+            directions[i] = direction
+            turned = True
+
+        if not coarse and len(wanderers) >= 2:
+            self.separate_scalar(wanderers, xs, ys, sizes, min_x, min_y)
+
+        self.x[:n] = xs
+        self.y[:n] = ys
+        if arrived:
+            self.reached[arrived] = True
+        if not traffic_only:
+            self.change_timer[:n] = timers
+            if turned:
+                self.direction[:n] = directions
+                self.change_interval[:n] = intervals
+            if not coarse:
+                self.update_speech_scalar(rng, ticks)
+
+    def separate_scalar(self, wanderers, xs, ys, sizes, min_x, min_y):
+        """separate() for a small crowd, on plain lists"""
+        rows = SCREEN_HEIGHT // SEPARATION_CELL + 1
+        last_column = SCREEN_WIDTH // SEPARATION_CELL
+        last_row = SCREEN_HEIGHT // SEPARATION_CELL
+        cells = {}
+        for i in wanderers:
+            cell_x = xs[i] // SEPARATION_CELL
+            cell_y = ys[i] // SEPARATION_CELL
+            cell_x = 0 if cell_x < 0 else last_column if cell_x > last_column else cell_x
+            cell_y = 0 if cell_y < 0 else last_row if cell_y > last_row else cell_y
+            key = cell_x * rows + cell_y
+            members = cells.get(key)
+            if members is None:
+                cells[key] = [i]
+            else:
+                members.append(i)
+        if len(cells) == len(wanderers):
+            return
+        for members in cells.values():
+            if len(members) < 2:
+                continue
+            mean_x = sum([xs[i] for i in members]) / len(members)
+            mean_y = sum([ys[i] for i in members]) / len(members)
+            for i in members:
+                push_x = (xs[i] - mean_x) * SEPARATION_STRENGTH
+                push_y = (ys[i] - mean_y) * SEPARATION_STRENGTH
+                push_x = -SEPARATION_MAX_STEP if push_x < -SEPARATION_MAX_STEP else SEPARATION_MAX_STEP if push_x > SEPARATION_MAX_STEP else push_x
+                push_y = -SEPARATION_MAX_STEP if push_y < -SEPARATION_MAX_STEP else SEPARATION_MAX_STEP if push_y > SEPARATION_MAX_STEP else push_y
+                max_x = SCREEN_WIDTH - ROOM_PADDING - sizes[i] - 10
+                max_y = SCREEN_HEIGHT - ROOM_PADDING - sizes[i] - 10
+                xs[i] = min(max(xs[i] + push_x, min_x), max_x)
+                ys[i] = min(max(ys[i] + push_y, min_y), max_y)
+
+    def update_speech_scalar(self, rng, ticks=1):
+        """update_speech() for a small crowd"""
+        n = self.count
+        timers = self.speech_timer[:n].tolist()
+        cooldowns = self.speech_cooldown[:n].tolist()
+        for i in range(n):
+            if timers[i] > 0:
+                timers[i] -= min(timers[i], ticks)
+                if timers[i] == 0:
+                    self.obstacles[i].speech_text = ""
+                continue
+            cooldowns[i] -= ticks
+            if cooldowns[i] <= 0:
+                quotes = self.obstacles[i].quotes
+                self.obstacles[i].speech_text = quotes[int(rng.random() * len(quotes))]
+                timers[i] = 180  # Show for 3 seconds
+                cooldowns[i] = int(rng.integers(120, 241))  # 2-4 seconds between quotes
+        self.speech_timer[:n] = timers
+        self.speech_cooldown[:n] = cooldowns
+
+    def first_colliding(self, rect):
+        """The first walker whose rect overlaps rect (pygame.Rect rules), or None"""
+        n = self.count
+        if not n or rect.width <= 0 or rect.height <= 0:
+            return None
+        if n <= self.max_scalar:
+            right = rect.x + rect.width
+            bottom = rect.y + rect.height
+            for slot, (x, y, size) in enumerate(zip(self.x[:n].tolist(), self.y[:n].tolist(), self.size[:n].tolist())):
+                left = int(x)
+                top = int(y)
+                if left < right and rect.x < left + size and top < bottom and rect.y < top + size:
+                    return self.obstacles[slot]
+            return None
+        # Rects truncate coordinates to int like Obstacle.get_rect
+        left = self.x[:n].astype(np.int64)
+        top = self.y[:n].astype(np.int64)
+        size = self.size[:n]
+        hits = np.flatnonzero((left < rect.x + rect.width) & (rect.x < left + size) &
+                              (top < rect.y + rect.height) & (rect.y < top + size))
+        return self.obstacles[hits[0]] if len(hits) else None
@@ -1,23 +1,59 @@
 import pygame
-import random
+import time
 from game.constants import *
-from game.player import Player
-from game.maze import Maze
-from game.particles import ParticleSystem
+from game.simulation import *
+from game.particles import ParticleSystem, effects_rng
+from game.prefetch import Prefetcher
+from game.replay import InputRecorder, InputReplayer, Recording
+from game.text import render_text
+from game.sprites import sprite_cache
+from game.assets import assets
+from game.surface_pool import surface_pool
+from game.profiler import profiler
 
 class Game:
-    def __init__(self):
+    def __init__(self, num_rooms=MAZE_ROOMS, seed=None, streaming=STREAMING_MAZE, tick_rate=TICK_RATE, fps=FPS,
+                 snapshot=MAZE_SNAPSHOT, record=None, replay=None):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Re:Invent Maze - Find the Conference Room!")
         self.clock = pygame.time.Clock()
         self.running = True
         
-        # Initialize game objects
-        self.maze = Maze(30)
-        self.current_room_id = self.maze.start_room_id
-        self.player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        # The simulation ticks at a fixed rate; frames are drawn at their own rate
+        self.tick_rate = tick_rate
+        self.fps = fps
+        self.skipped_ticks = 0  # Ticks dropped because the machine fell too far behind
+        
+        # Decode image files while the sprites are baked and the maze is generated
+        assets.preload([PLAYER_IMAGE], background=PRELOAD_ASSETS_IN_BACKGROUND)
+        
+        # Rasterize obstacle and NPC visuals once, now that the display format is known
+        sprite_cache.prebake()
+        
+        # Game state lives in the display-free simulation core. Recorded and
+        # replayed sessions run it deterministically; replays take their inputs
+        # from the recording instead of the keyboard.
+        self.recorder = None
+        self.replayer = None
+        self.record_path = record
+        if replay is not None:
+            recording = Recording(replay)
+            self.tick_rate = recording.tick_rate
+            self.sim = recording.create_simulation()
+            self.replayer = InputReplayer(recording)
+        else:
+            self.sim = Simulation(num_rooms, seed=seed, streaming=streaming, snapshot=snapshot,
+                                  deterministic=record is not None)
+            if record is not None:
+                self.recorder = InputRecorder(self.sim, self.tick_rate)
+        
+        # Screen effects get their own stream, seeded along with the simulation
+        effects_rng.seed(self.sim.seed)
         self.particles = ParticleSystem()
         
+        # Prepares neighboring rooms in idle time so entering them does not hitch
+        self.prefetcher = Prefetcher()
+        
         # Screen shake
         self.shake_amount = 0
         self.shake_duration = 0
@@ -27,19 +63,14 @@ class Game:
         self.transition_alpha = 0
         self.transition_direction = 0
         
-        # Invincibility frames
-        self.invincibility_frames = 0
-        
-        # Lives system
-        self.lives = 3
-        self.max_lives = 3
-        
-        # Game stats
-        self.steps_taken = 0
-        self.rooms_visited = set([self.current_room_id])
-        self.time_elapsed = 0
+        # Restart requested with R, applied on the next tick
+        self.restart_requested = False
         
-        self.won = False
+        # Dirty-rect rendering state
+        self.dirty_rendering = DIRTY_RECT_RENDERING
+        self.needs_full_redraw = True
+        self.drawn_background = None
+        self.previous_bounds = []
     
     def handle_events(self):
         for event in pygame.event.get():
@@ -48,8 +79,50 @@ class Game:
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
-                elif event.key == pygame.K_r and self.won:
-                    self.reset_game()
+                elif event.key == pygame.K_r and self.sim.won:
+                    self.restart_requested = True
+                elif event.key == pygame.K_F1:
+                    # Frame profiler overlay (recording runs while it is shown)
+                    profiler.toggle()
+                    self.needs_full_redraw = True
+                elif event.key == pygame.K_F2:
+                    profiler.dump(time.strftime("profile-%Y%m%d-%H%M%S.json"), PROFILER_DUMP_SECONDS)
+                elif event.key == pygame.K_F3:
+                    if profiler.cprofile is None:
+                        profiler.start_cprofile(PROFILER_CPROFILE_FRAMES, time.strftime("profile-%Y%m%d-%H%M%S.prof"))
+                    else:
+                        profiler.stop_cprofile()
+                elif event.key == pygame.K_F4:
+                    # Compare pre-baked sprites against immediate-mode drawing
+                    sprite_cache.enabled = not sprite_cache.enabled
+                    self.needs_full_redraw = True
+    
+    def read_input(self):
+        """Sample the keyboard (or the replayed recording) into a simulation input bitmask"""
+        if self.replayer is not None:
+            inputs = self.replayer(self.sim)
+            if self.replayer.finished:
+                self.running = False
+            return inputs
+        
+        keys = pygame.key.get_pressed()
+        inputs = 0
+        
+        # Arrow keys or WASD
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            inputs |= INPUT_UP
+        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            inputs |= INPUT_DOWN
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            inputs |= INPUT_LEFT
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            inputs |= INPUT_RIGHT
+        if keys[pygame.K_e]:
+            inputs |= INPUT_INTERACT
+        if self.restart_requested:
+            inputs |= INPUT_RESTART
+            self.restart_requested = False
+        return inputs
     
     def update(self):
         # Update particles
@@ -68,149 +141,142 @@ class Game:
                 self.transitioning = False
                 self.transition_alpha = 0
         
-        # Update invincibility
-        if self.invincibility_frames > 0:
-            self.invincibility_frames -= 1
-        
-        if self.won:
-            return
-        
-        # Update game stats
-        self.time_elapsed += 1
-        
-        # Handle player movement
-        keys = pygame.key.get_pressed()
-        dx = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
-        dy = keys[pygame.K_DOWN] - keys[pygame.K_UP]
-        
-        # Alternative WASD controls
-        dx += keys[pygame.K_d] - keys[pygame.K_a]
-        dy += keys[pygame.K_s] - keys[pygame.K_w]
-        
-        current_room = self.maze.get_room(self.current_room_id)
-        
-        # Initialize room contents if not done
-        if not current_room.initialized:
-            current_room.initialize_contents(self.maze)
-        
-        self.player.move(dx, dy, current_room)
-        
-        # Update room (obstacles, NPCs)
-        current_room.update(self.player.get_rect())
-        
-        # Check for collisions with obstacles (only if not invincible)
-        if self.invincibility_frames == 0 and current_room.check_collisions(self.player.get_rect()):
-            self.on_collision()
-            return
-        
-        # Check for NPC interaction (E key)
-        if keys[pygame.K_e]:
-            npc = current_room.check_npc_interaction(self.player.get_rect())
-            if npc:
-                npc.interact()
-        
-        # Check for room transitions
-        exit_direction = current_room.check_exit(self.player.get_rect())
-        if exit_direction:
-            next_room_id = current_room.connections[exit_direction]
-            self.transition_room(next_room_id, exit_direction)
-    
-    def transition_room(self, next_room_id, from_direction):
-        """Move player to next room"""
-        self.current_room_id = next_room_id
-        self.rooms_visited.add(next_room_id)
-        self.steps_taken += 1
-        
-        # Set entrance cooldown to prevent spawning at this entrance
-        opposite_dir = {'north': 'south', 'south': 'north', 'east': 'west', 'west': 'east'}
-        current_room = self.maze.get_room(next_room_id)
-        current_room.last_entrance = opposite_dir[from_direction]
-        current_room.entrance_cooldown = 240  # 4 seconds (increased from 3)
-        
-        # Position player at opposite entrance
-        if from_direction == 'north':
-            self.player.y = SCREEN_HEIGHT - ROOM_PADDING - self.player.height - 10
-        elif from_direction == 'south':
-            self.player.y = ROOM_PADDING + 10
-        elif from_direction == 'east':
-            self.player.x = ROOM_PADDING + 10
-        elif from_direction == 'west':
-            self.player.x = SCREEN_WIDTH - ROOM_PADDING - self.player.width - 10
-        
-        # Give brief invincibility after entering
-        self.invincibility_frames = 90  # 1.5 seconds (increased from 1)
-        
-        # Check if reached goal
-        if self.current_room_id == self.maze.goal_room_id:
-            self.won = True
+        # Animated theme elements run on ticks, so they last as long at any frame rate
+        current_room = self.sim.get_current_room()
+        if current_room.theme == "casino":
+            current_room.update_jackpot()
+        
+        inputs = self.read_input()
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+        for event in self.sim.tick(inputs):
+            if event == 'collision':
+                self.on_collision()
+            elif event in ('game_over', 'restart'):
+                self.reset_effects()
     
     def on_collision(self):
-        """Handle collision with obstacle"""
-        # Lose a life
-        self.lives -= 1
-        
+        """Feedback for a collision with an obstacle"""
         # Screen shake
         self.shake_amount = 10
         self.shake_duration = 20
         
         # Particle explosion (purple sparkles - teleport effect!)
-        player_rect = self.player.get_rect()
+        player_rect = self.sim.player.get_rect()
         self.particles.emit(player_rect.centerx, player_rect.centery, PURPLE_500, 20)
-        
-        # Give invincibility frames to recover
-        self.invincibility_frames = 150  # 2.5 seconds
-        
-        if self.lives <= 0:
-            # Game over - reset everything
-            self.reset_game()
     
-
+    def draw(self, alpha=1.0):
+        """Draw the game alpha (0-1) of the way from the previous tick to the latest one"""
+        with self.sim.interpolated(alpha):
+            if self.dirty_rendering and self.can_draw_dirty():
+                self.draw_dirty()
+            else:
+                self.draw_full()
+        surface_pool.end_frame()
+    
+    def can_draw_dirty(self):
+        """Dirty rects only work while the frame sits still on an unchanged background"""
+        if self.needs_full_redraw or self.shake_amount > 0 or self.transitioning or self.sim.won or profiler.enabled:
+            return False
+        current_room = self.sim.get_current_room()
+        return current_room.get_background() is self.drawn_background
+    
+    def get_dynamic_bounds(self, current_room):
+        """Screen rects covering everything drawn over the room background"""
+        bounds = current_room.get_dynamic_bounds()
+        bounds.extend(self.sim.player.get_bounds())
+        bounds.extend(self.particles.get_bounds())
+        bounds.extend(self.get_ui_bounds())
+        screen_rect = self.screen.get_rect()
+        return [rect.clip(screen_rect) for rect in bounds]
     
-    def draw(self):
+    def draw_dirty(self):
+        """Restore and redraw only the regions that changed since the last frame"""
+        current_room = self.sim.get_current_room()
+        background = current_room.get_background()
+        
+        current_bounds = self.get_dynamic_bounds(current_room)
+        dirty_rects = self.previous_bounds + current_bounds
+        for rect in dirty_rects:
+            self.screen.blit(background, rect, rect)
+        
+        with profiler.span('Room.draw'):
+            current_room.draw_dynamic(self.screen)
+        if not (self.sim.invincibility_frames > 0 and (self.sim.invincibility_frames // 10) % 2 == 0):
+            self.sim.player.draw(self.screen)
+        self.particles.draw(self.screen)
+        with profiler.span('Game.draw_ui'):
+            self.draw_ui(self.screen)
+        
+        with profiler.span('display.update'):
+            pygame.display.update(dirty_rects)
+        self.previous_bounds = current_bounds
+    
+    def draw_full(self):
         # Apply screen shake
-        shake_x = random.randint(-self.shake_amount, self.shake_amount) if self.shake_amount > 0 else 0
-        shake_y = random.randint(-self.shake_amount, self.shake_amount) if self.shake_amount > 0 else 0
+        shake_x = effects_rng.randint(-self.shake_amount, self.shake_amount) if self.shake_amount > 0 else 0
+        shake_y = effects_rng.randint(-self.shake_amount, self.shake_amount) if self.shake_amount > 0 else 0
         
-        # Create a surface for the game content
-        game_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Surface for the game content (the room background covers all of it)
+        game_surface = surface_pool.acquire((SCREEN_WIDTH, SCREEN_HEIGHT), clear=False)
         
-        current_room = self.maze.get_room(self.current_room_id)
-        current_room.draw(game_surface)
+        current_room = self.sim.get_current_room()
+        with profiler.span('Room.draw'):
+            current_room.draw(game_surface)
         
         # Draw player with flashing effect if invincible
-        if self.invincibility_frames > 0 and (self.invincibility_frames // 10) % 2 == 0:
+        if self.sim.invincibility_frames > 0 and (self.sim.invincibility_frames // 10) % 2 == 0:
             # Flash by skipping draw every other 10 frames
             pass
         else:
-            self.player.draw(game_surface)
+            self.sim.player.draw(game_surface)
         
         # Draw particles
         self.particles.draw(game_surface)
         
         # Draw UI
-        self.draw_ui(game_surface)
+        with profiler.span('Game.draw_ui'):
+            self.draw_ui(game_surface)
         
         # Blit game surface with shake
         self.screen.fill(BLACK_900)
         self.screen.blit(game_surface, (shake_x, shake_y))
+        surface_pool.release(game_surface)
         
         # Draw transition overlay
         if self.transitioning:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(self.transition_alpha)
-            overlay.fill(PURPLE_500)
+            overlay = surface_pool.get_overlay((SCREEN_WIDTH, SCREEN_HEIGHT), PURPLE_500, self.transition_alpha)
             self.screen.blit(overlay, (0, 0))
         
-        if self.won:
+        if self.sim.won:
             self.draw_win_screen()
         
-        pygame.display.flip()
+        if profiler.enabled:
+            self.draw_profiler_overlay(self.screen)
+        
+        with profiler.span('display.flip'):
+            pygame.display.flip()
+        
+        # Remember what is on screen so the next frame can go back to dirty rects
+        # (a shaken or overlaid frame has to be fully replaced first)
+        self.needs_full_redraw = bool(shake_x or shake_y or self.transitioning or self.sim.won)
+        if self.dirty_rendering:
+            self.drawn_background = current_room.get_background()
+            self.previous_bounds = self.get_dynamic_bounds(current_room)
+    
+    def get_ui_bounds(self):
+        """Screen rects covered by the HUD"""
+        stats_width = 200
+        return [
+            pygame.Rect(5, SCREEN_HEIGHT - 30, 200, 30),  # Instructions
+            pygame.Rect(SCREEN_WIDTH - 150, 10, 150, 30),  # Lives
+            pygame.Rect(SCREEN_WIDTH - stats_width - 10, SCREEN_HEIGHT - 95, stats_width, 85)  # Stats
+        ]
     
     def draw_ui(self, surface):
         """Draw game UI elements"""
         # Instructions (bottom left)
-        font_small = pygame.font.Font(None, 20)
-        text = font_small.render("Press E near NPCs to talk", True, PREY_300)
+        text = render_text("Press E near NPCs to talk", 20, PREY_300)
         bg_rect = pygame.Rect(5, SCREEN_HEIGHT - 30, text.get_width() + 10, text.get_height() + 8)
         pygame.draw.rect(surface, PREY_750, bg_rect, border_radius=5)
         surface.blit(text, (10, SCREEN_HEIGHT - 27))
@@ -218,14 +284,13 @@ class Game:
         # Lives display (top right)
         lives_x = SCREEN_WIDTH - 150
         lives_y = 10
-        font_lives = pygame.font.Font(None, 24)
-        lives_text = font_lives.render("Lives:", True, WHITE)
+        lives_text = render_text("Lives:", 24, WHITE)
         surface.blit(lives_text, (lives_x, lives_y))
         
         # Draw hearts
         heart_x = lives_x + 60
-        for i in range(self.max_lives):
-            if i < self.lives:
+        for i in range(self.sim.max_lives):
+            if i < self.sim.lives:
                 # Full heart
                 pygame.draw.circle(surface, PURPLE_500, (heart_x + i * 30, lives_y + 12), 8)
                 pygame.draw.circle(surface, PURPLE_500, (heart_x + i * 30 + 10, lives_y + 12), 8)
@@ -248,17 +313,13 @@ class Game:
         stats_y = SCREEN_HEIGHT - 95
         
         # Time
-        minutes = self.time_elapsed // (60 * 60)
-        seconds = (self.time_elapsed // 60) % 60
-        time_text = f"Time: {minutes}:{seconds:02d}"
+        time_text = f"Time: {self.format_time()}"
         
         # Steps
-        steps_text = f"Rooms: {self.steps_taken}"
+        steps_text = f"Rooms: {self.sim.steps_taken}"
         
         # Unique rooms
-        unique_text = f"Explored: {len(self.rooms_visited)}"
-        
-        font = pygame.font.Font(None, 22)
+        unique_text = f"Explored: {len(self.sim.rooms_visited)}"
         
         # Draw stats background
         stats_height = 85
@@ -268,14 +329,48 @@ class Game:
         # Draw stats text
         y_offset = stats_y + 12
         for text_str in [time_text, steps_text, unique_text]:
-            text_surf = font.render(text_str, True, WHITE)
+            text_surf = render_text(text_str, 22, WHITE)
             surface.blit(text_surf, (stats_x + 10, y_offset))
             y_offset += 25
     
+    def format_time(self):
+        """Elapsed game time as m:ss, counted in simulation ticks"""
+        seconds = self.sim.time_elapsed // self.tick_rate
+        return f"{seconds // 60}:{seconds % 60:02d}"
+    
+    def draw_profiler_overlay(self, surface):
+        """Frame-time graph and the most expensive spans"""
+        frames = profiler.get_frames()[-120:]
+        panel = pygame.Rect(10, 45, 360, 100 + 18 * 8)
+        pygame.draw.rect(surface, BLACK_900, panel)
+        pygame.draw.rect(surface, PURPLE_500, panel, 2)
+        
+        # Frame-time graph: one bar per frame, 1 pixel per 0.5 ms, frame budget line
+        graph_bottom = panel.y + 80
+        budget_y = graph_bottom - int(1000 / self.fps * 2)
+        for i, (_, frame_seconds, _) in enumerate(frames):
+            height = min(70, int(frame_seconds * 1000 * 2))
+            color = PURPLE_500 if graph_bottom - height > budget_y else (255, 165, 0)
+            pygame.draw.line(surface, color, (panel.x + 10 + i * 2, graph_bottom),
+                             (panel.x + 10 + i * 2, graph_bottom - height))
+        pygame.draw.line(surface, PREY_300, (panel.x + 10, budget_y), (panel.right - 10, budget_y))
+        
+        if frames:
+            average = sum(frame[1] for frame in frames) / len(frames) * 1000
+            worst = max(frame[1] for frame in frames) * 1000
+            allocations = surface_pool.last_frame_allocations
+            text = render_text(f"frame avg {average:.2f} ms  max {worst:.2f} ms  surfaces +{allocations}", 18, WHITE)
+            surface.blit(text, (panel.x + 10, graph_bottom + 4))
+        
+        # Top spans by time per frame
+        y = graph_bottom + 22
+        for path, ms, calls in profiler.get_top_spans(8, frames):
+            text = render_text(f"{ms:6.2f} ms  x{calls:<4.0f} {path}", 16, PREY_300)
+            surface.blit(text, (panel.x + 10, y))
+            y += 18
+    
     def draw_win_screen(self):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(220)
-        overlay.fill(BLACK_900)
+        overlay = surface_pool.get_overlay((SCREEN_WIDTH, SCREEN_HEIGHT), BLACK_900, 220)
         self.screen.blit(overlay, (0, 0))
         
         # Pulsing effect
@@ -283,37 +378,32 @@ class Game:
         pulse = abs(math.sin(pygame.time.get_ticks() * 0.003)) * 20
         
         # Draw celebration particles
-        if random.random() < 0.3:
-            x = random.randint(100, SCREEN_WIDTH - 100)
-            y = random.randint(100, SCREEN_HEIGHT - 100)
+        if effects_rng.random() < 0.3:
+            x = effects_rng.randint(100, SCREEN_WIDTH - 100)
+            y = effects_rng.randint(100, SCREEN_HEIGHT - 100)
             self.particles.emit(x, y, PURPLE_500, 3)
         
         self.particles.draw(self.screen)
         
         # Main text with glow
-        font = pygame.font.Font(None, 72)
         glow_color = tuple(min(c + int(pulse), 255) for c in PURPLE_500)
-        text = font.render("YOU FOUND RE:INVENT!", True, glow_color)
+        text = render_text("YOU FOUND RE:INVENT!", 72, glow_color)
         text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 60))
         
         # Draw glow
+        glow_text = render_text("YOU FOUND RE:INVENT!", 72, (*PURPLE_500, 100))
         for offset in [(2, 2), (-2, -2), (2, -2), (-2, 2)]:
-            glow_text = font.render("YOU FOUND RE:INVENT!", True, (*PURPLE_500, 100))
             self.screen.blit(glow_text, (text_rect.x + offset[0], text_rect.y + offset[1]))
         
         self.screen.blit(text, text_rect)
         
         # Stats
-        minutes = self.time_elapsed // (60 * 60)
-        seconds = (self.time_elapsed // 60) % 60
-        font_stats = pygame.font.Font(None, 28)
-        stats_text = font_stats.render(f"Time: {minutes}:{seconds:02d} | Rooms: {self.steps_taken} | Explored: {len(self.rooms_visited)}", True, WHITE)
+        stats_text = render_text(f"Time: {self.format_time()} | Rooms: {self.sim.steps_taken} | Explored: {len(self.sim.rooms_visited)}", 28, WHITE)
         stats_rect = stats_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 10))
         self.screen.blit(stats_text, stats_rect)
         
         # Subtitle
-        font_small = pygame.font.Font(None, 32)
-        text2 = font_small.render("Press R to restart or ESC to quit", True, WHITE)
+        text2 = render_text("Press R to restart or ESC to quit", 32, WHITE)
         text2_rect = text2.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60))
         
         bg_rect = text2_rect.inflate(20, 10)
@@ -322,25 +412,54 @@ class Game:
         
         self.screen.blit(text2, text2_rect)
     
-    def reset_game(self):
-        self.maze = Maze(30)
-        self.current_room_id = self.maze.start_room_id
-        self.player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    def reset_effects(self):
+        """Clear presentation state after the simulation starts a new game"""
         self.particles = ParticleSystem()
         self.shake_amount = 0
         self.shake_duration = 0
         self.transitioning = False
         self.transition_alpha = 0
-        self.invincibility_frames = 120  # 2 seconds of invincibility on new game
-        self.lives = 3
-        self.steps_taken = 0
-        self.rooms_visited = set([self.current_room_id])
-        self.time_elapsed = 0
-        self.won = False
+        self.needs_full_redraw = True
     
     def run(self):
+        """Fixed-timestep loop: run every tick that is due, then draw one interpolated frame.
+        
+        When the machine falls behind, several ticks run before the next
+        frame, so frames are skipped rather than game time. Only beyond
+        MAX_TICKS_PER_FRAME is the backlog dropped.
+        """
+        tick_seconds = 1 / self.tick_rate
+        accumulator = 0.0
+        previous = time.perf_counter()
         while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            profiler.begin_frame()
+            self.sim.begin_frame()
+            now = time.perf_counter()
+            accumulator += now - previous
+            previous = now
+            
+            with profiler.span('Game.handle_events'):
+                self.handle_events()
+            ticks = 0
+            while accumulator >= tick_seconds and ticks < MAX_TICKS_PER_FRAME:
+                with profiler.span('Game.update'):
+                    self.update()
+                accumulator -= tick_seconds
+                ticks += 1
+            if accumulator >= tick_seconds:
+                self.skipped_ticks += int(accumulator / tick_seconds)
+                accumulator %= tick_seconds
+            
+            with profiler.span('Game.draw'):
+                self.draw(accumulator / tick_seconds)
+            
+            # Use what is left of this frame to get the next rooms ready
+            with profiler.span('Game.prefetch'):
+                self.prefetcher.update(self.sim, now + 1 / self.fps - time.perf_counter())
+            profiler.end_frame()
+            self.clock.tick(self.fps)
+        
+        # Flush a cProfile window that was still running at exit
+        profiler.stop_cprofile()
+        if self.recorder is not None:
+            self.recorder.save(self.record_path)
@@ -0,0 +1,60 @@
+# Display-free geometry used by the simulation core
+
+class Rect:
+    """Integer axis-aligned rectangle with the subset of pygame.Rect the game logic uses.
+
+    Coordinates are truncated to int exactly like pygame.Rect, so collision
+    results match the pygame version.
+    """
+
+    __slots__ = ('x', 'y', 'width', 'height')
+
+    def __init__(self, x, y, width, height):
+        self.x = int(x)
+        self.y = int(y)
+        self.width = int(width)
+        self.height = int(height)
+
+    @property
+    def left(self):
+        return self.x
+
+    @property
+    def top(self):
+        return self.y
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @property
+    def centerx(self):
+        return self.x + self.width // 2
+
+    @property
+    def centery(self):
+        return self.y + self.height // 2
+
+    @property
+    def center(self):
+        return (self.centerx, self.centery)
+
+    def colliderect(self, other):
+        """True if the rects overlap (touching edges and empty rects do not count)"""
+        if not (self.width and self.height and other.width and other.height):
+            return False
+        return (self.x < other.x + other.width and other.x < self.x + self.width and
+                self.y < other.y + other.height and other.y < self.y + self.height)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.width, self.height))
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return f"Rect({self.x}, {self.y}, {self.width}, {self.height})"
@@ -1,90 +1,274 @@
 import random
+import time
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from game.constants import MAZE_LOOP_CHANCE
 from game.room import Room
+from game.maze_generator import (generate_layout, DIRECTIONS, DIRECTION_DX, DIRECTION_DY,
+                                 DIRECTION_BITS, OPPOSITE)
+
+NO_HOP = 255  # next_hops entry of the goal room and of unreachable rooms
+
+class RoomsView(Mapping):
+    """room_id: Room, materializing rooms on first access"""
+
+    def __init__(self, maze):
+        self.maze = maze
+
+    def __getitem__(self, room_id):
+        room = self.maze.get_room(room_id)
+        if room is None:
+            raise KeyError(room_id)
+        return room
+
+    def __contains__(self, room_id):
+        return self.maze.has_room(room_id)
+
+    def __iter__(self):
+        return iter(self.maze.room_ids())
+
+    def __len__(self):
+        return len(self.maze.room_ids())
+
+class PositionsView(Mapping):
+    """room_id: (x, y) grid position"""
+
+    def __init__(self, maze):
+        self.maze = maze
+
+    def __getitem__(self, room_id):
+        if not self.maze.has_room(room_id):
+            raise KeyError(room_id)
+        return self.maze.get_position(room_id)
+
+    def __contains__(self, room_id):
+        return self.maze.has_room(room_id)
+
+    def __iter__(self):
+        return iter(self.maze.room_ids())
+
+    def __len__(self):
+        return len(self.maze.room_ids())
+
+class GridView(Mapping):
+    """(x, y): room_id for every occupied grid cell"""
+
+    def __init__(self, maze):
+        self.maze = maze
+
+    def __getitem__(self, pos):
+        room_id = self.maze.room_at(pos[0], pos[1])
+        if room_id < 0:
+            raise KeyError(pos)
+        return room_id
+
+    def __contains__(self, pos):
+        return self.maze.room_at(pos[0], pos[1]) >= 0
+
+    def __iter__(self):
+        return (self.maze.get_position(room_id) for room_id in self.maze.room_ids())
+
+    def __len__(self):
+        return len(self.maze.room_ids())
 
 class Maze:
-    def __init__(self, num_rooms=30):
-        self.rooms = {}
-        self.room_positions = {}  # room_id: (x, y) grid position
-        self.grid = {}  # (x, y): room_id
+    """Maze layout stored in typed arrays, with Room objects built on demand.
+
+    Each room costs a few bytes until it is visited: its grid position
+    (xs/ys), a 4-bit connection mask and one slot in a dense grid index
+    covering the maze's bounding box. get_room() materializes the full Room
+    the first time it is asked for. Room flavor comes from a per-room RNG
+    seeded from the maze seed, so a room looks the same whenever it is built.
+
+    rooms, room_positions and grid are read-only mapping views with the
+    same keys and values as the dicts they replace.
+
+    A BFS from the goal stores every room's distance to it and the exit
+    that starts a shortest path there (one DIRECTIONS index per room), so
+    distance_to_goal() and next_direction() are O(1). connect() keeps the
+    field up to date incrementally.
+    """
+
+    def __init__(self, num_rooms=30, seed=None, loop_chance=MAZE_LOOP_CHANCE):
+        self.num_rooms = max(num_rooms, 0)
+        self.loop_chance = loop_chance
         self.start_room_id = 0
         self.goal_room_id = num_rooms - 1
+        self.seed = random.getrandbits(64) if seed is None else seed
+
+        self.xs = array('i')
+        self.ys = array('i')
+        self.masks = bytearray()  # Connection bits per room, see DIRECTION_BITS
+        self.cells = array('i')  # Dense grid index: room id or -1
+        self.distances = array('i')  # Exits from each room to the goal, -1 if unreachable
+        self.next_hops = bytearray()  # DIRECTIONS index toward the goal, or NO_HOP
+        self.min_x = self.min_y = 0
+        self.grid_width = self.grid_height = 0
+
+        self.live_rooms = {}  # room_id: materialized Room
+        self.rooms = RoomsView(self)
+        self.room_positions = PositionsView(self)
+        self.grid = GridView(self)
+
+        self.generation_report = {}
         self.generate_maze(num_rooms)
-    
+
     def generate_maze(self, num_rooms):
         """Generate a spatially consistent maze using grid-based generation"""
-        # Start at origin
-        current_pos = (0, 0)
-        self.room_positions[0] = current_pos
-        self.grid[current_pos] = 0
-        self.rooms[0] = Room(0, False)
-        
-        # Direction mappings
-        direction_vectors = {
-            'north': (0, -1),
-            'south': (0, 1),
-            'east': (1, 0),
-            'west': (-1, 0)
-        }
-        opposite = {
-            'north': 'south',
-            'south': 'north',
-            'east': 'west',
-            'west': 'east'
+        layout = generate_layout(num_rooms, loop_chance=self.loop_chance, rng=random.Random(self.seed))
+        self.xs = layout.xs
+        self.ys = layout.ys
+        self.masks = layout.masks
+
+        # Build the dense grid index over the bounding box
+        start_time = time.perf_counter()
+        if self.num_rooms:
+            self.min_x, self.min_y = min(self.xs), min(self.ys)
+            self.grid_width = max(self.xs) - self.min_x + 1
+            self.grid_height = max(self.ys) - self.min_y + 1
+            self.cells = array('i', [-1]) * (self.grid_width * self.grid_height)
+            cells = self.cells
+            min_x, min_y, height = self.min_x, self.min_y, self.grid_height
+            for room_id, (x, y) in enumerate(zip(self.xs, self.ys)):
+                cells[(x - min_x) * height + y - min_y] = room_id
+        index_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        self.build_distance_field()
+        distance_seconds = time.perf_counter() - start_time
+
+        self.generation_report = {
+            'rooms': self.num_rooms,
+            'loops': layout.loops,
+            'goal_distance': self.distance_to_goal(self.start_room_id) if self.num_rooms else -1,
+            'layout_seconds': layout.seconds,
+            'index_seconds': index_seconds,
+            'distance_seconds': distance_seconds,
+            'total_seconds': layout.seconds + index_seconds + distance_seconds,
+            'storage_bytes': self.get_storage_bytes()
         }
-        
-        # Generate rooms using random walk with backtracking
-        room_id = 1
-        visited = [0]
-        frontier = [0]  # Rooms that can be expanded from
-        
-        while room_id < num_rooms and frontier:
-            # Pick a random room from frontier to expand from
-            from_room_id = random.choice(frontier)
-            from_pos = self.room_positions[from_room_id]
-            
-            # Find available directions
-            available_dirs = []
-            for direction, (dx, dy) in direction_vectors.items():
-                new_pos = (from_pos[0] + dx, from_pos[1] + dy)
-                # Check if this position is free
-                if new_pos not in self.grid:
-                    available_dirs.append((direction, new_pos))
-            
-            if not available_dirs:
-                # No more directions from this room, remove from frontier
-                frontier.remove(from_room_id)
-                continue
-            
-            # Choose a random available direction
-            direction, new_pos = random.choice(available_dirs)
-            
-            # Create new room
-            is_goal = (room_id == self.goal_room_id)
-            self.rooms[room_id] = Room(room_id, is_goal)
-            self.room_positions[room_id] = new_pos
-            self.grid[new_pos] = room_id
-            
-            # Connect the rooms bidirectionally
-            self.rooms[from_room_id].add_connection(direction, room_id)
-            self.rooms[room_id].add_connection(opposite[direction], from_room_id)
-            
-            # Add new room to frontier
-            frontier.append(room_id)
-            visited.append(room_id)
-            
-            # Occasionally add extra connections to create loops (20% chance)
-            if random.random() < 0.2:
-                for direction, (dx, dy) in direction_vectors.items():
-                    neighbor_pos = (new_pos[0] + dx, new_pos[1] + dy)
-                    if neighbor_pos in self.grid:
-                        neighbor_id = self.grid[neighbor_pos]
-                        # Only connect if not already connected
-                        if direction not in self.rooms[room_id].connections:
-                            self.rooms[room_id].add_connection(direction, neighbor_id)
-                            self.rooms[neighbor_id].add_connection(opposite[direction], room_id)
-                            break
-            
-            room_id += 1
-    
+
+    def get_storage_bytes(self):
+        """Bytes held by the compact layout arrays (not counting live rooms)"""
+        return (len(self.xs) * self.xs.itemsize + len(self.ys) * self.ys.itemsize +
+                len(self.masks) + len(self.cells) * self.cells.itemsize +
+                len(self.distances) * self.distances.itemsize + len(self.next_hops))
+
+    def build_distance_field(self):
+        """BFS from the goal filling distances and next_hops for every room"""
+        self.distances = array('i', [-1]) * self.num_rooms
+        self.next_hops = bytearray([NO_HOP]) * self.num_rooms
+        if self.num_rooms:
+            self.distances[self.goal_room_id] = 0
+            self.spread_distances(deque([self.goal_room_id]))
+
+    def spread_distances(self, queue):
+        """Relax distances outward from the rooms in queue until nothing gets shorter"""
+        distances = self.distances
+        next_hops = self.next_hops
+        masks = self.masks
+        xs = self.xs
+        ys = self.ys
+        cells = self.cells
+        min_x, min_y, height = self.min_x, self.min_y, self.grid_height
+        # For each of the 16 masks: (grid index offset, hop back) of every exit.
+        # Connected neighbors are always inside the bounding box.
+        offsets = [dx * height + dy for dx, dy in zip(DIRECTION_DX, DIRECTION_DY)]
+        exits = [tuple((offsets[d], OPPOSITE[d]) for d in range(4) if mask & (1 << d)) for mask in range(16)]
+        popleft = queue.popleft
+        append = queue.append
+        while queue:
+            room_id = popleft()
+            distance = distances[room_id] + 1
+            cell = (xs[room_id] - min_x) * height + ys[room_id] - min_y
+            for offset, hop in exits[masks[room_id]]:
+                neighbor_id = cells[cell + offset]
+                known = distances[neighbor_id]
+                if known < 0 or known > distance:
+                    distances[neighbor_id] = distance
+                    next_hops[neighbor_id] = hop
+                    append(neighbor_id)
+
+    def distance_to_goal(self, room_id):
+        """Exits on the shortest path from room_id to the goal, or -1 if there is none"""
+        return self.distances[room_id]
+
+    def next_direction(self, room_id):
+        """Exit of room_id that starts a shortest path to the goal (None at the goal)"""
+        hop = self.next_hops[room_id]
+        return None if hop == NO_HOP else DIRECTIONS[hop]
+
+    def has_room(self, room_id):
+        return isinstance(room_id, int) and 0 <= room_id < self.num_rooms
+
+    def room_ids(self):
+        return range(self.num_rooms)
+
+    def get_position(self, room_id):
+        return (self.xs[room_id], self.ys[room_id])
+
+    def room_at(self, x, y):
+        """Room id at grid position (x, y), or -1 if the cell is empty"""
+        gx = x - self.min_x
+        gy = y - self.min_y
+        if 0 <= gx < self.grid_width and 0 <= gy < self.grid_height:
+            return self.cells[gx * self.grid_height + gy]
+        return -1
+
+    def get_connections(self, room_id):
+        """{direction: room_id} read straight from the connection mask"""
+        mask = self.masks[room_id]
+        x = self.xs[room_id]
+        y = self.ys[room_id]
+        return {direction: self.room_at(x + DIRECTION_DX[d], y + DIRECTION_DY[d])
+                for d, direction in enumerate(DIRECTIONS) if mask & (1 << d)}
+
+    def connect(self, room_id, direction):
+        """Open a door from room_id to its grid neighbor in direction (both ways)"""
+        d = DIRECTIONS.index(direction)
+        neighbor_id = self.room_at(self.xs[room_id] + DIRECTION_DX[d], self.ys[room_id] + DIRECTION_DY[d])
+        if neighbor_id < 0:
+            raise ValueError(f"room {room_id} has no neighbor to the {direction}")
+        self.masks[room_id] |= DIRECTION_BITS[direction]
+        self.masks[neighbor_id] |= 1 << OPPOSITE[d]
+
+        # A new door can only shorten paths: relax from whichever side got closer
+        distances = self.distances
+        for near_id, far_id, hop in ((room_id, neighbor_id, OPPOSITE[d]), (neighbor_id, room_id, d)):
+            if distances[near_id] >= 0 and (distances[far_id] < 0 or distances[far_id] > distances[near_id] + 1):
+                distances[far_id] = distances[near_id] + 1
+                self.next_hops[far_id] = hop
+                self.spread_distances(deque([far_id]))
+
+        # Keep materialized rooms in sync with the mask
+        if room_id in self.live_rooms:
+            self.live_rooms[room_id].add_connection(direction, neighbor_id)
+        if neighbor_id in self.live_rooms:
+            self.live_rooms[neighbor_id].add_connection(DIRECTIONS[OPPOSITE[d]], room_id)
+        return neighbor_id
+
+    def get_room_rng(self, room_id):
+        """Deterministic RNG for one room's flavor"""
+        return random.Random(self.seed * 1_000_003 + room_id)
+
+    def visit(self, room_id):
+        """Called when the player enters a room (streaming mazes load and drop chunks here)"""
+        pass
+
     def get_room(self, room_id):
-        return self.rooms.get(room_id)
+        room = self.live_rooms.get(room_id)
+        if room is not None:
+            return room
+        if not self.has_room(room_id):
+            return None
+
+        room = Room(room_id, room_id == self.goal_room_id, rng=self.get_room_rng(room_id))
+        room.connections.update(self.get_connections(room_id))
+        self.live_rooms[room_id] = room
+        return room
+
+    def release_room(self, room):
+        """Forget a materialized room; get_room rebuilds the same one from the maze seed"""
+        if self.live_rooms.get(room.id) is room:
+            del self.live_rooms[room.id]
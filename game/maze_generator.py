@@ -0,0 +1,198 @@
+import random
+import time
+from array import array
+
+# Direction order matches the order the original generator tried them in
+DIRECTIONS = ('north', 'south', 'east', 'west')
+DIRECTION_DX = (0, 0, 1, -1)
+DIRECTION_DY = (-1, 1, 0, 0)
+OPPOSITE = (1, 0, 3, 2)  # Index of the opposite direction
+DIRECTION_BITS = {direction: 1 << d for d, direction in enumerate(DIRECTIONS)}
+
+class MazeLayout:
+    """Room positions and connections produced by generate_layout.
+
+    masks holds one byte per room with bit 1 << d set when the room has an
+    exit in DIRECTIONS[d]. The room on the other side is the grid neighbor
+    in that direction.
+    """
+
+    def __init__(self, num_rooms):
+        self.num_rooms = num_rooms
+        self.xs = array('i')
+        self.ys = array('i')
+        self.masks = bytearray()
+        self.seconds = 0.0
+        self.loops = 0
+
+def generate_layout(num_rooms, loop_chance=0.2, rng=random):
+    """Grow a spanning tree of rooms on the grid, adding occasional loops.
+
+    Rooms are added one at a time next to a random frontier room (a room
+    with at least one free neighboring cell). Each new room has a
+    loop_chance to also open a door to one other existing neighbor. The
+    frontier is tracked explicitly with O(1) swap-pop removal, and every
+    room keeps a count of its free neighbors, so saturated rooms leave the
+    frontier as soon as they fill up instead of being sampled and discarded.
+    """
+    start_time = time.perf_counter()
+    layout = MazeLayout(num_rooms)
+    if num_rooms <= 0:
+        return layout
+
+    xs = layout.xs
+    ys = layout.ys
+    masks = layout.masks
+    xs.append(0)
+    ys.append(0)
+    masks.append(0)
+
+    # Cells are packed into single ints; coordinates never leave +/- num_rooms
+    offset = num_rooms + 1
+    stride = 2 * offset + 1
+    grid = {offset * stride + offset: 0}  # packed (x, y): room_id
+    neighbor_offsets = tuple(dx * stride + dy for dx, dy in zip(DIRECTION_DX, DIRECTION_DY))
+
+    free_neighbors = array('b', [4])  # Free cells around each room
+    frontier = [0]
+    frontier_index = array('i', [0])  # Position in frontier, -1 once saturated
+
+    def remove_from_frontier(room_id):
+        index = frontier_index[room_id]
+        last = frontier.pop()
+        if last != room_id:
+            frontier[index] = last
+            frontier_index[last] = index
+        frontier_index[room_id] = -1
+
+    # int(random() * n) instead of randrange: a fraction of the cost per call
+    chance = rng.random
+    grid_get = grid.get
+    cells = [offset * stride + offset]  # Packed cell of each room
+    room_id = 1
+    while room_id < num_rooms and frontier:
+        # Pick a random expandable room and a random free side of it
+        from_room_id = frontier[int(chance() * len(frontier))]
+        from_cell = cells[from_room_id]
+        available = [d for d in range(4) if from_cell + neighbor_offsets[d] not in grid]
+        direction = available[int(chance() * len(available))]
+        cell = from_cell + neighbor_offsets[direction]
+
+        # Create new room
+        xs.append(xs[from_room_id] + DIRECTION_DX[direction])
+        ys.append(ys[from_room_id] + DIRECTION_DY[direction])
+        masks.append(1 << OPPOSITE[direction])
+        cells.append(cell)
+        grid[cell] = room_id
+
+        # Connect the rooms bidirectionally
+        masks[from_room_id] |= 1 << direction
+
+        # Update free-neighbor counts; rooms that just filled up leave the frontier
+        around = [grid_get(cell + step) for step in neighbor_offsets]
+        free = 4
+        for neighbor_id in around:
+            if neighbor_id is not None:
+                free -= 1
+                free_neighbors[neighbor_id] -= 1
+                if not free_neighbors[neighbor_id]:
+                    remove_from_frontier(neighbor_id)
+        free_neighbors.append(free)
+        if free:
+            frontier_index.append(len(frontier))
+            frontier.append(room_id)
+        else:
+            frontier_index.append(-1)
+
+        # Occasionally add extra connections to create loops
+        if free < 3 and chance() < loop_chance:
+            for d, neighbor_id in enumerate(around):
+                # Only connect if not already connected
+                if neighbor_id is not None and not masks[room_id] & (1 << d):
+                    masks[room_id] |= 1 << d
+                    masks[neighbor_id] |= 1 << OPPOSITE[d]
+                    layout.loops += 1
+                    break
+
+        room_id += 1
+
+    layout.seconds = time.perf_counter() - start_time
+    return layout
+
+_chunk_adjacency = {}
+
+def get_chunk_adjacency(size):
+    """For each cell of a size x size block (index x * size + y), its in-bounds (direction, cell) pairs"""
+    adjacency = _chunk_adjacency.get(size)
+    if adjacency is None:
+        adjacency = []
+        for x in range(size):
+            for y in range(size):
+                around = []
+                for d in range(4):
+                    nx = x + DIRECTION_DX[d]
+                    ny = y + DIRECTION_DY[d]
+                    if 0 <= nx < size and 0 <= ny < size:
+                        around.append((d, nx * size + ny))
+                adjacency.append(tuple(around))
+        _chunk_adjacency[size] = adjacency
+    return adjacency
+
+def generate_chunk(size, loop_chance=0.2, rng=random):
+    """Connection masks for a spanning tree over every cell of a size x size block.
+
+    Uses the same frontier growth and loop rule as generate_layout, but the
+    grid is bounded and every cell becomes a room. Cells are indexed
+    x * size + y.
+    """
+    count = size * size
+    adjacency = get_chunk_adjacency(size)
+    masks = bytearray(count)
+    placed = bytearray(count)
+    free_neighbors = bytearray(len(around) for around in adjacency)
+    frontier_index = array('i', [-1]) * count
+    chance = rng.random
+
+    start = int(chance() * count)
+    placed[start] = 1
+    frontier = [start]
+    frontier_index[start] = 0
+
+    def remove_from_frontier(cell):
+        index = frontier_index[cell]
+        last = frontier.pop()
+        if last != cell:
+            frontier[index] = last
+            frontier_index[last] = index
+        frontier_index[cell] = -1
+
+    for _ in range(count - 1):
+        from_cell = frontier[int(chance() * len(frontier))]
+        available = [(d, n) for d, n in adjacency[from_cell] if not placed[n]]
+        direction, cell = available[int(chance() * len(available))]
+        placed[cell] = 1
+        masks[from_cell] |= 1 << direction
+        masks[cell] |= 1 << OPPOSITE[direction]
+
+        free = 0
+        for d, n in adjacency[cell]:
+            if placed[n]:
+                free_neighbors[n] -= 1
+                if not free_neighbors[n]:
+                    remove_from_frontier(n)
+            else:
+                free += 1
+        free_neighbors[cell] = free
+        if free:
+            frontier_index[cell] = len(frontier)
+            frontier.append(cell)
+
+        # Occasionally add extra connections to create loops
+        if chance() < loop_chance:
+            for d, n in adjacency[cell]:
+                if placed[n] and not masks[cell] & (1 << d):
+                    masks[cell] |= 1 << d
+                    masks[n] |= 1 << OPPOSITE[d]
+                    break
+
+    return masks
@@ -0,0 +1,272 @@
+"""Binary maze snapshots that load by memory-mapping the file.
+
+A snapshot is a fixed header followed by one column per room field, the
+dense grid index and, optionally, the saved contents of some rooms:
+
+    header          HEADER (magic, version, room count, seed, grid box, ...)
+    xs, ys          int32 per room
+    distances       int32 per room (exits to the goal, -1 if unreachable)
+    content_seeds   uint64 per room
+    masks           uint8 per room (connection bits, see DIRECTION_BITS)
+    next_hops       uint8 per room (DIRECTIONS index toward the goal or NO_HOP)
+    names, themes   uint8 per room (indexes into Room.ROOM_NAMES / ROOM_THEMES)
+    fake_exits      uint8 per room (fake exit direction index, bit 2 if shown)
+    cells           int32 per grid cell (room id or -1)
+    contents        room ids (uint32), blob offsets (uint64, one extra at the
+                    end) and a blob of per-room records
+
+Every column is little-endian and starts on an 8-byte boundary, so
+loading maps the file and casts each column to a memoryview in place. No
+room is decoded until the game asks for it. The mapping is copy-on-write,
+so connect() can still change a loaded maze without touching the file.
+
+Run as a module to pre-generate a snapshot:
+
+    python -m game.maze_snapshot floor.maze --rooms 1000000 --seed 42
+"""
+import argparse
+import bisect
+import mmap
+import struct
+import sys
+import time
+from array import array
+from game.maze import Maze, RoomsView, PositionsView, GridView
+from game.obstacle import Obstacle
+from game.room import Room
+
+MAGIC = b'MAZESNAP'
+VERSION = 1
+
+FLAG_CONTENTS = 1  # The file has a contents section
+
+# magic, version, flags, rooms, seed, start, goal, min_x, min_y, grid_width, grid_height, rooms with contents
+HEADER = struct.Struct('<8sHHQQiiiiiiQ4x')
+
+# Room columns in file order: (attribute, array typecode)
+ROOM_COLUMNS = (
+    ('xs', 'i'),
+    ('ys', 'i'),
+    ('distances', 'i'),
+    ('content_seeds', 'Q'),
+    ('masks', 'B'),
+    ('next_hops', 'B'),
+    ('names', 'B'),
+    ('themes', 'B'),
+    ('fake_exits', 'B')
+)
+
+# Saved room contents
+STATIC_TYPES = ('slot_machine',)
+CONTENTS_RECORD = struct.Struct('<HHH')  # slot machines, wandering obstacles, NPCs
+STATIC_RECORD = struct.Struct('<Biiii')  # type index, x, y, width, height
+OBSTACLE_RECORD = struct.Struct('<ddddBxH')  # x, y, direction, speed, type index, change interval
+NPC_RECORD = struct.Struct('<dd?xH')  # x, y, is lying, dialogue length in bytes (UTF-8 follows)
+
+def padding(offset):
+    return -offset % 8
+
+def encode_contents(contents):
+    """Bytes of one room's contents record"""
+    parts = [CONTENTS_RECORD.pack(len(contents['static_obstacles']), len(contents['obstacles']), len(contents['npcs']))]
+    for obj in contents['static_obstacles']:
+        parts.append(STATIC_RECORD.pack(STATIC_TYPES.index(obj['type']), obj['x'], obj['y'], obj['width'], obj['height']))
+    for x, y, obstacle_type, direction, speed, change_interval in contents['obstacles']:
+        parts.append(OBSTACLE_RECORD.pack(x, y, direction, speed, Obstacle.TYPES.index(obstacle_type), change_interval))
+    for x, y, dialogue, is_lying in contents['npcs']:
+        text = dialogue.encode('utf-8')
+        parts.append(NPC_RECORD.pack(x, y, is_lying, len(text)))
+        parts.append(text)
+    return b''.join(parts)
+
+def decode_contents(view, offset):
+    """Room contents (as Room.get_saved_contents returns them) from the record at offset"""
+    num_static, num_obstacles, num_npcs = CONTENTS_RECORD.unpack_from(view, offset)
+    offset += CONTENTS_RECORD.size
+    contents = {'static_obstacles': [], 'obstacles': [], 'npcs': []}
+    for _ in range(num_static):
+        type_index, x, y, width, height = STATIC_RECORD.unpack_from(view, offset)
+        offset += STATIC_RECORD.size
+        contents['static_obstacles'].append({'type': STATIC_TYPES[type_index], 'x': x, 'y': y, 'width': width, 'height': height})
+    for _ in range(num_obstacles):
+        x, y, direction, speed, type_index, change_interval = OBSTACLE_RECORD.unpack_from(view, offset)
+        offset += OBSTACLE_RECORD.size
+        contents['obstacles'].append((x, y, Obstacle.TYPES[type_index], direction, speed, change_interval))
+    for _ in range(num_npcs):
+        x, y, is_lying, length = NPC_RECORD.unpack_from(view, offset)
+        offset += NPC_RECORD.size
+        dialogue = bytes(view[offset:offset + length]).decode('utf-8')
+        offset += length
+        contents['npcs'].append((x, y, dialogue, is_lying))
+    return contents
+
+def get_flavor_columns(maze):
+    """names, themes, fake_exits and content_seeds columns for every room of maze"""
+    names = bytearray(maze.num_rooms)
+    themes = bytearray(maze.num_rooms)
+    fake_exits = bytearray(maze.num_rooms)
+    content_seeds = array('Q', bytes(8 * maze.num_rooms))
+    for room_id in range(maze.num_rooms):
+        room = maze.live_rooms.get(room_id)
+        if room is None:
+            # Same draws get_room would make, without building the Room
+            name_index, theme_index, has_fake_exit, fake_exit_index, content_seed = \
+                Room.roll_flavor(maze.get_room_rng(room_id), room_id == maze.goal_room_id)
+        else:
+            name_index = Room.ROOM_NAMES.index(room.name) if not room.is_goal else 0
+            theme_index = Room.ROOM_THEMES.index(room.theme)
+            has_fake_exit = room.has_fake_exit
+            fake_exit_index = Room.FAKE_EXIT_DIRECTIONS.index(room.fake_exit_direction)
+            content_seed = room.content_seed
+        names[room_id] = name_index
+        themes[room_id] = theme_index
+        fake_exits[room_id] = fake_exit_index | (4 if has_fake_exit else 0)
+        content_seeds[room_id] = content_seed
+    return names, themes, fake_exits, content_seeds
+
+def save_maze(maze, path, contents=False):
+    """Write maze to path. With contents, rooms whose contents are initialized keep them exactly."""
+    if not isinstance(maze, Maze):
+        raise TypeError("only fixed-size Maze layouts can be saved (streaming mazes regenerate from their seed)")
+    names, themes, fake_exits, content_seeds = get_flavor_columns(maze)
+    columns = {
+        'xs': maze.xs, 'ys': maze.ys, 'distances': maze.distances, 'content_seeds': content_seeds,
+        'masks': maze.masks, 'next_hops': maze.next_hops, 'names': names, 'themes': themes, 'fake_exits': fake_exits
+    }
+
+    # Contents section: sorted room ids, offsets into the blob (plus its end), blob
+    content_rooms = array('I')
+    content_offsets = array('Q', [0])
+    blob = bytearray()
+    if contents:
+        for room_id in sorted(maze.live_rooms):
+            room = maze.live_rooms[room_id]
+            if room.initialized:
+                content_rooms.append(room_id)
+                blob += encode_contents(room.get_saved_contents())
+                content_offsets.append(len(blob))
+
+    header = HEADER.pack(MAGIC, VERSION, FLAG_CONTENTS if contents else 0, maze.num_rooms, maze.seed & 0xFFFFFFFFFFFFFFFF,
+                         maze.start_room_id, maze.goal_room_id, maze.min_x, maze.min_y,
+                         maze.grid_width, maze.grid_height, len(content_rooms))
+    sections = [array(typecode, columns[name]) for name, typecode in ROOM_COLUMNS]
+    sections.append(array('i', maze.cells))
+    if contents:
+        sections += [content_rooms, content_offsets]
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        offset = len(header)
+        for column in sections:
+            if sys.byteorder == 'big':
+                column.byteswap()
+            data = column.tobytes()
+            f.write(data)
+            offset += len(data)
+            f.write(bytes(padding(offset)))
+            offset += padding(offset)
+        f.write(blob)
+
+class SnapshotMaze(Maze):
+    """A Maze read from a snapshot file instead of generated.
+
+    Loading only validates the header and maps the file; columns are
+    memoryviews into the mapping, so pages are read as rooms are touched.
+    Rooms get their flavor from the snapshot, and rooms saved with their
+    contents rebuild exactly those contents every time they are entered.
+    """
+
+    def __init__(self, path):
+        start_time = time.perf_counter()
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        view = memoryview(self.mmap)
+        if len(view) < HEADER.size:
+            raise ValueError(f"{path} is not a maze snapshot")
+        (magic, version, flags, num_rooms, self.seed, self.start_room_id, self.goal_room_id,
+         self.min_x, self.min_y, self.grid_width, self.grid_height, num_contents) = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a maze snapshot")
+        if version != VERSION:
+            raise ValueError(f"{path} is maze snapshot version {version}, this game reads version {VERSION}")
+        self.num_rooms = num_rooms
+
+        offset = HEADER.size
+        for name, typecode in ROOM_COLUMNS:
+            column, offset = self.read_column(view, offset, typecode, num_rooms)
+            setattr(self, name, column)
+        self.cells, offset = self.read_column(view, offset, 'i', self.grid_width * self.grid_height)
+        self.content_rooms = ()
+        if flags & FLAG_CONTENTS:
+            self.content_rooms, offset = self.read_column(view, offset, 'I', num_contents)
+            self.content_offsets, offset = self.read_column(view, offset, 'Q', num_contents + 1)
+        self.contents_view = view[offset:]
+
+        self.live_rooms = {}  # room_id: materialized Room
+        self.rooms = RoomsView(self)
+        self.room_positions = PositionsView(self)
+        self.grid = GridView(self)
+
+        self.generation_report = {
+            'rooms': self.num_rooms,
+            'snapshot': path,
+            'goal_distance': self.distance_to_goal(self.start_room_id) if self.num_rooms else -1,
+            'saved_contents': num_contents,
+            'total_seconds': time.perf_counter() - start_time,
+            'storage_bytes': self.get_storage_bytes()
+        }
+
+    @staticmethod
+    def read_column(view, offset, typecode, count):
+        """(column of count items at offset, offset of the next column)"""
+        size = array(typecode).itemsize * count
+        column = view[offset:offset + size].cast(typecode)
+        if sys.byteorder == 'big' and column.itemsize > 1:
+            column = array(typecode, column)
+            column.byteswap()
+        end = offset + size
+        return column, end + padding(end)
+
+    def get_saved_contents(self, room_id):
+        """Contents saved for room_id, or None if it rebuilds them from its seed"""
+        index = bisect.bisect_left(self.content_rooms, room_id)
+        if index == len(self.content_rooms) or self.content_rooms[index] != room_id:
+            return None
+        return decode_contents(self.contents_view, self.content_offsets[index])
+
+    def get_room(self, room_id):
+        room = self.live_rooms.get(room_id)
+        if room is not None:
+            return room
+        if not self.has_room(room_id):
+            return None
+
+        fake_exit = self.fake_exits[room_id]
+        flavor = (self.names[room_id], self.themes[room_id], bool(fake_exit & 4), fake_exit & 3,
+                  self.content_seeds[room_id])
+        room = Room(room_id, room_id == self.goal_room_id, flavor=flavor)
+        room.connections.update(self.get_connections(room_id))
+        room.saved_contents = self.get_saved_contents(room_id)
+        self.live_rooms[room_id] = room
+        return room
+
+def load_maze(path):
+    """Map a snapshot written by save_maze"""
+    return SnapshotMaze(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a maze and save it as a snapshot")
+    parser.add_argument('path')
+    parser.add_argument('--rooms', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    maze = Maze(args.rooms, seed=args.seed)
+    start_time = time.perf_counter()
+    save_maze(maze, args.path)
+    print(f"{args.rooms} rooms (seed {maze.seed}) generated in {maze.generation_report['total_seconds']:.2f} s, "
+          f"saved in {time.perf_counter() - start_time:.2f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+import heapq
+import math
+from collections import OrderedDict
+import numpy as np
+from game.constants import *
+
+# Navigation grid resolution in pixels
+NAV_CELL = 20
+NAV_COLUMNS = SCREEN_WIDTH // NAV_CELL
+NAV_ROWS = SCREEN_HEIGHT // NAV_CELL
+
+# Clearance between slot machines and the center of any walkable cell: half a walker
+# plus half a cell, since a walker can be anywhere in its cell
+NAV_CLEARANCE = 26
+
+# Path cost multiplier for cells in a safe zone around an exit
+SAFE_ZONE_COST = 5
+
+NEIGHBORS = [(dx, dy, math.hypot(dx, dy)) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+def get_exit_point(direction):
+    """Screen point just outside the doorway of an exit"""
+    if direction == 'north':
+        return (SCREEN_WIDTH // 2, ROOM_PADDING - NAV_CELL // 2)
+    if direction == 'south':
+        return (SCREEN_WIDTH // 2, SCREEN_HEIGHT - ROOM_PADDING + NAV_CELL // 2)
+    if direction == 'east':
+        return (SCREEN_WIDTH - ROOM_PADDING + NAV_CELL // 2, SCREEN_HEIGHT // 2)
+    return (ROOM_PADDING - NAV_CELL // 2, SCREEN_HEIGHT // 2)
+
+class NavGrid:
+    """Walkable cells and their costs for one room layout.
+
+    Cells are NAV_CELL pixels square, indexed column * NAV_ROWS + row, and
+    describe where a walker's center may be. Cells outside the walls are
+    blocked except the doorways of the room's exits; so are cells within
+    NAV_CLEARANCE of a slot machine. Cells in the safe zone of an exit cost
+    SAFE_ZONE_COST times as much to cross.
+    """
+
+    def __init__(self, connections, static_rects):
+        self.connections = frozenset(connections)
+        centers_x = (np.arange(NAV_COLUMNS) * NAV_CELL + NAV_CELL / 2).repeat(NAV_ROWS)
+        centers_y = np.tile(np.arange(NAV_ROWS) * NAV_CELL + NAV_CELL / 2, NAV_COLUMNS)
+        self.centers_x = centers_x
+        self.centers_y = centers_y
+
+        inside = ((centers_x >= ROOM_PADDING) & (centers_x <= SCREEN_WIDTH - ROOM_PADDING) &
+                  (centers_y >= ROOM_PADDING) & (centers_y <= SCREEN_HEIGHT - ROOM_PADDING))
+        near_x = np.abs(centers_x - SCREEN_WIDTH // 2) < EXIT_SIZE // 2
+        near_y = np.abs(centers_y - SCREEN_HEIGHT // 2) < EXIT_SIZE // 2
+        self.doorways = {
+            'north': near_x & (centers_y < ROOM_PADDING) & (centers_y >= ROOM_PADDING - NAV_CELL),
+            'south': near_x & (centers_y > SCREEN_HEIGHT - ROOM_PADDING) & (centers_y <= SCREEN_HEIGHT - ROOM_PADDING + NAV_CELL),
+            'east': near_y & (centers_x > SCREEN_WIDTH - ROOM_PADDING) & (centers_x <= SCREEN_WIDTH - ROOM_PADDING + NAV_CELL),
+            'west': near_y & (centers_x < ROOM_PADDING) & (centers_x >= ROOM_PADDING - NAV_CELL)
+        }
+        walkable = inside.copy()
+        for direction in self.connections:
+            walkable |= self.doorways[direction]
+        for x, y, width, height in static_rects:
+            walkable &= ~((centers_x > x - NAV_CLEARANCE) & (centers_x < x + width + NAV_CLEARANCE) &
+                          (centers_y > y - NAV_CLEARANCE) & (centers_y < y + height + NAV_CLEARANCE))
+        self.walkable = walkable
+
+        safe = np.zeros(len(centers_x), dtype=bool)
+        if 'north' in self.connections:
+            safe |= (np.abs(centers_x - SCREEN_WIDTH // 2) < SAFE_ZONE_RADIUS) & (centers_y < ROOM_PADDING + SAFE_ZONE_RADIUS)
+        if 'south' in self.connections:
+            safe |= (np.abs(centers_x - SCREEN_WIDTH // 2) < SAFE_ZONE_RADIUS) & (centers_y > SCREEN_HEIGHT - ROOM_PADDING - SAFE_ZONE_RADIUS)
+        if 'east' in self.connections:
+            safe |= (centers_x > SCREEN_WIDTH - ROOM_PADDING - SAFE_ZONE_RADIUS) & (np.abs(centers_y - SCREEN_HEIGHT // 2) < SAFE_ZONE_RADIUS)
+        if 'west' in self.connections:
+            safe |= (centers_x < ROOM_PADDING + SAFE_ZONE_RADIUS) & (np.abs(centers_y - SCREEN_HEIGHT // 2) < SAFE_ZONE_RADIUS)
+        self.costs = np.where(safe, SAFE_ZONE_COST, 1.0)
+
+    def build_flow_field(self, exit_direction):
+        """Dijkstra from the exit's doorway over walkable cells, as a FlowField"""
+        walkable = self.walkable.tolist()
+        costs = self.costs.tolist()
+        distances = [math.inf] * len(walkable)
+        next_cells = [-1] * len(walkable)
+        heap = []
+        for cell in np.flatnonzero(self.doorways[exit_direction] & self.walkable).tolist():
+            distances[cell] = 0.0
+            heap.append((0.0, cell))
+        heapq.heapify(heap)
+
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance > distances[cell]:
+                continue
+            column, row = divmod(cell, NAV_ROWS)
+            for dx, dy, length in NEIGHBORS:
+                nx = column + dx
+                ny = row + dy
+                if not (0 <= nx < NAV_COLUMNS and 0 <= ny < NAV_ROWS):
+                    continue
+                neighbor = nx * NAV_ROWS + ny
+                if not walkable[neighbor]:
+                    continue
+                # No cutting corners past a blocked cell
+                if dx and dy and not (walkable[nx * NAV_ROWS + row] and walkable[column * NAV_ROWS + ny]):
+                    continue
+                candidate = distance + length * costs[neighbor]
+                if candidate < distances[neighbor]:
+                    distances[neighbor] = candidate
+                    next_cells[neighbor] = cell
+                    heapq.heappush(heap, (candidate, neighbor))
+
+        return FlowField(self, exit_direction, np.array(next_cells))
+
+class FlowField:
+    """Unit heading for every cell of a NavGrid toward one exit.
+
+    Each reachable cell points at the center of the next cell on its
+    cheapest path. Doorway, blocked and unreachable cells point straight
+    at the exit, so a walker that ends up off the grid still gets home.
+    """
+
+    def __init__(self, grid, exit_direction, next_cells):
+        exit_x, exit_y = get_exit_point(exit_direction)
+        self.exit_direction = exit_direction
+        routed = next_cells >= 0
+        aim_x = np.where(routed, grid.centers_x[next_cells], exit_x)
+        aim_y = np.where(routed, grid.centers_y[next_cells], exit_y)
+        heading_x = aim_x - grid.centers_x
+        heading_y = aim_y - grid.centers_y
+        length = np.hypot(heading_x, heading_y)
+        length[length == 0] = 1
+        self.heading_x = heading_x / length
+        self.heading_y = heading_y / length
+        self.headings = list(zip(self.heading_x.tolist(), self.heading_y.tolist()))  # For get_heading
+
+    def get_headings(self, x, y):
+        """Headings at screen points (arrays of walker centers)"""
+        columns = np.minimum(np.maximum(x // NAV_CELL, 0), NAV_COLUMNS - 1).astype(np.int64)
+        rows = np.minimum(np.maximum(y // NAV_CELL, 0), NAV_ROWS - 1).astype(np.int64)
+        cells = columns * NAV_ROWS + rows
+        return self.heading_x[cells], self.heading_y[cells]
+
+    def get_heading(self, x, y):
+        """(heading x, heading y) at one screen point, without NumPy's per-call overhead"""
+        column = min(max(int(x // NAV_CELL), 0), NAV_COLUMNS - 1)
+        row = min(max(int(y // NAV_CELL), 0), NAV_ROWS - 1)
+        return self.headings[column * NAV_ROWS + row]
+
+class NavigationCache:
+    """Shared LRU of nav grids and flow fields keyed by room layout.
+
+    Every walker on the same route, in every room with the same exits and
+    slot machines, steers by one flow field, so pathfinding cost does not
+    grow with the spawn rate. A flow field toward an exit serves every
+    entrance, so fields are keyed by (layout, exit).
+
+    Callers on a time budget use peek_flow_field, which never builds: a
+    miss is queued, and build_pending builds queued fields one at a time
+    whenever there is time to spare.
+    """
+
+    def __init__(self, max_fields=64):
+        self.max_fields = max_fields
+        self.grids = OrderedDict()  # layout key: NavGrid
+        self.fields = OrderedDict()  # (layout key, exit direction): FlowField
+        self.pending = OrderedDict()  # (layout key, exit direction): (connections, static rects), oldest first
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+
+    def get_grid(self, key, connections, static_rects):
+        grid = self.grids.get(key)
+        if grid is not None:
+            self.grids.move_to_end(key)
+            return grid
+        grid = NavGrid(connections, static_rects)
+        self.grids[key] = grid
+        if len(self.grids) > self.max_fields:
+            self.grids.popitem(last=False)
+        return grid
+
+    def get_flow_field(self, key, exit_direction, connections, static_rects):
+        """Flow field toward exit_direction for the layout key, building it on a miss"""
+        field_key = (key, exit_direction)
+        field = self.fields.get(field_key)
+        if field is not None:
+            self.fields.move_to_end(field_key)
+            self.hits += 1
+            return field
+
+        self.misses += 1
+        field = self.get_grid(key, connections, static_rects).build_flow_field(exit_direction)
+        self.fields[field_key] = field
+        self.pending.pop(field_key, None)
+        if len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+        return field
+
+    def peek_flow_field(self, key, exit_direction, connections, static_rects):
+        """The flow field if it is already built, else None (and the build is queued)"""
+        field_key = (key, exit_direction)
+        field = self.fields.get(field_key)
+        if field is not None:
+            self.fields.move_to_end(field_key)
+            self.hits += 1
+        elif field_key not in self.pending:
+            self.pending[field_key] = (connections, static_rects)
+        return field
+
+    def build_pending(self):
+        """Build the oldest queued flow field; False if nothing was queued"""
+        if not self.pending:
+            return False
+        (key, exit_direction), (connections, static_rects) = self.pending.popitem(last=False)
+        self.get_flow_field(key, exit_direction, connections, static_rects)
+        return True
+
+    def clear(self):
+        self.grids.clear()
+        self.fields.clear()
+        self.pending.clear()
+
+    def get_stats(self):
+        return {
+            'grids': len(self.grids),
+            'fields': len(self.fields),
+            'pending': len(self.pending),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+# Shared cache used by every room
+navigation_cache = NavigationCache()
@@ -1,9 +1,21 @@
 import pygame
 import random
 from game.constants import *
+from game.geometry import Rect
+from game.text import render_text
+from game.sprites import sprite_cache, SPRITE_MARGIN
+from game.surface_pool import surface_pool
 
 class NPC:
-    def __init__(self, x, y, room_id, maze):
+    # Player must be closer than this (top-left to top-left) to talk
+    INTERACTION_DISTANCE = 60
+    
+    # Chance a new NPC lies (balance runs override it)
+    LYING_RATE = NPC_LYING_RATE
+    
+    def __init__(self, x, y, room_id, maze, rng=None):
+        if rng is None:
+            rng = random
         self.x = x
         self.y = y
         self.width = 35
@@ -12,33 +24,35 @@ class NPC:
         self.room_id = room_id
         
         # Generate dialogue based on maze structure
-        self.dialogue = self.generate_dialogue(maze)
-        self.is_lying = random.random() < 0.4  # 40% chance NPC lies
+        self.dialogue = self.generate_dialogue(maze, rng)
+        self.is_lying = rng.random() < self.LYING_RATE
         
         self.showing_dialogue = False
         self.dialogue_timer = 0
     
-    def generate_dialogue(self, maze):
+    def generate_dialogue(self, maze, rng=random):
         """Generate helpful (or misleading) directions"""
-        current_room = maze.get_room(self.room_id)
-        goal_pos = maze.room_positions[maze.goal_room_id]
-        current_pos = maze.room_positions[self.room_id]
-        
-        # Calculate general direction to goal
-        dx = goal_pos[0] - current_pos[0]
-        dy = goal_pos[1] - current_pos[1]
-        
+        # The exit that starts the shortest path, from the maze's goal distance field
         directions = []
-        if abs(dx) > abs(dy):
-            if dx > 0:
-                directions.append("east")
-            else:
-                directions.append("west")
+        next_direction = maze.next_direction(self.room_id)
+        if next_direction is not None:
+            directions.append(next_direction)
         else:
-            if dy > 0:
-                directions.append("south")
+            # Outside the distance field: fall back to the general direction of the goal
+            goal_pos = maze.room_positions[maze.goal_room_id]
+            current_pos = maze.room_positions[self.room_id]
+            dx = goal_pos[0] - current_pos[0]
+            dy = goal_pos[1] - current_pos[1]
+            if abs(dx) > abs(dy):
+                if dx > 0:
+                    directions.append("east")
+                else:
+                    directions.append("west")
             else:
-                directions.append("north")
+                if dy > 0:
+                    directions.append("south")
+                else:
+                    directions.append("north")
         
         # Generate dialogue
         phrases = [
@@ -48,7 +62,7 @@ class NPC:
             f"I think it's {directions[0]} from here.",
         ]
         
-        return random.choice(phrases)
+        return rng.choice(phrases)
     
     def get_lying_dialogue(self):
         """Return opposite or random wrong direction"""
@@ -67,12 +81,30 @@ class NPC:
         return self.dialogue
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        return Rect(self.x, self.y, self.width, self.height)
+    
+    def get_bounds(self):
+        """Screen rects covered by this NPC when drawn (figure, glow, "?" and dialogue)"""
+        center_x = int(self.x + self.width//2)
+        center_y = int(self.y + self.height//2)
+        
+        # Widest pulsing glow plus the "?" bubble floating above the head
+        glow_radius = self.width//2 + 10
+        top = center_y - self.width//2 - 15 - 14
+        bounds = [pygame.Rect(center_x - glow_radius - 1, top,
+                              glow_radius * 2 + 4, center_y + glow_radius + 3 - top)]
+        if self.showing_dialogue:
+            bounds.append(self.get_dialogue_box_rect(self.get_current_dialogue()))
+        return bounds
+    
+    def get_current_dialogue(self):
+        return self.dialogue if not self.is_lying else self.get_lying_dialogue()
     
     def check_interaction(self, player_rect):
         """Check if player is close enough to interact"""
-        distance = math.sqrt((self.x - player_rect.x)**2 + (self.y - player_rect.y)**2)
-        return distance < 60
+        dx = self.x - player_rect.x
+        dy = self.y - player_rect.y
+        return dx * dx + dy * dy < self.INTERACTION_DISTANCE * self.INTERACTION_DISTANCE
     
     def interact(self):
         """Show dialogue"""
@@ -85,29 +117,27 @@ class NPC:
             if self.dialogue_timer <= 0:
                 self.showing_dialogue = False
     
-    def draw(self, screen):
-        center_x = int(self.x + self.width//2)
-        center_y = int(self.y + self.height//2)
-        
+    @staticmethod
+    def draw_figure(screen, center_x, center_y, size, color):
+        """Draw the staff member centered on (center_x, center_y)"""
         # Draw shadow
-        pygame.draw.circle(screen, (0, 0, 0), (center_x + 2, center_y + 2), self.width//2)
+        pygame.draw.circle(screen, (0, 0, 0), (center_x + 2, center_y + 2), size//2)
         
         # Draw NPC as a helpful person
         # Body (purple shirt - Re:Invent staff)
-        pygame.draw.circle(screen, self.color, (center_x, center_y), self.width//2)
+        pygame.draw.circle(screen, color, (center_x, center_y), size//2)
         
         # Head
         head_color = (220, 180, 140)
-        pygame.draw.circle(screen, head_color, (center_x, center_y - 8), self.width//3)
+        pygame.draw.circle(screen, head_color, (center_x, center_y - 8), size//3)
         
         # Staff badge
         badge_rect = pygame.Rect(center_x - 8, center_y + 2, 16, 10)
         pygame.draw.rect(screen, WHITE, badge_rect)
-        pygame.draw.rect(screen, self.color, badge_rect, 1)
+        pygame.draw.rect(screen, color, badge_rect, 1)
         
         # Draw "STAFF" text on badge
-        font_tiny = pygame.font.Font(None, 12)
-        staff_text = font_tiny.render("STAFF", True, self.color)
+        staff_text = render_text("STAFF", 12, color)
         screen.blit(staff_text, (center_x - 10, center_y + 4))
         
         # Eyes
@@ -120,7 +150,36 @@ class NPC:
                       0, 3.14, 2)
         
         # Draw border
-        pygame.draw.circle(screen, WHITE, (center_x, center_y), self.width//2, 3)
+        pygame.draw.circle(screen, WHITE, (center_x, center_y), size//2, 3)
+    
+    @staticmethod
+    def draw_glow(screen, center_x, center_y, radius, color):
+        """Draw the translucent glow disc"""
+        with surface_pool.scratch((radius * 2, radius * 2), pygame.SRCALPHA) as glow_surface:
+            pygame.draw.circle(glow_surface, (*color, 50), (radius, radius), radius)
+            screen.blit(glow_surface, (center_x - radius, center_y - radius))
+    
+    @staticmethod
+    def draw_question_mark(screen, center_x, center_y, color):
+        """Draw the "?" bubble centered on (center_x, center_y)"""
+        text = render_text("?", 28, WHITE)
+        text_rect = text.get_rect(center=(center_x, center_y))
+        
+        # Draw background circle for "?"
+        pygame.draw.circle(screen, color, text_rect.center, 12)
+        pygame.draw.circle(screen, WHITE, text_rect.center, 12, 2)
+        screen.blit(text, text_rect)
+    
+    def draw(self, screen):
+        center_x = int(self.x + self.width//2)
+        center_y = int(self.y + self.height//2)
+        use_sprites = sprite_cache.enabled
+        
+        if use_sprites:
+            sprite = sprite_cache.get_npc_sprite(self.width, self.color)
+            screen.blit(sprite, (int(self.x) - SPRITE_MARGIN, int(self.y) - SPRITE_MARGIN))
+        else:
+            self.draw_figure(screen, center_x, center_y, self.width, self.color)
         
         # Draw "?" indicator with glow effect when not talking
         if not self.showing_dialogue:
@@ -128,31 +187,28 @@ class NPC:
             import math
             pulse = abs(math.sin(pygame.time.get_ticks() * 0.003)) * 10
             glow_radius = self.width//2 + int(pulse)
-            glow_surface = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (*self.color, 50), (glow_radius, glow_radius), glow_radius)
-            screen.blit(glow_surface, (center_x - glow_radius, center_y - glow_radius))
             
             # Floating "?" above head
-            font = pygame.font.Font(None, 28)
-            text = font.render("?", True, WHITE)
-            text_rect = text.get_rect(center=(center_x, center_y - self.width//2 - 15))
+            question_y = center_y - self.width//2 - 15
             
-            # Draw background circle for "?"
-            pygame.draw.circle(screen, self.color, text_rect.center, 12)
-            pygame.draw.circle(screen, WHITE, text_rect.center, 12, 2)
-            screen.blit(text, text_rect)
+            if use_sprites:
+                glow = sprite_cache.get_glow_sprite(glow_radius, self.color)
+                screen.blit(glow, (center_x - glow_radius, center_y - glow_radius))
+                question = sprite_cache.get_question_sprite(self.color)
+                screen.blit(question, question.get_rect(center=(center_x, question_y)))
+            else:
+                self.draw_glow(screen, center_x, center_y, glow_radius, self.color)
+                self.draw_question_mark(screen, center_x, question_y, self.color)
         
         # Draw dialogue if showing
         if self.showing_dialogue:
-            dialogue_text = self.dialogue if not self.is_lying else self.get_lying_dialogue()
-            self.draw_dialogue_box(screen, dialogue_text)
+            self.draw_dialogue_box(screen, self.get_current_dialogue())
     
-    def draw_dialogue_box(self, screen, text):
-        """Draw dialogue box above NPC"""
-        font = pygame.font.Font(None, 20)
-        text_surface = font.render(text, True, WHITE)
+    def get_dialogue_box_rect(self, text, text_surface=None, padding=10):
+        """Rect of the dialogue box, kept on screen"""
+        if text_surface is None:
+            text_surface = render_text(text, 20, WHITE)
         
-        padding = 10
         box_width = text_surface.get_width() + padding * 2
         box_height = text_surface.get_height() + padding * 2
         box_x = self.x + self.width//2 - box_width//2
@@ -162,6 +218,15 @@ class NPC:
         box_x = max(10, min(box_x, SCREEN_WIDTH - box_width - 10))
         box_y = max(10, box_y)
         
+        return pygame.Rect(box_x, box_y, box_width, box_height)
+    
+    def draw_dialogue_box(self, screen, text):
+        """Draw dialogue box above NPC"""
+        text_surface = render_text(text, 20, WHITE)
+        
+        padding = 10
+        box_x, box_y, box_width, box_height = self.get_dialogue_box_rect(text, text_surface, padding)
+        
         # Draw box
         pygame.draw.rect(screen, PREY_750, (box_x, box_y, box_width, box_height))
         pygame.draw.rect(screen, PURPLE_500, (box_x, box_y, box_width, box_height), 2)
@@ -2,9 +2,25 @@ import pygame
 import random
 import math
 from game.constants import *
+from game.geometry import Rect
+from game.text import render_text
+from game.sprites import sprite_cache, SPRITE_MARGIN
+from game.crowd import Crowd, WANDER, THROUGH_TRAFFIC, DIRECTIONS
+
+def crowd_field(name, convert=float):
+    """Attribute stored in slot self.slot of the obstacle's crowd arrays"""
+    def get(self):
+        return convert(getattr(self.crowd, name)[self.slot])
+    def set(self, value):
+        getattr(self.crowd, name)[self.slot] = value
+    return property(get, set)
 
 class Obstacle:
-    """Base class for moving obstacles"""
+    """Base class for moving obstacles.
+
+    Movement state lives in a Crowd (the room's, or a private one until the
+    obstacle joins a room), which advances all walkers at once.
+    """
     
     # Funny quotes for each obstacle type
     CONFERENCE_QUOTES = [
@@ -72,26 +88,56 @@ class Obstacle:
         "I can't find the room..."
     ]
     
-    def __init__(self, x, y, obstacle_type):
+    # Body color for each obstacle type
+    COLORS = {
+        "conference_goer": (100, 150, 200),  # Blue-ish
+        "casino_goer": (200, 50, 50),  # Red-ish
+        "janitor": (150, 150, 50),  # Yellow-ish
+        "influencer": (255, 105, 180),  # Pink
+        "phone_person": (100, 200, 100)  # Green
+    }
+    TYPES = list(COLORS)
+    SIZE = 30
+    
+    # Views into the crowd arrays
+    x = crowd_field('x')
+    y = crowd_field('y')
+    direction = crowd_field('direction')
+    speed = crowd_field('speed')
+    change_direction_timer = crowd_field('change_timer', int)
+    change_direction_interval = crowd_field('change_interval', int)
+    speech_timer = crowd_field('speech_timer', int)
+    speech_cooldown = crowd_field('speech_cooldown', int)
+    reached_exit = crowd_field('reached', bool)
+    
+    def __init__(self, x, y, obstacle_type, rng=None, crowd=None):
+        if rng is None:
+            rng = random
+        if crowd is None:
+            crowd = Crowd(capacity=1)
+        crowd.allocate(self)
         self.x = x
         self.y = y
-        self.width = 30
-        self.height = 30
+        self.width = self.SIZE
+        self.height = self.SIZE
+        self.crowd.size[self.slot] = self.width
+        self.crowd.kind[self.slot] = self.TYPES.index(obstacle_type)
         self.type = obstacle_type
         self.speed = 2
         
         # Movement behavior
-        self.direction = random.uniform(0, 2 * math.pi)
+        self.direction = rng.uniform(0, 2 * math.pi)
         self.change_direction_timer = 0
-        self.change_direction_interval = random.randint(60, 180)
+        self.change_direction_interval = rng.randint(60, 180)
         
         # Speech bubble
         self.speech_text = ""
         self.speech_timer = 0
-        self.speech_cooldown = random.randint(10, 60)  # Start talking soon (0.2-1 second)
+        self.speech_cooldown = rng.randint(10, 60)  # Start talking soon (0.2-1 second)
         
         # Through traffic flag
         self.reached_exit = False
+        self.exit_direction = None
         
         # Movement mode
         self.movement_mode = "wander"  # "wander" or "through_traffic"
@@ -99,52 +145,51 @@ class Obstacle:
         self.target_y = None
         
         # Type-specific properties
+        self.color = self.COLORS[obstacle_type]
         if obstacle_type == "conference_goer":
-            self.color = (100, 150, 200)  # Blue-ish
             self.speed = 1.5
             self.label = "C"
             self.quotes = self.CONFERENCE_QUOTES
         elif obstacle_type == "casino_goer":
-            self.color = (200, 50, 50)  # Red-ish
             self.speed = 2.5
             self.label = "G"
             self.quotes = self.CASINO_QUOTES
         elif obstacle_type == "janitor":
-            self.color = (150, 150, 50)  # Yellow-ish
             self.speed = 1.0
             self.label = "J"
             self.quotes = self.JANITOR_QUOTES
         elif obstacle_type == "influencer":
-            self.color = (255, 105, 180)  # Pink
             self.speed = 0.5  # Very slow, always stopping for photos
             self.label = "I"
             self.quotes = self.INFLUENCER_QUOTES
         elif obstacle_type == "phone_person":
-            self.color = (100, 200, 100)  # Green
             self.speed = 1.2
             self.label = "P"
             self.quotes = self.PHONE_PERSON_QUOTES
     
+    @staticmethod
+    def get_entrance_position(direction, width, height):
+        """Top left of a width x height walker coming in through direction's doorway"""
+        center_x = SCREEN_WIDTH // 2
+        center_y = SCREEN_HEIGHT // 2
+        if direction == 'north':
+            return center_x - width // 2, ROOM_PADDING + 10
+        if direction == 'south':
+            return center_x - width // 2, SCREEN_HEIGHT - ROOM_PADDING - height - 10
+        if direction == 'east':
+            return SCREEN_WIDTH - ROOM_PADDING - width - 10, center_y - height // 2
+        return ROOM_PADDING + 10, center_y - height // 2
+    
     def set_through_traffic(self, start_direction, end_direction):
         """Set this obstacle to walk from one exit to another"""
         self.movement_mode = "through_traffic"
+        self.exit_direction = end_direction
+        self.reached_exit = False
         
         # Position at entrance
         center_x = SCREEN_WIDTH // 2
         center_y = SCREEN_HEIGHT // 2
-        
-        if start_direction == 'north':
-            self.x = center_x - self.width // 2
-            self.y = ROOM_PADDING + 10
-        elif start_direction == 'south':
-            self.x = center_x - self.width // 2
-            self.y = SCREEN_HEIGHT - ROOM_PADDING - self.height - 10
-        elif start_direction == 'east':
-            self.x = SCREEN_WIDTH - ROOM_PADDING - self.width - 10
-            self.y = center_y - self.height // 2
-        elif start_direction == 'west':
-            self.x = ROOM_PADDING + 10
-            self.y = center_y - self.height // 2
+        self.x, self.y = self.get_entrance_position(start_direction, self.width, self.height)
         
         # Set target at exit
         if end_direction == 'north':
@@ -160,122 +205,94 @@ class Obstacle:
             self.target_x = ROOM_PADDING - 20
             self.target_y = center_y - self.height // 2
     
-    def update(self):
-        """Update obstacle position"""
-        if self.movement_mode == "through_traffic":
-            self.update_through_traffic()
-        else:
-            self.update_wander()
-        
-        # Update speech
-        if self.speech_timer > 0:
-            self.speech_timer -= 1
-            if self.speech_timer == 0:
-                self.speech_text = ""
-        else:
-            self.speech_cooldown -= 1
-            if self.speech_cooldown <= 0:
-                # Say something!
-                self.speech_text = random.choice(self.quotes)
-                self.speech_timer = 180  # Show for 3 seconds
-                self.speech_cooldown = random.randint(120, 240)  # 2-4 seconds between quotes
+    @property
+    def movement_mode(self):
+        """Movement mode: "wander" or "through_traffic"."""
+        return "through_traffic" if self.crowd.mode[self.slot] == THROUGH_TRAFFIC else "wander"
     
-    def update_through_traffic(self):
-        """Move toward target exit"""
-        if self.target_x is None or self.target_y is None:
-            return
-        
-        # Calculate direction to target
-        dx = self.target_x - self.x
-        dy = self.target_y - self.y
-        distance = math.sqrt(dx**2 + dy**2)
-        
-        if distance < 5:
-            # Reached exit, mark for removal
-            self.reached_exit = True
-            return
-        
-        # Move toward target
-        self.x += (dx / distance) * self.speed
-        self.y += (dy / distance) * self.speed
+    @movement_mode.setter
+    def movement_mode(self, mode):
+        self.crowd.mode[self.slot] = THROUGH_TRAFFIC if mode == "through_traffic" else WANDER
     
-    def update_wander(self):
-        """Update obstacle position with aimless wandering"""
-        self.change_direction_timer += 1
-        
-        # Randomly change direction
-        if self.change_direction_timer >= self.change_direction_interval:
-            self.direction = random.uniform(0, 2 * math.pi)
-            self.change_direction_timer = 0
-            self.change_direction_interval = random.randint(60, 180)
-        
-        # Move in current direction
-        dx = math.cos(self.direction) * self.speed
-        dy = math.sin(self.direction) * self.speed
-        
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Check if new position is in safe zone
-        if hasattr(self, 'room') and self.room.is_in_safe_zone(new_x + self.width//2, new_y + self.height//2):
-            # Bounce away from safe zone
-            self.direction = random.uniform(0, 2 * math.pi)
-            return
-        
-        # Bounce off walls
-        if new_x < ROOM_PADDING + 10 or new_x > SCREEN_WIDTH - ROOM_PADDING - self.width - 10:
-            self.direction = math.pi - self.direction
-        elif new_y < ROOM_PADDING + 10 or new_y > SCREEN_HEIGHT - ROOM_PADDING - self.height - 10:
-            self.direction = -self.direction
-        else:
-            self.x = new_x
-            self.y = new_y
+    @property
+    def exit_direction(self):
+        """Exit a through-traffic walker is heading for (None while wandering)"""
+        exit_index = self.crowd.exit[self.slot]
+        return None if exit_index < 0 else DIRECTIONS[exit_index]
+    
+    @exit_direction.setter
+    def exit_direction(self, direction):
+        self.crowd.exit[self.slot] = -1 if direction is None else DIRECTIONS.index(direction)
+    
+    @property
+    def target_x(self):
+        return None if self.movement_mode == "wander" else float(self.crowd.target_x[self.slot])
+    
+    @target_x.setter
+    def target_x(self, value):
+        self.crowd.target_x[self.slot] = 0 if value is None else value
+    
+    @property
+    def target_y(self):
+        return None if self.movement_mode == "wander" else float(self.crowd.target_y[self.slot])
+    
+    @target_y.setter
+    def target_y(self, value):
+        self.crowd.target_y[self.slot] = 0 if value is None else value
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        return Rect(self.x, self.y, self.width, self.height)
     
-    def draw_conference_goer(self, screen):
+    def get_bounds(self):
+        """Screen rects covered by this obstacle when drawn (figure and speech bubble)"""
+        # Margins cover the drop shadow and hand-held props
+        bounds = [pygame.Rect(int(self.x) - 4, int(self.y) - 4, self.width + 16, self.height + 10)]
+        if self.speech_text:
+            # Stretch the bubble down to the pointer tip on the obstacle's head
+            pointer_tip = pygame.Rect(int(self.x + self.width//2) - 2, int(self.y) - 2, 4, 4)
+            bounds.append(self.get_speech_bubble_rect().inflate(6, 6).union(pointer_tip))
+        return bounds
+    
+    @staticmethod
+    def draw_conference_goer(screen, cx, cy, size, color):
         """Draw a conference attendee with badge"""
-        cx, cy = int(self.x + self.width//2), int(self.y + self.height//2)
-        
         # Shadow
-        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), self.width//2)
+        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), size//2)
         
         # Body (suit)
-        pygame.draw.circle(screen, self.color, (cx, cy), self.width//2)
+        pygame.draw.circle(screen, color, (cx, cy), size//2)
         
         # Head
         head_color = (220, 180, 140)
-        pygame.draw.circle(screen, head_color, (cx, cy - 5), self.width//3)
+        pygame.draw.circle(screen, head_color, (cx, cy - 5), size//3)
         
         # Badge
         badge_rect = pygame.Rect(cx - 6, cy + 2, 12, 8)
         pygame.draw.rect(screen, WHITE, badge_rect)
-        pygame.draw.rect(screen, self.color, badge_rect, 1)
+        pygame.draw.rect(screen, color, badge_rect, 1)
         
         # Eyes
         pygame.draw.circle(screen, (0, 0, 0), (cx - 3, cy - 6), 2)
         pygame.draw.circle(screen, (0, 0, 0), (cx + 3, cy - 6), 2)
         
         # Border
-        pygame.draw.circle(screen, WHITE, (cx, cy), self.width//2, 2)
+        pygame.draw.circle(screen, WHITE, (cx, cy), size//2, 2)
     
-    def draw_casino_goer(self, screen):
+    @staticmethod
+    def draw_casino_goer(screen, cx, cy, size, color):
         """Draw a casino patron with drink"""
-        cx, cy = int(self.x + self.width//2), int(self.y + self.height//2)
-        
         # Shadow
-        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), self.width//2)
+        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), size//2)
         
         # Body (casual clothes)
-        pygame.draw.circle(screen, self.color, (cx, cy), self.width//2)
+        pygame.draw.circle(screen, color, (cx, cy), size//2)
         
         # Head
         head_color = (220, 180, 140)
-        pygame.draw.circle(screen, head_color, (cx, cy - 5), self.width//3)
+        pygame.draw.circle(screen, head_color, (cx, cy - 5), size//3)
         
         # Drink in hand
-        drink_x = cx + self.width//3
+        drink_x = cx + size//3
         pygame.draw.rect(screen, (255, 200, 0), (drink_x - 3, cy - 2, 6, 10))
         pygame.draw.circle(screen, (255, 200, 0), (drink_x, cy - 2), 3)
         
@@ -284,24 +301,23 @@ class Obstacle:
         pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy - 5), 2)
         
         # Border
-        pygame.draw.circle(screen, WHITE, (cx, cy), self.width//2, 2)
+        pygame.draw.circle(screen, WHITE, (cx, cy), size//2, 2)
     
-    def draw_janitor(self, screen):
+    @staticmethod
+    def draw_janitor(screen, cx, cy, size, color):
         """Draw a janitor with mop"""
-        cx, cy = int(self.x + self.width//2), int(self.y + self.height//2)
-        
         # Shadow
-        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), self.width//2)
+        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), size//2)
         
         # Body (uniform)
-        pygame.draw.circle(screen, self.color, (cx, cy), self.width//2)
+        pygame.draw.circle(screen, color, (cx, cy), size//2)
         
         # Head
         head_color = (220, 180, 140)
-        pygame.draw.circle(screen, head_color, (cx, cy - 5), self.width//3)
+        pygame.draw.circle(screen, head_color, (cx, cy - 5), size//3)
         
         # Mop
-        mop_x = cx - self.width//3
+        mop_x = cx - size//3
         pygame.draw.line(screen, (139, 69, 19), (mop_x, cy - 8), (mop_x, cy + 8), 2)
         pygame.draw.rect(screen, (180, 180, 180), (mop_x - 4, cy + 6, 8, 4))
         
@@ -310,24 +326,23 @@ class Obstacle:
         pygame.draw.circle(screen, (0, 0, 0), (cx + 3, cy - 6), 2)
         
         # Border
-        pygame.draw.circle(screen, WHITE, (cx, cy), self.width//2, 2)
+        pygame.draw.circle(screen, WHITE, (cx, cy), size//2, 2)
     
-    def draw_influencer(self, screen):
+    @staticmethod
+    def draw_influencer(screen, cx, cy, size, color):
         """Draw an influencer taking selfies"""
-        cx, cy = int(self.x + self.width//2), int(self.y + self.height//2)
-        
         # Shadow
-        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), self.width//2)
+        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), size//2)
         
         # Body
-        pygame.draw.circle(screen, self.color, (cx, cy), self.width//2)
+        pygame.draw.circle(screen, color, (cx, cy), size//2)
         
         # Head
         head_color = (220, 180, 140)
-        pygame.draw.circle(screen, head_color, (cx, cy - 5), self.width//3)
+        pygame.draw.circle(screen, head_color, (cx, cy - 5), size//3)
         
         # Phone (selfie stick)
-        phone_x = cx + self.width//2 + 5
+        phone_x = cx + size//2 + 5
         pygame.draw.rect(screen, (50, 50, 50), (phone_x - 2, cy - 8, 4, 8))
         pygame.draw.rect(screen, (200, 200, 255), (phone_x - 3, cy - 8, 6, 8))
         
@@ -336,21 +351,20 @@ class Obstacle:
         pygame.draw.circle(screen, (0, 0, 0), (cx + 3, cy - 6), 2)
         
         # Border
-        pygame.draw.circle(screen, WHITE, (cx, cy), self.width//2, 2)
+        pygame.draw.circle(screen, WHITE, (cx, cy), size//2, 2)
     
-    def draw_phone_person(self, screen):
+    @staticmethod
+    def draw_phone_person(screen, cx, cy, size, color):
         """Draw someone on their phone not paying attention"""
-        cx, cy = int(self.x + self.width//2), int(self.y + self.height//2)
-        
         # Shadow
-        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), self.width//2)
+        pygame.draw.circle(screen, (0, 0, 0), (cx + 2, cy + 2), size//2)
         
         # Body
-        pygame.draw.circle(screen, self.color, (cx, cy), self.width//2)
+        pygame.draw.circle(screen, color, (cx, cy), size//2)
         
         # Head (looking down at phone)
         head_color = (220, 180, 140)
-        pygame.draw.circle(screen, head_color, (cx, cy - 3), self.width//3)
+        pygame.draw.circle(screen, head_color, (cx, cy - 3), size//3)
         
         # Phone in hand
         pygame.draw.rect(screen, (50, 50, 50), (cx - 4, cy + 3, 8, 12))
@@ -361,30 +375,40 @@ class Obstacle:
         pygame.draw.circle(screen, (0, 0, 0), (cx + 3, cy - 2), 1)
         
         # Border
-        pygame.draw.circle(screen, WHITE, (cx, cy), self.width//2, 2)
+        pygame.draw.circle(screen, WHITE, (cx, cy), size//2, 2)
+    
+    @classmethod
+    def draw_figure(cls, screen, obstacle_type, cx, cy, size, color):
+        """Draw the figure for an obstacle type centered on (cx, cy)"""
+        if obstacle_type == "conference_goer":
+            cls.draw_conference_goer(screen, cx, cy, size, color)
+        elif obstacle_type == "casino_goer":
+            cls.draw_casino_goer(screen, cx, cy, size, color)
+        elif obstacle_type == "janitor":
+            cls.draw_janitor(screen, cx, cy, size, color)
+        elif obstacle_type == "influencer":
+            cls.draw_influencer(screen, cx, cy, size, color)
+        elif obstacle_type == "phone_person":
+            cls.draw_phone_person(screen, cx, cy, size, color)
     
     def draw(self, screen):
-        if self.type == "conference_goer":
-            self.draw_conference_goer(screen)
-        elif self.type == "casino_goer":
-            self.draw_casino_goer(screen)
-        elif self.type == "janitor":
-            self.draw_janitor(screen)
-        elif self.type == "influencer":
-            self.draw_influencer(screen)
-        elif self.type == "phone_person":
-            self.draw_phone_person(screen)
+        if sprite_cache.enabled:
+            # Pre-baked figure: a single blit
+            sprite = sprite_cache.get_obstacle_sprite(self.type, self.width, self.color)
+            screen.blit(sprite, (int(self.x) - SPRITE_MARGIN, int(self.y) - SPRITE_MARGIN))
+        else:
+            cx, cy = int(self.x + self.width//2), int(self.y + self.height//2)
+            self.draw_figure(screen, self.type, cx, cy, self.width, self.color)
         
         # Draw speech bubble if talking
         if self.speech_text:
             self.draw_speech_bubble(screen)
     
-    def draw_speech_bubble(self, screen):
-        """Draw a speech bubble above the obstacle"""
-        font = pygame.font.Font(None, 16)
-        text_surface = font.render(self.speech_text, True, (0, 0, 0))
+    def get_speech_bubble_rect(self, text_surface=None, padding=6):
+        """Rect of the speech bubble box, kept on screen"""
+        if text_surface is None:
+            text_surface = render_text(self.speech_text, 16, (0, 0, 0))
         
-        padding = 6
         box_width = text_surface.get_width() + padding * 2
         box_height = text_surface.get_height() + padding * 2
         box_x = int(self.x + self.width//2 - box_width//2)
@@ -394,8 +418,17 @@ class Obstacle:
         box_x = max(ROOM_PADDING + 5, min(box_x, SCREEN_WIDTH - ROOM_PADDING - box_width - 5))
         box_y = max(ROOM_PADDING + 5, box_y)
         
+        return pygame.Rect(box_x, box_y, box_width, box_height)
+    
+    def draw_speech_bubble(self, screen):
+        """Draw a speech bubble above the obstacle"""
+        text_surface = render_text(self.speech_text, 16, (0, 0, 0))
+        
+        padding = 6
+        bubble_rect = self.get_speech_bubble_rect(text_surface, padding)
+        box_x, box_y, box_width, box_height = bubble_rect
+        
         # Draw bubble
-        bubble_rect = pygame.Rect(box_x, box_y, box_width, box_height)
         pygame.draw.rect(screen, WHITE, bubble_rect, border_radius=8)
         pygame.draw.rect(screen, (0, 0, 0), bubble_rect, 2, border_radius=8)
         
@@ -1,47 +1,153 @@
 import pygame
 import random
-import math
+import numpy as np
+from itertools import repeat
 from game.constants import *
 
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-3, 3)
-        self.vy = random.uniform(-3, 3)
-        self.life = 30
-        self.max_life = 30
-        self.color = color
-        self.size = random.randint(3, 6)
-    
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.2  # Gravity
-        self.life -= 1
-    
-    def draw(self, screen):
-        alpha = int(255 * (self.life / self.max_life))
-        size = int(self.size * (self.life / self.max_life))
-        if size > 0:
-            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), size)
-    
-    def is_dead(self):
-        return self.life <= 0
+# Longest particle size, in pixels of radius
+MAX_PARTICLE_SIZE = 6
+
+# Randomness for screen effects only (particles, shake, jackpot). Drawing runs a
+# frame-rate dependent number of times, so it must not draw from the global
+# random stream the simulation replays from.
+effects_rng = random.Random()
 
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
-    
+    """Pooled particle engine storing particles as parallel NumPy arrays.
+
+    Slots are preallocated up to a fixed capacity and recycled through a
+    free list; bursts beyond the free capacity are dropped.
+    """
+
+    def __init__(self, capacity=16384):
+        self.capacity = capacity
+
+        # Structure of arrays, one slot per particle
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.max_life = np.full(capacity, 30, dtype=np.int16)
+        self.size = np.zeros(capacity, dtype=np.int16)
+        self.color = np.zeros(capacity, dtype=np.int16)  # Index into palette
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        # Free list used as a stack of slot indices
+        self.free = np.arange(capacity - 1, -1, -1, dtype=np.int32)
+        self.free_count = capacity
+        self.live_count = 0
+
+        # Colors seen so far and their pre-rendered circle stamps
+        self.palette = []
+        self.palette_index = {}  # color: palette index
+        self.stamps = {}  # (palette index, radius): Surface
+
+        # Seeded from the effects RNG, which seeded games seed as well
+        self.rng = np.random.default_rng(effects_rng.getrandbits(64))
+
+    def __len__(self):
+        return self.live_count
+
+    def get_color_index(self, color):
+        color = tuple(color)
+        index = self.palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self.palette_index[color] = index
+        return index
+
     def emit(self, x, y, color, count=10):
-        for _ in range(count):
-            self.particles.append(Particle(x, y, color))
-    
+        count = min(count, self.free_count)
+        if count <= 0:
+            return
+
+        # Pop slots off the free list
+        slots = self.free[self.free_count - count:self.free_count]
+        self.free_count -= count
+
+        self.x[slots] = x
+        self.y[slots] = y
+        self.vx[slots] = self.rng.uniform(-3, 3, count)
+        self.vy[slots] = self.rng.uniform(-3, 3, count)
+        self.life[slots] = 30
+        self.max_life[slots] = 30
+        self.size[slots] = self.rng.integers(3, MAX_PARTICLE_SIZE + 1, count)
+        self.color[slots] = self.get_color_index(color)
+        self.alive[slots] = True
+        self.live_count += count
+
     def update(self):
-        self.particles = [p for p in self.particles if not p.is_dead()]
-        for particle in self.particles:
-            particle.update()
-    
+        if not self.live_count:
+            return
+
+        slots = np.flatnonzero(self.alive)
+        self.x[slots] += self.vx[slots]
+        self.y[slots] += self.vy[slots]
+        self.vy[slots] += 0.2  # Gravity
+        self.life[slots] -= 1
+
+        # Return expired slots to the free list
+        dead = slots[self.life[slots] <= 0]
+        if len(dead):
+            self.alive[dead] = False
+            self.free[self.free_count:self.free_count + len(dead)] = dead
+            self.free_count += len(dead)
+            self.live_count -= len(dead)
+
+    def get_visible(self):
+        """Slots, radii and integer positions of particles large enough to draw"""
+        slots = np.flatnonzero(self.alive)
+        radius = self.size[slots] * self.life[slots] // self.max_life[slots]
+        shown = radius > 0
+        slots = slots[shown]
+        return (slots, radius[shown],
+                self.x[slots].astype(np.int32), self.y[slots].astype(np.int32))
+
+    def get_stamp(self, color_index, radius):
+        stamp = self.stamps.get((color_index, radius))
+        if stamp is None:
+            stamp = pygame.Surface((radius * 2, radius * 2))
+            stamp.fill((255, 0, 255))
+            stamp.set_colorkey((255, 0, 255))
+            pygame.draw.circle(stamp, self.palette[color_index], (radius, radius), radius)
+            if pygame.display.get_surface() is not None:
+                stamp = stamp.convert()
+            self.stamps[(color_index, radius)] = stamp
+        return stamp
+
+    def get_bounds(self):
+        """Screen rects covered by live particles"""
+        if not self.live_count:
+            return []
+        slots, radius, xs, ys = self.get_visible()
+        if not len(slots):
+            return []
+        left = int((xs - radius).min())
+        top = int((ys - radius).min())
+        right = int((xs + radius).max())
+        bottom = int((ys + radius).max())
+        return [pygame.Rect(left, top, right - left + 1, bottom - top + 1)]
+
     def draw(self, screen):
-        for particle in self.particles:
-            particle.draw(screen)
+        if not self.live_count:
+            return
+        slots, radius, xs, ys = self.get_visible()
+        if not len(slots):
+            return
+
+        # Group particles by (color, radius) bucket and blit each bucket's stamp in one call
+        bucket = self.color[slots].astype(np.int32) * (MAX_PARTICLE_SIZE + 1) + radius
+        order = np.argsort(bucket, kind='stable')
+        bucket = bucket[order]
+        left = (xs - radius)[order]
+        top = (ys - radius)[order]
+        starts = np.flatnonzero(np.diff(bucket, prepend=-1))
+        ends = np.append(starts[1:], len(bucket))
+
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            color_index, r = divmod(int(bucket[start]), MAX_PARTICLE_SIZE + 1)
+            stamp = self.get_stamp(color_index, r)
+            positions = zip(left[start:end].tolist(), top[start:end].tolist())
+            screen.blits(zip(repeat(stamp), positions), doreturn=False)
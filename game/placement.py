@@ -0,0 +1,91 @@
+import numpy as np
+from game.constants import *
+
+# Display-free placement of room contents
+
+def get_safe_zones(connections):
+    """Safe zone around each exit as (left, top, right, bottom), matching Room.is_in_safe_zone"""
+    center_x = SCREEN_WIDTH // 2
+    center_y = SCREEN_HEIGHT // 2
+    zones = []
+    if 'north' in connections:
+        zones.append((center_x - SAFE_ZONE_RADIUS, 0, center_x + SAFE_ZONE_RADIUS, ROOM_PADDING + SAFE_ZONE_RADIUS))
+    if 'south' in connections:
+        zones.append((center_x - SAFE_ZONE_RADIUS, SCREEN_HEIGHT - ROOM_PADDING - SAFE_ZONE_RADIUS, center_x + SAFE_ZONE_RADIUS, SCREEN_HEIGHT))
+    if 'east' in connections:
+        zones.append((SCREEN_WIDTH - ROOM_PADDING - SAFE_ZONE_RADIUS, center_y - SAFE_ZONE_RADIUS, SCREEN_WIDTH, center_y + SAFE_ZONE_RADIUS))
+    if 'west' in connections:
+        zones.append((0, center_y - SAFE_ZONE_RADIUS, ROOM_PADDING + SAFE_ZONE_RADIUS, center_y + SAFE_ZONE_RADIUS))
+    return zones
+
+# Candidate centers on the room floor, shared by every Placement
+LATTICE_X = np.arange(ROOM_PADDING, SCREEN_WIDTH - ROOM_PADDING + 1, PLACEMENT_CELL, dtype=float)
+LATTICE_Y = np.arange(ROOM_PADDING, SCREEN_HEIGHT - ROOM_PADDING + 1, PLACEMENT_CELL, dtype=float)
+
+# Free masks depend only on the exits and the item's footprint, so rooms share them
+free_masks = {}  # (exits, width, height, area): bool array over the lattice
+
+def get_free_mask(connections, width, height, area):
+    """Lattice cells where a width x height footprint fits area (left, top, right, bottom of its top-left) clear of safe zones"""
+    key = (frozenset(connections), width, height, area)
+    mask = free_masks.get(key)
+    if mask is None:
+        left = LATTICE_X[:, None] - width // 2
+        top = LATTICE_Y[None, :] - height // 2
+        mask = (left >= area[0]) & (left <= area[2]) & (top >= area[1]) & (top <= area[3])
+        for zone_left, zone_top, zone_right, zone_bottom in get_safe_zones(connections):
+            mask &= ~((left < zone_right) & (left + width > zone_left) &
+                      (top < zone_bottom) & (top + height > zone_top))
+        free_masks[key] = mask
+    return mask
+
+class Placement:
+    """Occupancy grid of a room's floor for placing its contents.
+
+    Candidate item centers lie on a lattice PLACEMENT_CELL pixels apart.
+    Every placed item claims a disk of its radius, and the grid keeps, for
+    each candidate, how far it is from the edge of the nearest claimed
+    disk (up to max_radius; farther than that counts as free). Placing an
+    item draws uniformly from the candidates whose disk fits, whose
+    footprint stays inside the given area and clear of every safe zone:
+    sequential Poisson-disk sampling with per-item radii.
+
+    A claim only touches the lattice window around its disk and free masks
+    are shared between rooms, so a placement costs about the same however
+    many items the room already holds. When nothing fits, place() returns
+    None instead of a position that breaks the spacing.
+    """
+
+    def __init__(self, connections, max_radius=PLACEMENT_MAX_RADIUS):
+        self.connections = frozenset(connections)
+        self.max_radius = max_radius
+        self.clearance = np.full((len(LATTICE_X), len(LATTICE_Y)), np.inf)  # Distance to the nearest claimed disk
+
+        # Statistics
+        self.placed = 0
+        self.failed = 0
+
+    def claim(self, center_x, center_y, radius):
+        """Mark a disk as occupied, by an item placed here or anywhere else"""
+        reach = radius + self.max_radius
+        x0, x1 = np.searchsorted(LATTICE_X, (center_x - reach, center_x + reach))
+        y0, y1 = np.searchsorted(LATTICE_Y, (center_y - reach, center_y + reach))
+        window = self.clearance[x0:x1, y0:y1]
+        distances = np.hypot(LATTICE_X[x0:x1, None] - center_x, LATTICE_Y[None, y0:y1] - center_y)
+        np.minimum(window, distances - radius, out=window)
+
+    def place(self, rng, width, height, radius, area):
+        """Top-left of a random free spot for a width x height item, or None if the room is full"""
+        if radius > self.max_radius:
+            raise ValueError(f"Radius {radius} is larger than max_radius {self.max_radius}")
+        free = get_free_mask(self.connections, width, height, area) & (self.clearance >= radius)
+        candidates = np.flatnonzero(free)
+        if not len(candidates):
+            self.failed += 1
+            return None
+        column, row = divmod(int(candidates[rng.randrange(len(candidates))]), len(LATTICE_Y))
+        center_x = LATTICE_X[column]
+        center_y = LATTICE_Y[row]
+        self.claim(center_x, center_y, radius)
+        self.placed += 1
+        return (int(center_x) - width // 2, int(center_y) - height // 2)
@@ -1,5 +1,7 @@
 import pygame
 from game.constants import *
+from game.geometry import Rect
+from game.assets import assets
 
 class Player:
     def __init__(self, x, y):
@@ -8,14 +10,18 @@ class Player:
         self.width = PLAYER_SIZE
         self.height = PLAYER_SIZE
         
-        # Load Kiro logo
+        # Sprite is loaded on first draw so headless runs never touch image files
+        self.image = None
+    
+    def load_image(self):
+        # Kiro logo, loaded and scaled once for every player
         try:
-            self.image = pygame.image.load('kiro-logo.png')
-            self.image = pygame.transform.scale(self.image, (self.width, self.height))
-        except:
+            image = assets.get(PLAYER_IMAGE, (self.width, self.height))
+        except (FileNotFoundError, pygame.error):
             # Fallback to purple square if image not found
-            self.image = pygame.Surface((self.width, self.height))
-            self.image.fill(PURPLE_500)
+            image = pygame.Surface((self.width, self.height))
+            image.fill(PURPLE_500)
+        return image
     
     def move(self, dx, dy, room):
         # Try to move and check boundaries
@@ -53,12 +59,12 @@ class Player:
         
         # Check static obstacle collisions
         if can_move_x:
-            test_rect = pygame.Rect(new_x, self.y, self.width, self.height)
+            test_rect = Rect(new_x, self.y, self.width, self.height)
             if room.check_static_collision(test_rect):
                 can_move_x = False
         
         if can_move_y:
-            test_rect = pygame.Rect(self.x, new_y, self.width, self.height)
+            test_rect = Rect(self.x, new_y, self.width, self.height)
             if room.check_static_collision(test_rect):
                 can_move_y = False
         
@@ -68,7 +74,12 @@ class Player:
             self.y = new_y
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        return Rect(self.x, self.y, self.width, self.height)
+    
+    def get_bounds(self):
+        return [pygame.Rect(self.x, self.y, self.width, self.height)]
     
     def draw(self, screen):
+        if self.image is None:
+            self.image = self.load_image()
         screen.blit(self.image, (self.x, self.y))
@@ -0,0 +1,121 @@
+import math
+import time
+from game.constants import *
+from game.navigation import get_exit_point, navigation_cache
+
+class Prefetcher:
+    """Prepares the rooms behind the current room's exits a slice at a time.
+
+    Preparing a room places its contents (the same ones entering it would
+    place, from its content seed), renders its background, warms the
+    sprite and text caches and builds its flow fields. Each of those is one
+    step of a per-room generator, and update() runs steps while the frame
+    has idle time left, nearest exit first. The room behind an exit the
+    player is approaching gets at least one step every frame, idle or not,
+    so it is ready on arrival.
+
+    Prefetched rooms do not join the room cache until the player enters
+    them, so the background simulation does not tick them and prefetching
+    never changes what the simulation does. Neighbors the player did not
+    enter are released again (contents and Room object) once they stop
+    being neighbors.
+
+    Idle time the neighbors leave over builds the flow fields the
+    background simulation queued in navigation_cache, which it never
+    builds within its own budget.
+    """
+
+    def __init__(self, budget_ms=PREFETCH_BUDGET_MS, approach_distance=PREFETCH_APPROACH_DISTANCE):
+        self.budget = budget_ms / 1000
+        self.approach_distance = approach_distance
+        self.maze = None
+        self.room_id = None
+        self.jobs = {}  # room_id: generator preparing the room behind an exit
+        self.exits = {}  # room_id: exit of the current room that leads there
+        self.prefetched = set()  # Rooms whose contents were placed ahead of time
+
+        # Statistics
+        self.steps = 0
+        self.rooms_prepared = 0
+        self.released = 0
+        self.fields_built = 0
+
+    def prepare_room(self, sim, room):
+        """Generator doing one slice of preparation per step"""
+        if not room.initialized and not room.is_goal:
+            room.initialize_contents(sim.maze)
+            self.prefetched.add(room.id)
+            yield
+        room.warm_render_caches()
+        yield
+        for direction in room.connections:
+            room.get_flow_field(direction)
+            yield
+
+    def plan(self, sim, current_room):
+        """Queue the neighbors of a newly entered room, releasing stale prefetches"""
+        if sim.maze is not self.maze:
+            self.maze = sim.maze
+            self.prefetched = set()  # A new game: the old maze's rooms are gone
+            self.exits = {}
+        self.room_id = current_room.id
+        previous_exits = self.exits
+        self.exits = {room_id: direction for direction, room_id in current_room.connections.items()}
+        self.jobs = {}
+        for room_id in self.exits:
+            room = sim.maze.get_room(room_id)
+            if room is not None:
+                self.jobs[room_id] = self.prepare_room(sim, room)
+
+        # Neighbors of the previous room that the player never entered
+        cached = sim.room_cache.rooms
+        for room_id in self.prefetched.union(previous_exits):
+            if room_id in self.exits:
+                continue
+            self.prefetched.discard(room_id)
+            room = sim.maze.live_rooms.get(room_id)
+            if room is not None and room_id not in cached and room_id != current_room.id:
+                if room.initialized:
+                    room.release_contents()
+                    self.released += 1
+                sim.maze.release_room(room)
+
+    def update(self, sim, idle_seconds):
+        """Spend up to min(idle_seconds, budget) preparing neighbors"""
+        start = time.perf_counter()
+        current_room = sim.get_current_room()
+        if current_room.id != self.room_id or sim.maze is not self.maze:
+            self.plan(sim, current_room)
+        deadline = start + min(idle_seconds, self.budget)
+
+        # Nearest exit first
+        player_rect = sim.player.get_rect()
+        distances = {}
+        for room_id in self.jobs:
+            exit_x, exit_y = get_exit_point(self.exits[room_id])
+            distances[room_id] = math.hypot(player_rect.centerx - exit_x, player_rect.centery - exit_y)
+
+        for room_id in sorted(self.jobs, key=distances.get):
+            approaching = distances[room_id] < self.approach_distance
+            while approaching or time.perf_counter() < deadline:
+                approaching = False
+                if next(self.jobs[room_id], StopIteration) is StopIteration:
+                    del self.jobs[room_id]
+                    self.rooms_prepared += 1
+                    break
+                self.steps += 1
+            if time.perf_counter() >= deadline:
+                return
+
+        # Then the flow fields the background simulation is waiting on
+        while time.perf_counter() < deadline and navigation_cache.build_pending():
+            self.fields_built += 1
+
+    def get_stats(self):
+        return {
+            'pending': len(self.jobs),
+            'steps': self.steps,
+            'rooms_prepared': self.rooms_prepared,
+            'released': self.released,
+            'fields_built': self.fields_built
+        }
@@ -0,0 +1,165 @@
+import cProfile
+import json
+import pstats
+import time
+
+class NullSpan:
+    """Span returned while profiling is off: entering and leaving it does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class Span:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        profiler = self.profiler
+        path = profiler.stack[-1] + '/' + self.name if profiler.stack else self.name
+        profiler.stack.append(path)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        path = profiler.stack.pop()
+        entry = profiler.current.get(path)
+        if entry is None:
+            profiler.current[path] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+        return False
+
+class Profiler:
+    """Nestable named timing spans collected into a ring buffer of per-frame samples.
+
+    Spans are keyed by their nesting path ("Game.draw/Room.draw"). While
+    disabled, span() hands back a shared no-op object, so instrumentation
+    can stay in production builds.
+    """
+
+    def __init__(self, capacity=600):
+        self.enabled = False
+        self.capacity = capacity
+
+        # Ring buffer of (timestamp, frame seconds, {span path: [seconds, calls]})
+        self.frames = [None] * capacity
+        self.next_frame = 0
+        self.frame_count = 0
+
+        self.stack = []
+        self.current = {}
+        self.frame_start = None
+
+        # Optional cProfile window
+        self.cprofile = None
+        self.cprofile_frames_left = 0
+        self.cprofile_path = None
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.stack.clear()
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self.cprofile is not None:
+            self.cprofile_frames_left -= 1
+            if self.cprofile_frames_left <= 0:
+                self.stop_cprofile()
+
+        if not self.enabled or self.frame_start is None:
+            return
+        now = time.perf_counter()
+        self.frames[self.next_frame] = (time.time(), now - self.frame_start, self.current)
+        self.next_frame = (self.next_frame + 1) % self.capacity
+        self.frame_count = min(self.frame_count + 1, self.capacity)
+        self.frame_start = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_start = None
+
+    def get_frames(self, seconds=None):
+        """Recorded frames, oldest first, optionally limited to the last few seconds"""
+        start = (self.next_frame - self.frame_count) % self.capacity
+        frames = [self.frames[(start + i) % self.capacity] for i in range(self.frame_count)]
+        if seconds is not None and frames:
+            cutoff = frames[-1][0] - seconds
+            frames = [frame for frame in frames if frame[0] >= cutoff]
+        return frames
+
+    def get_top_spans(self, count=8, frames=None):
+        """Span paths with the highest average time per frame, as (path, ms per frame, calls per frame)"""
+        if frames is None:
+            frames = self.get_frames()
+        if not frames:
+            return []
+        totals = {}
+        for _, _, spans in frames:
+            for path, (seconds, calls) in spans.items():
+                total = totals.setdefault(path, [0.0, 0])
+                total[0] += seconds
+                total[1] += calls
+        ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:count]
+        return [(path, seconds * 1000 / len(frames), calls / len(frames))
+                for path, (seconds, calls) in ranked]
+
+    def dump(self, path, seconds=10):
+        """Write the last few seconds of frame samples to a JSON file"""
+        frames = self.get_frames(seconds)
+        data = {
+            'seconds': seconds,
+            'frames': [
+                {
+                    'time': timestamp,
+                    'frame_ms': frame_seconds * 1000,
+                    'spans': {name: {'ms': s * 1000, 'calls': calls} for name, (s, calls) in spans.items()}
+                }
+                for timestamp, frame_seconds, spans in frames
+            ],
+            'top_spans': [
+                {'span': name, 'ms_per_frame': ms, 'calls_per_frame': calls}
+                for name, ms, calls in self.get_top_spans(20, frames)
+            ]
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def start_cprofile(self, frames, path):
+        """Run cProfile for the next number of frames, then write stats to path"""
+        if self.cprofile is not None:
+            return
+        self.cprofile = cProfile.Profile()
+        self.cprofile_frames_left = frames
+        self.cprofile_path = path
+        self.cprofile.enable()
+
+    def stop_cprofile(self):
+        if self.cprofile is None:
+            return None
+        self.cprofile.disable()
+        stats = pstats.Stats(self.cprofile)
+        stats.dump_stats(self.cprofile_path)
+        path = self.cprofile_path
+        self.cprofile = None
+        self.cprofile_path = None
+        return path
+
+# Shared profiler for the game loop and its subsystems
+profiler = Profiler()
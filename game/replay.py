@@ -0,0 +1,171 @@
+"""Input recording and deterministic replay of game sessions.
+
+A recording holds what a Simulation needs to play a session again: its
+construction settings (seed included) and the input bitmask of every tick,
+run-length encoded. The simulation has to be deterministic (no wall-clock
+decisions), which Game arranges when it records or replays.
+
+    header      HEADER (magic, version, flags, seed, settings, ticks, final state digest)
+    snapshot    UTF-8 path of the maze snapshot, if the session used one
+    runs        RUN records (ticks, inputs), a new one whenever the inputs change
+
+Replay a recording at full speed with no display:
+
+    python -m game.replay session.rec [--profile profile.json]
+"""
+import argparse
+import hashlib
+import struct
+import time
+from game.simulation import Simulation
+from game.profiler import profiler
+
+MAGIC = b'MAZEREC\0'
+VERSION = 1
+
+FLAG_STREAMING = 1
+
+# magic, version, flags, seed, rooms, max lives, goal distance, room cache size,
+# tick rate, snapshot path length, ticks, final state digest
+HEADER = struct.Struct('<8sHHQIIIIIIQ8s')
+RUN = struct.Struct('<HB')  # ticks (1-65535), inputs
+MAX_RUN = 0xFFFF
+
+def get_state_digest(sim):
+    """Short hash of the simulation state a diverging replay would change first"""
+    digest = hashlib.blake2b(digest_size=8)
+    player = sim.player
+    digest.update(repr((sim.ticks, sim.current_room_id, sim.lives, sim.steps_taken, sim.collisions,
+                        sim.won, player.x, player.y)).encode())
+    crowd = sim.get_current_room().crowd
+    crowd.sync()
+    digest.update(crowd.x[:crowd.count].tobytes())
+    digest.update(crowd.y[:crowd.count].tobytes())
+    return digest.digest()
+
+class InputRecorder:
+    """Run-length encoded log of the inputs fed to a simulation, from its first tick"""
+
+    def __init__(self, sim, tick_rate=60):
+        if sim.ticks:
+            raise ValueError("recording has to start before the simulation's first tick")
+        if not sim.deterministic:
+            raise ValueError("only a deterministic simulation can be replayed")
+        self.sim = sim
+        self.tick_rate = tick_rate
+        self.runs = []  # [ticks, inputs]
+        self.ticks = 0
+
+    def record(self, inputs):
+        """Log the inputs of one tick"""
+        self.ticks += 1
+        if self.runs and self.runs[-1][1] == inputs and self.runs[-1][0] < MAX_RUN:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, inputs])
+
+    def save(self, path):
+        sim = self.sim
+        snapshot = sim.snapshot.encode('utf-8') if sim.snapshot is not None else b''
+        header = HEADER.pack(MAGIC, VERSION, FLAG_STREAMING if sim.streaming else 0, sim.seed & 0xFFFFFFFFFFFFFFFF,
+                             sim.num_rooms, sim.max_lives, sim.goal_distance, sim.room_cache_size,
+                             self.tick_rate, len(snapshot), self.ticks, get_state_digest(sim))
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(snapshot)
+            f.write(b''.join(RUN.pack(ticks, inputs) for ticks, inputs in self.runs))
+        return path
+
+class Recording:
+    """A session read back from a file written by InputRecorder"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an input recording")
+        (_, version, flags, self.seed, self.num_rooms, self.max_lives, self.goal_distance,
+         self.room_cache_size, self.tick_rate, snapshot_length, self.ticks, self.digest) = HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"{path} is recording version {version}, this game reads version {VERSION}")
+        self.streaming = bool(flags & FLAG_STREAMING)
+        offset = HEADER.size
+        self.snapshot = data[offset:offset + snapshot_length].decode('utf-8') or None
+        offset += snapshot_length
+        self.runs = list(RUN.iter_unpack(data[offset:]))
+
+    def create_simulation(self):
+        """A fresh simulation in the state the recorded session started from"""
+        return Simulation(self.num_rooms, max_lives=self.max_lives, seed=self.seed, streaming=self.streaming,
+                          goal_distance=self.goal_distance, room_cache_size=self.room_cache_size,
+                          snapshot=self.snapshot, deterministic=True)
+
+    def iter_inputs(self):
+        for ticks, inputs in self.runs:
+            for _ in range(ticks):
+                yield inputs
+
+class InputReplayer:
+    """Hands out a recording's inputs one tick at a time (0 once it runs out).
+
+    Can be passed straight to Simulation.step as its inputs callable.
+    """
+
+    def __init__(self, recording):
+        self.recording = recording
+        self.inputs = recording.iter_inputs()
+        self.ticks = 0
+        self.finished = recording.ticks == 0
+
+    def __call__(self, sim=None):
+        inputs = next(self.inputs, None)
+        if inputs is None:
+            self.finished = True
+            return 0
+        self.ticks += 1
+        self.finished = self.ticks >= self.recording.ticks
+        return inputs
+
+def replay(recording, profile=False, slowest=5):
+    """Run a recording unthrottled with no display.
+
+    Returns (simulation, seconds, slowest ticks as (ms, tick number)).
+    With profile, every tick is a profiler frame.
+    """
+    sim = recording.create_simulation()
+    replayer = InputReplayer(recording)
+    if profile and not profiler.enabled:
+        profiler.toggle()
+    tick_times = []
+    clock = time.perf_counter
+    start = clock()
+    while not replayer.finished:
+        inputs = replayer(sim)
+        profiler.begin_frame()
+        sim.begin_frame()
+        tick_start = clock()
+        with profiler.span('Simulation.tick'):
+            sim.tick(inputs)
+        tick_times.append(((clock() - tick_start) * 1000, sim.ticks))
+        profiler.end_frame()
+    seconds = clock() - start
+    return sim, seconds, sorted(tick_times, reverse=True)[:slowest]
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an input recording at full speed without a display")
+    parser.add_argument('path')
+    parser.add_argument('--profile', metavar='JSON', help="write per-tick profiler spans (the last 600 ticks) to this file")
+    args = parser.parse_args()
+
+    recording = Recording(args.path)
+    sim, seconds, slowest = replay(recording, profile=args.profile is not None)
+    print(f"{recording.ticks} ticks in {seconds:.2f} s ({recording.ticks / max(seconds, 1e-9):.0f} ticks/s, "
+          f"{recording.ticks / recording.tick_rate:.0f} s of play)")
+    print(f"room {sim.current_room_id}, lives {sim.lives}, collisions {sim.collisions}, won {sim.won}")
+    print("final state " + ("matches the recording" if get_state_digest(sim) == recording.digest else "DIVERGED from the recording"))
+    print("slowest ticks: " + ", ".join(f"#{tick} {ms:.2f} ms" for ms, tick in slowest))
+    if args.profile:
+        profiler.dump(args.profile, seconds=None)
+
+if __name__ == '__main__':
+    main()
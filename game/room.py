@@ -1,8 +1,20 @@
 import pygame
 import random
+import numpy as np
 from game.constants import *
 from game.obstacle import Obstacle
+from game.crowd import Crowd
 from game.npc import NPC
+from game.geometry import Rect
+from game.spatial import SpatialHash
+from game.text import render_text
+from game.background import background_cache
+from game.navigation import navigation_cache
+from game.placement import Placement
+from game.profiler import profiler
+from game.sprites import sprite_cache, SPRITE_MARGIN
+from game.surface_pool import surface_pool
+from game.particles import effects_rng
 
 class Room:
     # Venetian/Re:Invent themed room names
@@ -21,19 +33,35 @@ class Room:
     
     ROOM_THEMES = ["casino", "expo", "corridor"]
     
-    def __init__(self, room_id, is_goal=False):
+    # (min, max) wandering obstacles placed per theme (balance runs override it)
+    OBSTACLE_COUNTS = ROOM_OBSTACLE_COUNTS
+    
+    FAKE_EXIT_DIRECTIONS = ['north', 'south', 'east', 'west']
+    
+    def __init__(self, room_id, is_goal=False, rng=None, flavor=None):
+        if rng is None:
+            rng = random
         self.id = room_id
         self.is_goal = is_goal
         self.connections = {}  # direction: room_id
-        self.obstacles = []
         self.npcs = []
         self.initialized = False
         
         # Room flavor
-        self.name = random.choice(self.ROOM_NAMES) if not is_goal else "RE:INVENT KEYNOTE!"
-        self.theme = random.choice(self.ROOM_THEMES)
-        self.has_fake_exit = random.random() < 0.15  # 15% chance
-        self.fake_exit_direction = random.choice(['north', 'south', 'east', 'west'])
+        if flavor is None:
+            flavor = self.roll_flavor(rng, is_goal)
+        name_index, theme_index, self.has_fake_exit, fake_exit_index, self.content_seed = flavor
+        self.name = self.ROOM_NAMES[name_index] if not is_goal else "RE:INVENT KEYNOTE!"
+        self.theme = self.ROOM_THEMES[theme_index]
+        self.fake_exit_direction = self.FAKE_EXIT_DIRECTIONS[fake_exit_index]
+        
+        # Slot machines, crowd and NPCs are rebuilt from content_seed after eviction,
+        # or from saved_contents when a maze snapshot recorded them
+        self.contents_released = False
+        self.saved_contents = None
+        
+        # Moving obstacles, simulated together in NumPy arrays
+        self.crowd = Crowd(self, seed=self.content_seed + 1)
         
         # Jackpot animation (for casino theme)
         self.jackpot_timer = 0
@@ -42,17 +70,49 @@ class Room:
         # Static obstacles (slot machines, etc.)
         self.static_obstacles = []
         
+        # Broadphase indexes for collision and interaction queries
+        self.static_index = None  # Built from static_obstacles on first query
+        self.npc_index = None  # Built from npcs on first query
+        
         # Track last entrance used (to prevent spawning there)
         self.last_entrance = None
         self.entrance_cooldown = 0
-        
+        self.player_rect = None  # Where the player stood on the last tick, while they are in this room
+        
+        # Layout key of the cached static background (None = needs rebuilding)
+        self.background_key = None
+        self.navigation_key = None  # Same for the cached nav grid and flow fields
+        self.flow_fields = {}  # exit direction: flow field for navigation_key, so ticks skip the shared LRU
+        
+    @classmethod
+    def roll_flavor(cls, rng, is_goal=False):
+        """(name index, theme index, has fake exit, fake exit index, content seed) drawn from rng"""
+        name_index = rng.randrange(len(cls.ROOM_NAMES)) if not is_goal else 0
+        theme_index = rng.randrange(len(cls.ROOM_THEMES))
+        has_fake_exit = rng.random() < 0.15  # 15% chance
+        fake_exit_index = rng.randrange(len(cls.FAKE_EXIT_DIRECTIONS))
+        return (name_index, theme_index, has_fake_exit, fake_exit_index, rng.getrandbits(64))
+    
+    @property
+    def obstacles(self):
+        """Moving obstacles, in crowd slot order"""
+        return self.crowd.obstacles
+    
+    @obstacles.setter
+    def obstacles(self, obstacles):
+        obstacles = list(obstacles)
+        self.crowd.clear()
+        for obstacle in obstacles:
+            self.crowd.adopt(obstacle)
+    
     def add_connection(self, direction, room_id):
         """Add a connection to another room. Direction: 'north', 'south', 'east', 'west'"""
         self.connections[direction] = room_id
+        self.invalidate_background()
     
     def is_in_safe_zone(self, x, y):
         """Check if position is in a safe zone around exits"""
-        safe_zone_radius = 95  # Increased from 80
+        safe_zone_radius = SAFE_ZONE_RADIUS
         center_x = SCREEN_WIDTH // 2
         center_y = SCREEN_HEIGHT // 2
         
@@ -73,68 +133,50 @@ class Room:
         return False
     
     def initialize_contents(self, maze):
-        """Initialize obstacles and NPCs for this room"""
+        """Initialize obstacles and NPCs for this room (deterministic from content_seed)"""
         if self.initialized or self.is_goal:
             return
         
         self.initialized = True
+        self.invalidate_background()
+        if self.saved_contents is not None:
+            self.restore_contents(self.saved_contents, maze)
+            return
+        rng = random.Random(self.content_seed)
+        
+        placement = Placement(self.connections)
         
         # Add static obstacles based on theme
         if self.theme == "casino":
-            # Add 3-6 slot machines
-            num_slots = random.randint(3, 6)
+            # Add 3-6 slot machines, at least 80 apart
+            num_slots = rng.randint(3, 6)
             for _ in range(num_slots):
-                attempts = 0
-                while attempts < 30:
-                    x = random.randint(ROOM_PADDING + 60, SCREEN_WIDTH - ROOM_PADDING - 100)
-                    y = random.randint(ROOM_PADDING + 60, SCREEN_HEIGHT - ROOM_PADDING - 100)
-                    
-                    # Check if too close to other slot machines or in safe zone
-                    too_close = False
-                    for slot in self.static_obstacles:
-                        distance = ((x - slot['x'])**2 + (y - slot['y'])**2)**0.5
-                        if distance < 80:
-                            too_close = True
-                            break
-                    
-                    if not self.is_in_safe_zone(x, y) and not too_close:
-                        self.static_obstacles.append({
-                            'type': 'slot_machine',
-                            'x': x,
-                            'y': y,
-                            'width': 40,
-                            'height': 50
-                        })
-                        break
-                    attempts += 1
-        
-        # Add moving obstacles based on theme (reduced since we have through-traffic now)
-        if self.theme == "casino":
-            # Casino rooms have fewer people (slot machines take up space)
-            num_obstacles = random.randint(1, 3)
-        elif self.theme == "expo":
-            # Expo halls have moderate conference crowds
-            num_obstacles = random.randint(2, 4)
-        else:  # corridor
-            # Corridors have some wandering people
-            num_obstacles = random.randint(2, 4)
+                position = placement.place(rng, 40, 50, 40, (ROOM_PADDING + 60, ROOM_PADDING + 60, SCREEN_WIDTH - ROOM_PADDING - 100, SCREEN_HEIGHT - ROOM_PADDING - 100))
+                if position is None:
+                    break
+                self.static_obstacles.append({
+                    'type': 'slot_machine',
+                    'x': position[0],
+                    'y': position[1],
+                    'width': 40,
+                    'height': 50
+                })
+        
+        # Add moving obstacles based on theme (reduced since we have through-traffic now).
+        # Casino rooms have fewer people (slot machines take up space); expo halls have
+        # moderate conference crowds and corridors some wandering people.
+        num_obstacles = rng.randint(*self.OBSTACLE_COUNTS[self.theme])
         
         obstacle_types = ["conference_goer", "casino_goer", "janitor", "influencer", "phone_person"]
         
         for _ in range(num_obstacles):
-            # Try to spawn obstacle outside safe zones
-            attempts = 0
-            while attempts < 20:
-                x = random.randint(ROOM_PADDING + 50, SCREEN_WIDTH - ROOM_PADDING - 80)
-                y = random.randint(ROOM_PADDING + 50, SCREEN_HEIGHT - ROOM_PADDING - 80)
-                if not self.is_in_safe_zone(x, y):
-                    break
-                attempts += 1
-            
-            obstacle_type = random.choice(obstacle_types)
-            obstacle = Obstacle(x, y, obstacle_type)
-            obstacle.room = self  # Give obstacle reference to room for safe zone checking
-            self.obstacles.append(obstacle)
+            # Start clear of slot machines, safe zones and each other
+            position = placement.place(rng, Obstacle.SIZE, Obstacle.SIZE, 20, (ROOM_PADDING + 50, ROOM_PADDING + 50, SCREEN_WIDTH - ROOM_PADDING - 80, SCREEN_HEIGHT - ROOM_PADDING - 80))
+            if position is None:
+                break
+            obstacle_type = rng.choice(obstacle_types)
+            obstacle = Obstacle(position[0], position[1], obstacle_type, rng, self.crowd)
+            obstacle.room = self
         
         # Add NPCs based on theme
         if self.theme == "expo":
@@ -145,73 +187,213 @@ class Room:
             max_npcs = 2
         
         for _ in range(max_npcs):
-            if random.random() < 0.6:  # Same 60% spawn rate
-                attempts = 0
-                while attempts < 20:
-                    x = random.randint(ROOM_PADDING + 100, SCREEN_WIDTH - ROOM_PADDING - 100)
-                    y = random.randint(ROOM_PADDING + 100, SCREEN_HEIGHT - ROOM_PADDING - 100)
-                    
-                    # Check safe zone and distance from other NPCs
-                    too_close = False
-                    for existing_npc in self.npcs:
-                        distance = ((x - existing_npc.x)**2 + (y - existing_npc.y)**2)**0.5
-                        if distance < 80:  # Minimum distance between NPCs
-                            too_close = True
-                            break
-                    
-                    if not self.is_in_safe_zone(x, y) and not too_close:
-                        break
-                    attempts += 1
-                
-                self.npcs.append(NPC(x, y, self.id, maze))
-    
-    def update(self, player_rect):
-        """Update room contents"""
-        for obstacle in self.obstacles:
-            obstacle.update()
+            if rng.random() < 0.6:  # Same 60% spawn rate
+                # At least 80 from other NPCs and out of every safe zone
+                position = placement.place(rng, 35, 35, 40, (ROOM_PADDING + 100, ROOM_PADDING + 100, SCREEN_WIDTH - ROOM_PADDING - 100, SCREEN_HEIGHT - ROOM_PADDING - 100))
+                if position is not None:
+                    self.npcs.append(NPC(position[0], position[1], self.id, maze, rng))
+    
+    def get_saved_contents(self):
+        """Slot machines, wandering obstacles and NPCs as plain values, for restore_contents"""
+        return {
+            'static_obstacles': [dict(obj) for obj in self.static_obstacles],
+            'obstacles': [(obstacle.x, obstacle.y, obstacle.type, obstacle.direction, obstacle.speed,
+                           obstacle.change_direction_interval)
+                          for obstacle in self.obstacles if obstacle.movement_mode != "through_traffic"],
+            'npcs': [(npc.x, npc.y, npc.dialogue, npc.is_lying) for npc in self.npcs]
+        }
+    
+    def restore_contents(self, contents, maze):
+        """Rebuild contents recorded by get_saved_contents"""
+        rng = random.Random(self.content_seed)
+        self.static_obstacles = [dict(obj) for obj in contents['static_obstacles']]
+        for x, y, obstacle_type, direction, speed, change_interval in contents['obstacles']:
+            obstacle = Obstacle(x, y, obstacle_type, rng, self.crowd)
+            obstacle.room = self
+            obstacle.direction = direction
+            obstacle.speed = speed
+            obstacle.change_direction_interval = change_interval
+        for x, y, dialogue, is_lying in contents['npcs']:
+            npc = NPC(x, y, self.id, maze, rng)
+            npc.dialogue = dialogue
+            npc.is_lying = is_lying
+            self.npcs.append(npc)
+    
+    def release_contents(self):
+        """Drop obstacles, NPCs and slot machines; initialize_contents rebuilds the same ones"""
+        if not self.initialized:
+            return
+        self.obstacles = []
+        self.npcs = []
+        self.static_obstacles = []
+        self.static_index = None
+        self.npc_index = None
+        self.crowd.rng = None  # Restart the crowd's random stream with the contents
+        self.initialized = False
+        self.contents_released = True
+        self.invalidate_background()
+    
+    def update(self, player_rect, rng=random):
+        """Update room contents. Returns the through-traffic walkers that left through an exit.
+        
+        Through-traffic spawns draw from rng (the simulation's random stream).
+        """
+        self.player_rect = player_rect
+        self.crowd.sync()
+        self.crowd.save_positions()
+        self.crowd.update()
         
         # Remove obstacles that reached their exit
-        self.obstacles = [obs for obs in self.obstacles if not getattr(obs, 'reached_exit', False)]
+        departed = self.crowd.remove_reached()
         
         # Update entrance cooldown
         if self.entrance_cooldown > 0:
             self.entrance_cooldown -= 1
         
-        # Cap total obstacles at 10
-        max_obstacles = 10
-        
         # Spawn new through-traffic obstacles if room has multiple exits and not too crowded
-        if len(self.connections) >= 2 and len(self.obstacles) < max_obstacles and random.random() < 0.01:  # 1% chance per frame
-            self.spawn_through_traffic_obstacle()
+        if len(self.connections) >= 2 and len(self.obstacles) < MAX_ROOM_OBSTACLES and rng.random() < 0.01:  # 1% chance per frame
+            self.spawn_through_traffic_obstacle(rng)
         
         for npc in self.npcs:
             npc.update()
+        return departed
+    
+    def update_background(self, ticks, detailed=True, rng=random, build_fields=True):
+        """Advance an off-screen room by several ticks at once, without any drawing state.
+        
+        detailed runs the crowd's coarse model (movement only); otherwise only
+        through-traffic moves. build_fields False never builds a flow field
+        (see Crowd.update). Returns the walkers that left through an exit.
+        """
+        self.crowd.sync()
+        if detailed:
+            self.crowd.update(ticks, coarse=True, build_fields=build_fields)
+        else:
+            self.crowd.advance_traffic(ticks, build_fields)
+        departed = self.crowd.remove_reached()
+        self.entrance_cooldown = max(self.entrance_cooldown - ticks, 0)
+        
+        # Same 1% per tick spawn chance, compounded over the skipped ticks
+        if len(self.connections) >= 2 and len(self.obstacles) < MAX_ROOM_OBSTACLES and rng.random() < 1 - 0.99 ** ticks:
+            self.spawn_through_traffic_obstacle(rng)
+        return departed
+    
+    def accept_walker(self, obstacle, entrance, rng=random):
+        """Let a through-traffic walker from a neighboring room in through entrance.
+        
+        It heads for one of the other exits. Returns False (and the walker is
+        dropped) if the room is full, is a dead end, or the player just came
+        in through that entrance or is standing in it.
+        """
+        if len(self.obstacles) >= MAX_ROOM_OBSTACLES or entrance not in self.connections:
+            return False
+        if self.entrance_cooldown > 0 and entrance == self.last_entrance:
+            return False
+        if not self.is_entrance_clear(entrance):
+            return False
+        exits = [d for d in self.connections if d != entrance]
+        if not exits:
+            return False
+        
+        self.crowd.sync()
+        self.crowd.adopt(obstacle)
+        obstacle.room = self
+        obstacle.set_through_traffic(entrance, rng.choice(exits))
+        return True
+    
+    def get_static_index(self):
+        """Spatial index of static obstacle rects, built once per layout"""
+        if self.static_index is None or len(self.static_index) != len(self.static_obstacles):
+            self.static_index = SpatialHash()
+            for static_obj in self.static_obstacles:
+                self.static_index.insert(static_obj, Rect(static_obj['x'], static_obj['y'],
+                                                          static_obj['width'], static_obj['height']))
+        return self.static_index
+    
+    def get_npc_index(self):
+        """Spatial index of NPC positions (NPCs never move)"""
+        if self.npc_index is None or len(self.npc_index) != len(self.npcs):
+            self.npc_index = SpatialHash()
+            for npc in self.npcs:
+                self.npc_index.insert(npc, npc.get_rect())
+        return self.npc_index
     
     def check_collisions(self, player_rect):
         """Check if player collides with any moving obstacles"""
-        for obstacle in self.obstacles:
-            if player_rect.colliderect(obstacle.get_rect()):
-                return True
-        return False
+        self.crowd.sync()
+        return self.crowd.first_colliding(player_rect) is not None
     
     def check_static_collision(self, player_rect):
         """Check if player collides with static obstacles (returns True to block movement)"""
-        for static_obj in self.static_obstacles:
-            static_rect = pygame.Rect(static_obj['x'], static_obj['y'], 
-                                     static_obj['width'], static_obj['height'])
-            if player_rect.colliderect(static_rect):
-                return True
-        return False
+        if not self.static_obstacles:
+            return False
+        return self.get_static_index().first_colliding(player_rect) is not None
     
     def check_npc_interaction(self, player_rect):
         """Check if player can interact with any NPC"""
-        for npc in self.npcs:
+        if not self.npcs:
+            return None
+        index = self.get_npc_index()
+        candidates = self.npcs
+        if index.bucketed:
+            reach = NPC.INTERACTION_DISTANCE
+            candidates = index.query(Rect(player_rect.x - reach, player_rect.y - reach, 2 * reach + 1, 2 * reach + 1))
+        for npc in candidates:
             if npc.check_interaction(player_rect):
                 return npc
         return None
     
-    def draw(self, screen):
-        # Draw room background
+    def invalidate_background(self):
+        """Force the static background (and navigation) to be looked up again"""
+        self.background_key = None
+        self.navigation_key = None
+        self.flow_fields = {}
+    
+    def get_background_key(self):
+        """Hashable description of everything drawn into the static background"""
+        if self.background_key is None:
+            fake_exit = None
+            if self.has_fake_exit and self.fake_exit_direction not in self.connections:
+                fake_exit = self.fake_exit_direction
+            statics = tuple((obj['type'], obj['x'], obj['y'], obj['width'], obj['height'])
+                            for obj in self.static_obstacles)
+            self.background_key = (self.theme, self.is_goal, frozenset(self.connections),
+                                   fake_exit, statics)
+        return self.background_key
+    
+    def get_navigation_key(self):
+        """Hashable description of what through-traffic has to walk around"""
+        if self.navigation_key is None:
+            statics = tuple((obj['x'], obj['y'], obj['width'], obj['height']) for obj in self.static_obstacles)
+            self.navigation_key = (frozenset(self.connections), statics)
+        return self.navigation_key
+    
+    def get_flow_field(self, exit_direction, build=True):
+        """Shared flow field toward exit_direction for this room's layout.
+        
+        Only through-traffic (and bots) ask for one, so rooms where everyone
+        wanders never look a layout up. With build False a field that is
+        not built yet comes back as None and is queued in navigation_cache
+        instead of built on the spot.
+        """
+        field = self.flow_fields.get(exit_direction)
+        if field is None:
+            key = self.get_navigation_key()
+            if build:
+                field = navigation_cache.get_flow_field(key, exit_direction, key[0], key[1])
+            else:
+                field = navigation_cache.peek_flow_field(key, exit_direction, key[0], key[1])
+                if field is None:
+                    return None
+            self.flow_fields[exit_direction] = field
+        return field
+    
+    def get_background(self):
+        """Return the pre-rendered static background, shared between identical layouts"""
+        return background_cache.get(self.get_background_key(), self.draw_background)
+    
+    def draw_background(self, screen):
+        """Draw everything that does not change while the player is in the room"""
         screen.fill(BLACK_900)
         
         # Draw casino-style carpet pattern
@@ -235,24 +417,7 @@ class Room:
                          SCREEN_HEIGHT - 2*ROOM_PADDING), border_width)
         
         # Draw exits as paths with glow
-        exit_color = PREY_700
-        if self.is_goal:
-            exit_color = PURPLE_500
-            # Draw goal room with pulsing effect
-            import math
-            pulse = abs(math.sin(pygame.time.get_ticks() * 0.005)) * 30
-            glow_color = tuple(min(c + int(pulse), 255) for c in PURPLE_500)
-            
-            font = pygame.font.Font(None, 64)
-            text = font.render("RE:INVENT ROOM!", True, glow_color)
-            text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
-            
-            # Draw glow background
-            glow_surface = pygame.Surface((text_rect.width + 40, text_rect.height + 20), pygame.SRCALPHA)
-            pygame.draw.rect(glow_surface, (*PURPLE_500, 100), glow_surface.get_rect(), border_radius=10)
-            screen.blit(glow_surface, (text_rect.x - 20, text_rect.y - 10))
-            
-            screen.blit(text, text_rect)
+        exit_color = PURPLE_500 if self.is_goal else PREY_700
         
         # Draw paths to exits with gradient
         if 'north' in self.connections:
@@ -280,32 +445,126 @@ class Room:
                 pygame.draw.rect(screen, color,
                                (i, SCREEN_HEIGHT//2 - EXIT_SIZE//2, 2, EXIT_SIZE))
         
-        # Draw static obstacles first (behind moving ones)
+        # Draw static obstacles (behind everything that moves)
         for static_obj in self.static_obstacles:
             self.draw_static_obstacle(screen, static_obj)
         
+        # Draw fake exit if present
+        if self.has_fake_exit and self.fake_exit_direction not in self.connections:
+            self.draw_fake_exit(screen)
+        
+        # Draw fixed theme banners
+        self.draw_theme_decorations(screen)
+    
+    def draw(self, screen):
+        # Blit the pre-rendered static layer
+        screen.blit(self.get_background(), (0, 0))
+        self.draw_dynamic(screen)
+    
+    def draw_dynamic(self, screen):
+        """Draw everything on top of the static background"""
+        if self.is_goal:
+            self.draw_goal_banner(screen)
+        
         # Draw obstacles
-        for obstacle in self.obstacles:
-            obstacle.draw(screen)
+        with profiler.span('Obstacle.draw'):
+            self.draw_obstacles(screen)
         
         # Draw NPCs
         for npc in self.npcs:
-            npc.draw(screen)
+            with profiler.span('NPC.draw'):
+                npc.draw(screen)
         
         # Draw room name with styled background
-        font = pygame.font.Font(None, 22)
-        text = font.render(self.name, True, WHITE)
-        bg_rect = pygame.Rect(5, 5, text.get_width() + 10, text.get_height() + 10)
+        text = render_text(self.name, 22, WHITE)
+        bg_rect = self.get_name_rect(text)
         pygame.draw.rect(screen, PREY_750, bg_rect, border_radius=5)
         pygame.draw.rect(screen, PURPLE_500, bg_rect, 2, border_radius=5)
         screen.blit(text, (10, 10))
         
-        # Draw fake exit if present
-        if self.has_fake_exit and self.fake_exit_direction not in self.connections:
-            self.draw_fake_exit(screen)
+        # Draw animated theme elements
+        if self.theme == "casino":
+            self.draw_jackpot(screen)
+    
+    def draw_obstacles(self, screen):
+        """Blit the whole crowd in one batch, then the speech bubbles on top"""
+        if not sprite_cache.enabled:
+            for obstacle in self.obstacles:
+                obstacle.draw(screen)
+            return
         
-        # Draw theme-specific decorations
-        self.draw_theme_decorations(screen)
+        crowd = self.crowd
+        crowd.sync()
+        n = len(crowd)
+        if not n:
+            return
+        sprites = [sprite_cache.get_obstacle_sprite(obstacle_type, Obstacle.SIZE, color)
+                   for obstacle_type, color in Obstacle.COLORS.items()]
+        xs = (crowd.x[:n].astype(int) - SPRITE_MARGIN).tolist()
+        ys = (crowd.y[:n].astype(int) - SPRITE_MARGIN).tolist()
+        screen.blits(zip(map(sprites.__getitem__, crowd.kind[:n].tolist()), zip(xs, ys)), doreturn=False)
+        
+        # Big crowds would be a wall of text; only the first few bubbles are shown
+        for slot in np.flatnonzero(crowd.speech_timer[:n])[:MAX_SPEECH_BUBBLES].tolist():
+            obstacle = crowd.obstacles[slot]
+            if obstacle.speech_text:
+                obstacle.draw_speech_bubble(screen)
+    
+    def warm_render_caches(self):
+        """Render everything the first draw of this room would otherwise build cold"""
+        self.get_background()
+        self.get_name_rect()
+        for obstacle in self.obstacles:
+            sprite_cache.get_obstacle_sprite(obstacle.type, obstacle.width, obstacle.color)
+        for npc in self.npcs:
+            sprite_cache.get_npc_sprite(npc.width, npc.color)
+            sprite_cache.get_question_sprite(npc.color)
+            for radius in range(npc.width // 2, npc.width // 2 + 11):  # Every size of the pulsing glow
+                sprite_cache.get_glow_sprite(radius, npc.color)
+            render_text(npc.get_current_dialogue(), 20, WHITE)
+    
+    def get_name_rect(self, text=None):
+        if text is None:
+            text = render_text(self.name, 22, WHITE)
+        return pygame.Rect(5, 5, text.get_width() + 10, text.get_height() + 10)
+    
+    def get_goal_banner_rect(self):
+        text = render_text("RE:INVENT ROOM!", 64, PURPLE_500)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
+        return text_rect.inflate(40, 20)
+    
+    def get_jackpot_rect(self):
+        jackpot_rect = render_text("JACKPOT!", 64, (255, 165, 0)).get_rect()
+        jackpot_rect.topleft = (SCREEN_WIDTH - 250, ROOM_PADDING + 20)
+        return jackpot_rect.inflate(20, 10)
+    
+    def get_dynamic_bounds(self):
+        """Screen rects touched by draw_dynamic this frame"""
+        bounds = [self.get_name_rect()]
+        if self.is_goal:
+            bounds.append(self.get_goal_banner_rect())
+        if self.show_jackpot:
+            bounds.append(self.get_jackpot_rect())
+        for obstacle in self.obstacles:
+            bounds.extend(obstacle.get_bounds())
+        for npc in self.npcs:
+            bounds.extend(npc.get_bounds())
+        return bounds
+    
+    def draw_goal_banner(self, screen):
+        """Draw the pulsing goal room title"""
+        import math
+        pulse = abs(math.sin(pygame.time.get_ticks() * 0.005)) * 30
+        glow_color = tuple(min(c + int(pulse), 255) for c in PURPLE_500)
+        
+        text = render_text("RE:INVENT ROOM!", 64, glow_color)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
+        
+        # Draw glow background
+        glow_surface = surface_pool.get_overlay((text_rect.width + 40, text_rect.height + 20), PURPLE_500, 100, border_radius=10)
+        screen.blit(glow_surface, (text_rect.x - 20, text_rect.y - 10))
+        
+        screen.blit(text, text_rect)
     
     def draw_fake_exit(self, screen):
         """Draw a fake exit that looks real but isn't"""
@@ -346,8 +605,7 @@ class Room:
             pygame.draw.rect(screen, (100, 100, 150), screen_rect, 2)
             
             # Slot symbols (777)
-            font = pygame.font.Font(None, 18)
-            symbols = font.render("777", True, (255, 215, 0))
+            symbols = render_text("777", 18, (255, 215, 0))
             screen.blit(symbols, (x + 8, y + 12))
             
             # Coin slot
@@ -364,52 +622,60 @@ class Room:
             pygame.draw.rect(screen, (255, 215, 0), (x, y, w, h), 2)
     
     def draw_theme_decorations(self, screen):
-        """Draw theme-specific visual elements"""
+        """Draw fixed theme-specific visual elements"""
         if self.theme == "casino":
             # Slot machine text in corners
-            font = pygame.font.Font(None, 48)
-            text = font.render("SLOTS", True, (255, 200, 0))
+            text = render_text("SLOTS", 48, (255, 200, 0))
             screen.blit(text, (ROOM_PADDING + 20, ROOM_PADDING + 20))
-            
-            # Controlled "JACKPOT" animation (accessibility-friendly)
-            if not self.show_jackpot and random.random() < 0.002:  # Much less frequent
-                self.show_jackpot = True
-                self.jackpot_timer = 180  # Show for 3 seconds
-            
-            if self.show_jackpot:
-                self.jackpot_timer -= 1
-                if self.jackpot_timer <= 0:
-                    self.show_jackpot = False
-                
-                # Gentle fade instead of harsh flash
-                alpha = min(255, self.jackpot_timer * 3) if self.jackpot_timer < 60 else 255
-                
-                jackpot_font = pygame.font.Font(None, 64)
-                # Use softer, more accessible color (orange instead of bright yellow)
-                jackpot_text = jackpot_font.render("JACKPOT!", True, (255, 165, 0))
-                jackpot_rect = jackpot_text.get_rect()
-                jackpot_rect.topleft = (SCREEN_WIDTH - 250, ROOM_PADDING + 20)
-                
-                # Draw with background for better contrast
-                bg_rect = jackpot_rect.inflate(20, 10)
-                pygame.draw.rect(screen, (50, 50, 50), bg_rect, border_radius=8)
-                screen.blit(jackpot_text, jackpot_rect)
         
         elif self.theme == "expo":
             # Conference banners
             pygame.draw.rect(screen, PURPLE_500, 
                            (SCREEN_WIDTH//2 - 120, ROOM_PADDING + 10, 240, 40))
-            font = pygame.font.Font(None, 28)
-            text = font.render("AWS RE:INVENT 2024", True, WHITE)
+            text = render_text("AWS RE:INVENT 2024", 28, WHITE)
             screen.blit(text, (SCREEN_WIDTH//2 - 110, ROOM_PADDING + 20))
         
         elif self.theme == "corridor":
             # Hotel corridor signs
-            font = pygame.font.Font(None, 24)
-            text = font.render("← Rooms 500-599", True, PREY_300)
+            text = render_text("← Rooms 500-599", 24, PREY_300)
             screen.blit(text, (ROOM_PADDING + 10, SCREEN_HEIGHT - ROOM_PADDING - 35))
     
-    def spawn_through_traffic_obstacle(self):
+    def update_jackpot(self):
+        """Advance the casino's "JACKPOT" banner by one tick (presentation only, so it rolls effects_rng)"""
+        if not self.show_jackpot and effects_rng.random() < 0.002:  # Much less frequent
+            self.show_jackpot = True
+            self.jackpot_timer = 180  # Show for 3 seconds
+        
+        if self.show_jackpot:
+            self.jackpot_timer -= 1
+            if self.jackpot_timer <= 0:
+                self.show_jackpot = False
+    
+    def draw_jackpot(self, screen):
+        """Draw the controlled "JACKPOT" animation (accessibility-friendly)"""
+        if self.show_jackpot:
+            # Gentle fade instead of harsh flash
+            alpha = min(255, self.jackpot_timer * 3) if self.jackpot_timer < 60 else 255
+            
+            # Use softer, more accessible color (orange instead of bright yellow)
+            jackpot_text = render_text("JACKPOT!", 64, (255, 165, 0))
+            jackpot_rect = jackpot_text.get_rect()
+            jackpot_rect.topleft = (SCREEN_WIDTH - 250, ROOM_PADDING + 20)
+            
+            # Draw with background for better contrast
+            bg_rect = jackpot_rect.inflate(20, 10)
+            pygame.draw.rect(screen, (50, 50, 50), bg_rect, border_radius=8)
+            screen.blit(jackpot_text, jackpot_rect)
+    
+    def is_entrance_clear(self, direction):
+        """False while the player is within a walker's width of where walkers come in through direction"""
+        if self.player_rect is None:
+            return True
+        size = Obstacle.SIZE
+        x, y = Obstacle.get_entrance_position(direction, size, size)
+        return not self.player_rect.colliderect(Rect(x - size, y - size, size * 3, size * 3))
+    
+    def spawn_through_traffic_obstacle(self, rng=random):
         """Spawn an obstacle that walks from one exit to another"""
         if len(self.connections) < 2:
             return
@@ -417,26 +683,28 @@ class Room:
         # Pick random entrance and exit, avoiding the last entrance used by player
         directions = list(self.connections.keys())
         
-        # Filter out the last entrance if cooldown is active
+        # Filter out the last entrance if cooldown is active, and any doorway the player stands in
+        blocked = [d for d in directions if not self.is_entrance_clear(d)]
         if self.entrance_cooldown > 0 and self.last_entrance in directions:
-            available_starts = [d for d in directions if d != self.last_entrance]
+            blocked.append(self.last_entrance)
+        if blocked:
+            available_starts = [d for d in directions if d not in blocked]
             if not available_starts:
                 return
-            start_dir = random.choice(available_starts)
+            start_dir = rng.choice(available_starts)
         else:
-            start_dir = random.choice(directions)
+            start_dir = rng.choice(directions)
         
-        end_dir = random.choice([d for d in directions if d != start_dir])
+        end_dir = rng.choice([d for d in directions if d != start_dir])
         
         # Create obstacle
         obstacle_types = ["conference_goer", "casino_goer", "janitor", "phone_person"]
-        obstacle_type = random.choice(obstacle_types)
+        obstacle_type = rng.choice(obstacle_types)
         
-        obstacle = Obstacle(0, 0, obstacle_type)
+        self.crowd.sync()
+        obstacle = Obstacle(0, 0, obstacle_type, rng, self.crowd)
         obstacle.room = self
         obstacle.set_through_traffic(start_dir, end_dir)
-        
-        self.obstacles.append(obstacle)
     
     def check_exit(self, player_rect):
         """Check if player is at an exit and return the direction"""
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+from game.constants import *
+
+class RoomCache:
+    """Bounded LRU of rooms whose contents are initialized.
+
+    When more than max_rooms rooms hold obstacles and NPCs, the least
+    recently used one releases its contents and the maze forgets the Room
+    object. Re-entering it rebuilds the same room, slot machines, crowd
+    and NPCs from the maze seed and the room's content seed.
+    """
+
+    def __init__(self, max_rooms=ROOM_CACHE_SIZE):
+        self.max_rooms = max_rooms
+        self.rooms = OrderedDict()  # room_id: Room with live contents
+        self.evicted = set()  # Ids of evicted rooms not entered again yet
+
+        # Cache statistics
+        self.evictions = 0
+        self.regenerations = 0
+
+    def use(self, room, maze):
+        """Initialize room's contents if needed and mark it most recently used"""
+        if not room.initialized:
+            if room.contents_released or room.id in self.evicted:
+                self.evicted.discard(room.id)
+                self.regenerations += 1
+            room.initialize_contents(maze)
+            if not room.initialized:
+                return  # The goal room has no contents
+
+        if self.rooms.get(room.id) is room:
+            self.rooms.move_to_end(room.id)
+            return
+
+        # A streaming maze may have rebuilt the Room object since it was cached
+        self.rooms.pop(room.id, None)
+        self.rooms[room.id] = room
+        while len(self.rooms) > self.max_rooms:
+            _, evicted = self.rooms.popitem(last=False)
+            evicted.release_contents()
+            maze.release_room(evicted)
+            self.evicted.add(evicted.id)
+            self.evictions += 1
+
+    def get_stats(self):
+        return {
+            'live_rooms': len(self.rooms),
+            'max_rooms': self.max_rooms,
+            'evictions': self.evictions,
+            'regenerations': self.regenerations
+        }
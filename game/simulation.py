@@ -0,0 +1,262 @@
+import random
+import numpy as np
+from game.constants import *
+from game.player import Player
+from game.maze import Maze
+from game.streaming_maze import StreamingMaze
+from game.maze_snapshot import load_maze
+from game.room_cache import RoomCache
+from game.background_sim import BackgroundSimulation
+from game.profiler import profiler
+
+# Per-tick input bits
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_LEFT = 4
+INPUT_RIGHT = 8
+INPUT_INTERACT = 16  # E - talk to NPCs
+INPUT_RESTART = 32  # R - start a new game after winning
+
+# Moves longer than this in one tick (spawns, hand-offs, room changes) are drawn without interpolation
+INTERPOLATE_MAX_STEP = 20
+
+class Interpolation:
+    """Moves the player and the current room's walkers alpha of the way from
+    their positions before the last tick to their current ones, and puts
+    them back on exit. Drawing code inside just reads the usual attributes.
+    """
+
+    def __init__(self, sim, alpha):
+        self.sim = sim
+        self.alpha = alpha
+        self.player_position = None
+        self.crowd = None
+
+    def __enter__(self):
+        sim = self.sim
+        alpha = self.alpha
+        if alpha >= 1 or sim.previous_room_id != sim.current_room_id:
+            return self
+
+        player = sim.player
+        px, py = sim.previous_player_position
+        if abs(player.x - px) <= INTERPOLATE_MAX_STEP and abs(player.y - py) <= INTERPOLATE_MAX_STEP:
+            self.player_position = (player.x, player.y)
+            player.x = px + (player.x - px) * alpha
+            player.y = py + (player.y - py) * alpha
+
+        crowd = sim.get_current_room().crowd
+        crowd.sync()
+        n = crowd.count
+        if n:
+            self.crowd = crowd
+            self.crowd_positions = (crowd.x, crowd.y)
+            dx = crowd.x[:n] - crowd.prev_x[:n]
+            dy = crowd.y[:n] - crowd.prev_y[:n]
+            smooth = (np.abs(dx) <= INTERPOLATE_MAX_STEP) & (np.abs(dy) <= INTERPOLATE_MAX_STEP)
+            crowd.x = crowd.x.copy()
+            crowd.y = crowd.y.copy()
+            crowd.x[:n] -= np.where(smooth, dx * (1 - alpha), 0)
+            crowd.y[:n] -= np.where(smooth, dy * (1 - alpha), 0)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.player_position is not None:
+            self.sim.player.x, self.sim.player.y = self.player_position
+        if self.crowd is not None:
+            self.crowd.x, self.crowd.y = self.crowd_positions
+        return False
+
+class Simulation:
+    """Display-free game core: maze, room contents, player movement,
+    collisions, exits, lives and win state.
+
+    Never touches the pygame display, clock or keyboard. Each tick takes an
+    explicit input bitmask, so the game can be stepped as fast as the CPU
+    allows with no window at all.
+    """
+
+    def __init__(self, num_rooms=MAZE_ROOMS, max_lives=3, seed=None, streaming=STREAMING_MAZE,
+                 goal_distance=STREAMING_GOAL_DISTANCE, room_cache_size=ROOM_CACHE_SIZE, snapshot=MAZE_SNAPSHOT,
+                 deterministic=False, loop_chance=MAZE_LOOP_CHANCE):
+        # Everything random in the simulation draws from this stream (or from seeds taken
+        # from it), so simulations in one process do not disturb each other
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.deterministic = deterministic  # No wall-clock decisions, so a seed and inputs replay exactly
+        self.num_rooms = num_rooms
+        self.streaming = streaming
+        self.snapshot = snapshot
+        self.goal_distance = goal_distance
+        self.loop_chance = loop_chance
+        self.room_cache_size = room_cache_size
+        self.max_lives = max_lives
+        self.ticks = 0
+        self.new_game()
+
+    def new_game(self, invincibility_frames=0):
+        """Build a fresh maze and reset the player's progress"""
+        if self.streaming:
+            self.maze = StreamingMaze(self.goal_distance, MAZE_CHUNK_SIZE, MAZE_KEEP_CHUNKS, seed=self.rng.getrandbits(64),
+                                      loop_chance=self.loop_chance)
+        elif self.snapshot is not None:
+            self.maze = load_maze(self.snapshot)
+        else:
+            self.maze = Maze(self.num_rooms, seed=self.rng.getrandbits(64), loop_chance=self.loop_chance)
+        self.room_cache = RoomCache(self.room_cache_size)
+        self.background = BackgroundSimulation(deterministic=self.deterministic, rng=self.rng)
+        self.current_room_id = self.maze.start_room_id
+        self.player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+
+        # State before the last tick, for render interpolation
+        self.previous_room_id = self.current_room_id
+        self.previous_player_position = (self.player.x, self.player.y)
+
+        # Invincibility frames
+        self.invincibility_frames = invincibility_frames
+
+        # Lives system
+        self.lives = self.max_lives
+
+        # Game stats
+        self.steps_taken = 0
+        self.rooms_visited = set([self.current_room_id])
+        self.time_elapsed = 0
+        self.collisions = 0
+
+        self.won = False
+
+    def get_current_room(self):
+        return self.maze.get_room(self.current_room_id)
+
+    def tick(self, inputs=0):
+        """Advance the game by one tick. Returns the list of events that happened."""
+        events = []
+        self.ticks += 1
+        self.previous_room_id = self.current_room_id
+        self.previous_player_position = (self.player.x, self.player.y)
+
+        # Update invincibility
+        if self.invincibility_frames > 0:
+            self.invincibility_frames -= 1
+
+        if self.won:
+            if inputs & INPUT_RESTART:
+                self.new_game(invincibility_frames=120)  # 2 seconds of invincibility on new game
+                events.append('restart')
+            return events
+
+        # Update game stats
+        self.time_elapsed += 1
+
+        # Handle player movement
+        dx = bool(inputs & INPUT_RIGHT) - bool(inputs & INPUT_LEFT)
+        dy = bool(inputs & INPUT_DOWN) - bool(inputs & INPUT_UP)
+
+        current_room = self.get_current_room()
+
+        # Initialize room contents if not done (or rebuild them after eviction)
+        self.room_cache.use(current_room, self.maze)
+
+        self.player.move(dx, dy, current_room)
+
+        # Update room (obstacles, NPCs)
+        player_rect = self.player.get_rect()
+        with profiler.span('Room.update'):
+            departed = current_room.update(player_rect, self.rng)
+
+        # Hand off walkers that left, and keep the other live rooms moving, within the per-frame budget
+        with profiler.span('Background.tick'):
+            self.background.tick(self.maze, self.room_cache, self.current_room_id, departed)
+
+        # Check for collisions with obstacles (only if not invincible)
+        if self.invincibility_frames == 0 and current_room.check_collisions(player_rect):
+            self.on_collision(events)
+            return events
+
+        # Check for NPC interaction (E key)
+        if inputs & INPUT_INTERACT:
+            npc = current_room.check_npc_interaction(player_rect)
+            if npc:
+                npc.interact()
+                events.append('npc_interaction')
+
+        # Check for room transitions
+        exit_direction = current_room.check_exit(player_rect)
+        if exit_direction:
+            next_room_id = current_room.connections[exit_direction]
+            self.transition_room(next_room_id, exit_direction)
+            events.append('room_changed')
+            if self.won:
+                events.append('won')
+
+        return events
+
+    def interpolated(self, alpha):
+        """Context manager for drawing the state alpha (0-1) of the way through the last tick"""
+        return Interpolation(self, alpha)
+
+    def begin_frame(self):
+        """Start a rendered frame: every tick until the next call shares one background budget"""
+        self.background.begin_frame()
+
+    def step(self, n=1, inputs=0):
+        """Run n ticks back to back with no frame pacing.
+
+        inputs is either a fixed bitmask or a callable taking the simulation
+        and returning the bitmask for the next tick (e.g. a bot). Each tick
+        counts as a frame of its own for the background budget. Returns the
+        events of all ticks in order.
+        """
+        events = []
+        for _ in range(n):
+            self.begin_frame()
+            tick_inputs = inputs(self) if callable(inputs) else inputs
+            events.extend(self.tick(tick_inputs))
+        return events
+
+    def transition_room(self, next_room_id, from_direction):
+        """Move player to next room"""
+        self.get_current_room().player_rect = None
+        self.current_room_id = next_room_id
+        self.maze.visit(next_room_id)
+        self.rooms_visited.add(next_room_id)
+        self.steps_taken += 1
+
+        # Set entrance cooldown to prevent spawning at this entrance
+        opposite_dir = {'north': 'south', 'south': 'north', 'east': 'west', 'west': 'east'}
+        current_room = self.maze.get_room(next_room_id)
+        current_room.last_entrance = opposite_dir[from_direction]
+        current_room.entrance_cooldown = 240  # 4 seconds (increased from 3)
+
+        # Position player at opposite entrance
+        if from_direction == 'north':
+            self.player.y = SCREEN_HEIGHT - ROOM_PADDING - self.player.height - 10
+        elif from_direction == 'south':
+            self.player.y = ROOM_PADDING + 10
+        elif from_direction == 'east':
+            self.player.x = ROOM_PADDING + 10
+        elif from_direction == 'west':
+            self.player.x = SCREEN_WIDTH - ROOM_PADDING - self.player.width - 10
+
+        # Give brief invincibility after entering
+        self.invincibility_frames = 90  # 1.5 seconds (increased from 1)
+
+        # Check if reached goal
+        if self.current_room_id == self.maze.goal_room_id:
+            self.won = True
+
+    def on_collision(self, events):
+        """Handle collision with obstacle"""
+        # Lose a life
+        self.lives -= 1
+        self.collisions += 1
+        events.append('collision')
+
+        # Give invincibility frames to recover
+        self.invincibility_frames = 150  # 2.5 seconds
+
+        if self.lives <= 0:
+            # Game over - reset everything
+            self.new_game(invincibility_frames=120)
+            events.append('game_over')
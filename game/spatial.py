@@ -0,0 +1,89 @@
+# Display-free broadphase used by the simulation core
+
+class SpatialHash:
+    """Uniform-grid index of items bucketed by the cells their rect overlaps.
+
+    Queries only visit the cells a rect covers, so they cost the same no
+    matter how many items the room holds. Results come back in insertion
+    order, so callers that used to scan a list keep returning the same item.
+    Items do not move once inserted (moving walkers are queried through
+    Crowd.first_colliding instead).
+
+    Below min_bucketed items the grid is not maintained at all and queries
+    scan every item, which is cheaper than bucketing for a handful of them.
+    """
+
+    def __init__(self, cell_size=64, min_bucketed=12):
+        self.cell_size = cell_size
+        self.min_bucketed = min_bucketed
+        self.bucketed = False
+        self.buckets = {}  # (cx, cy): {item id: entry}
+        self.entries = {}  # item id: [order, item, rect, cell range], in insertion order unless bucketed
+        self.next_order = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, item):
+        return id(item) in self.entries
+
+    def get_cell_range(self, rect):
+        size = self.cell_size
+        x = rect.x
+        y = rect.y
+        return (x // size, y // size, (x + rect.width - 1) // size, (y + rect.height - 1) // size)
+
+    def insert(self, item, rect):
+        self.next_order += 1
+        entry = [self.next_order, item, rect, None]
+        self.entries[id(item)] = entry
+        if self.bucketed:
+            self.add_to_buckets(entry)
+        elif len(self.entries) > self.min_bucketed:
+            self.rebuild_buckets()
+
+    def add_to_buckets(self, entry):
+        key = id(entry[1])
+        entry[3] = x0, y0, x1, y1 = self.get_cell_range(entry[2])
+        buckets = self.buckets
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket is None:
+                    buckets[(cx, cy)] = {key: entry}
+                else:
+                    bucket[key] = entry
+
+    def rebuild_buckets(self):
+        self.bucketed = True
+        self.buckets = {}
+        for entry in self.entries.values():
+            self.add_to_buckets(entry)
+
+    def get_candidates(self, rect):
+        """Entries in the cells rect covers, in insertion order"""
+        if not self.bucketed:
+            return self.entries.values()
+        x0, y0, x1, y1 = self.get_cell_range(rect)
+        buckets = self.buckets
+        if x0 == x1 and y0 == y1:
+            bucket = buckets.get((x0, y0))
+            return sorted(bucket.values()) if bucket else []
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return sorted(found.values())
+
+    def query(self, rect):
+        """Items whose cells overlap rect's cells (a superset of the colliding ones)"""
+        return [entry[1] for entry in self.get_candidates(rect)]
+
+    def first_colliding(self, rect):
+        """The earliest inserted item whose rect overlaps rect, or None"""
+        for entry in self.get_candidates(rect):
+            if rect.colliderect(entry[2]):
+                return entry[1]
+        return None
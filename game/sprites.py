@@ -0,0 +1,135 @@
+import pygame
+from game.constants import *
+
+# Transparent border around figure sprites so shadows and props fit
+SPRITE_MARGIN = 4
+
+class SpriteCache:
+    """Rasterizes obstacle and NPC visuals once and hands out ready-to-blit surfaces.
+
+    Sprites depend only on type, size and color. Setting enabled to False
+    makes Obstacle.draw and NPC.draw fall back to immediate-mode drawing.
+    """
+
+    def __init__(self):
+        self.enabled = USE_SPRITE_CACHE
+        self.sprites = {}  # key: Surface
+        self.atlas = None
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+        return sprite
+
+    def store(self, key, surface):
+        """Convert a freshly drawn sprite to the display format and keep it"""
+        self.misses += 1
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.sprites[key] = surface
+        return surface
+
+    def get_obstacle_sprite(self, obstacle_type, size, color):
+        key = ('obstacle', obstacle_type, size, color)
+        sprite = self.lookup(key)
+        if sprite is None:
+            from game.obstacle import Obstacle
+            surface = pygame.Surface((size + 16, size + 10), pygame.SRCALPHA)
+            center = SPRITE_MARGIN + size//2
+            Obstacle.draw_figure(surface, obstacle_type, center, center, size, color)
+            sprite = self.store(key, surface)
+        return sprite
+
+    def get_npc_sprite(self, size, color):
+        key = ('npc', size, color)
+        sprite = self.lookup(key)
+        if sprite is None:
+            from game.npc import NPC
+            surface = pygame.Surface((size + SPRITE_MARGIN * 2, size + SPRITE_MARGIN * 2), pygame.SRCALPHA)
+            center = SPRITE_MARGIN + size//2
+            NPC.draw_figure(surface, center, center, size, color)
+            sprite = self.store(key, surface)
+        return sprite
+
+    def get_glow_sprite(self, radius, color):
+        key = ('glow', radius, color)
+        sprite = self.lookup(key)
+        if sprite is None:
+            from game.npc import NPC
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            NPC.draw_glow(surface, radius, radius, radius, color)
+            sprite = self.store(key, surface)
+        return sprite
+
+    def get_question_sprite(self, color):
+        key = ('question', color)
+        sprite = self.lookup(key)
+        if sprite is None:
+            from game.npc import NPC
+            surface = pygame.Surface((28, 28), pygame.SRCALPHA)
+            NPC.draw_question_mark(surface, 14, 14, color)
+            sprite = self.store(key, surface)
+        return sprite
+
+    def prebake(self, pack_atlas=SPRITE_ATLAS):
+        """Rasterize every obstacle and NPC archetype up front"""
+        from game.obstacle import Obstacle
+        for obstacle_type, color in Obstacle.COLORS.items():
+            self.get_obstacle_sprite(obstacle_type, 30, color)
+
+        # NPC body, every pulse step of the glow and the "?" bubble
+        npc_size = 35
+        self.get_npc_sprite(npc_size, PURPLE_500)
+        for pulse in range(11):
+            self.get_glow_sprite(npc_size//2 + pulse, PURPLE_500)
+        self.get_question_sprite(PURPLE_500)
+
+        if pack_atlas:
+            self.pack_atlas()
+
+    def pack_atlas(self, width=512):
+        """Pack all sprites into one surface and swap them for subsurfaces of it"""
+        keys = sorted(self.sprites, key=lambda k: self.sprites[k].get_height(), reverse=True)
+
+        # Simple shelf packing: fill rows left to right, tallest sprites first
+        positions = {}
+        x = y = shelf_height = 0
+        for key in keys:
+            w, h = self.sprites[key].get_size()
+            if x + w > width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            positions[key] = (x, y)
+            x += w
+            shelf_height = max(shelf_height, h)
+
+        atlas = pygame.Surface((width, y + shelf_height), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        atlas.fill((0, 0, 0, 0))
+        for key, pos in positions.items():
+            sprite = self.sprites[key]
+            atlas.blit(sprite, pos, special_flags=pygame.BLEND_RGBA_MAX)
+            self.sprites[key] = atlas.subsurface(pygame.Rect(pos, sprite.get_size()))
+        self.atlas = atlas
+
+    def clear(self):
+        self.sprites.clear()
+        self.atlas = None
+
+    def get_stats(self):
+        return {
+            'sprites': len(self.sprites),
+            'hits': self.hits,
+            'misses': self.misses,
+            'atlas': self.atlas.get_size() if self.atlas else None
+        }
+
+# Shared cache used by Obstacle and NPC
+sprite_cache = SpriteCache()
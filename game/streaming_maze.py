@@ -0,0 +1,223 @@
+import random
+import time
+from collections import OrderedDict, deque
+from math import isqrt
+from game.room import Room
+from game.maze import RoomsView, PositionsView, GridView
+from game.maze_generator import generate_chunk, DIRECTIONS, DIRECTION_DX, DIRECTION_DY, OPPOSITE
+
+EAST = 1 << DIRECTIONS.index('east')
+WEST = 1 << DIRECTIONS.index('west')
+NORTH = 1 << DIRECTIONS.index('north')
+SOUTH = 1 << DIRECTIONS.index('south')
+
+def _zigzag(n):
+    return 2 * n if n >= 0 else -2 * n - 1
+
+def _unzigzag(n):
+    return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+def position_to_room_id(x, y):
+    """Unique non-negative room id for every grid cell, with (0, 0) as room 0"""
+    a = _zigzag(x)
+    b = _zigzag(y)
+    return a * a + a + b if a >= b else a + b * b
+
+def room_id_to_position(room_id):
+    s = isqrt(room_id)
+    rest = room_id - s * s
+    if rest < s:
+        return (_unzigzag(rest), _unzigzag(s))
+    return (_unzigzag(s), _unzigzag(rest - s))
+
+class StreamingMaze:
+    """Endless maze generated chunk by chunk around the player.
+
+    The grid is split into chunk_size x chunk_size blocks. Every cell is a
+    room, and each chunk is a spanning tree with the usual 20% loop chance,
+    generated from an RNG seeded by (maze seed, chunk coordinates). Each
+    border between two chunks gets one or two doors seeded by the border
+    itself, so both sides agree and the whole maze stays connected.
+
+    Chunks load the first time a room in them is needed. visit() drops
+    chunks (and their rooms) more than keep_radius chunks from the player.
+    Dropped chunks regenerate bit-identically from their seed. The goal is
+    placed goal_distance exits from the start, measured by BFS.
+
+    Exposes the same API as Maze. rooms, room_positions and grid iterate
+    over the rooms of the loaded chunks only. The goal distance field only
+    covers rooms within twice goal_distance of the goal, which includes
+    every room as close to the start as the goal is; distance_to_goal()
+    is -1 outside it.
+    """
+
+    def __init__(self, goal_distance=40, chunk_size=16, keep_radius=1, seed=None, loop_chance=0.2):
+        self.chunk_size = chunk_size
+        self.keep_radius = keep_radius
+        self.loop_chance = loop_chance
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.start_room_id = position_to_room_id(0, 0)
+
+        self.chunks = OrderedDict()  # (cx, cy): connection masks, most recently used last
+        self.live_rooms = {}  # room_id: materialized Room
+        self.focus_chunk = (0, 0)
+        self.chunks_generated = 0
+        self.chunks_evicted = 0
+
+        self.rooms = RoomsView(self)
+        self.room_positions = PositionsView(self)
+        self.grid = GridView(self)
+
+        start_time = time.perf_counter()
+        self.goal_room_id = self.find_goal(goal_distance)
+        self.goal_field = self.build_distance_field(2 * goal_distance)
+        self.visit(self.start_room_id)
+        self.generation_report = {
+            'goal_distance': goal_distance,
+            'chunk_size': chunk_size,
+            'chunks_generated': self.chunks_generated,
+            'goal_field_rooms': len(self.goal_field),
+            'total_seconds': time.perf_counter() - start_time
+        }
+
+    def get_chunk_rng(self, *key):
+        return random.Random(':'.join(str(part) for part in (self.seed,) + key))
+
+    def get_border_doors(self, axis, cx, cy):
+        """Offsets along the border between chunk (cx, cy) and its east or south neighbor"""
+        rng = self.get_chunk_rng(axis, cx, cy)
+        return rng.sample(range(self.chunk_size), 2 if rng.random() < 0.5 else 1)
+
+    def get_chunk(self, cx, cy):
+        """Connection masks of a chunk, generating it if it is not loaded"""
+        key = (cx, cy)
+        masks = self.chunks.get(key)
+        if masks is not None:
+            self.chunks.move_to_end(key)
+            return masks
+
+        size = self.chunk_size
+        masks = generate_chunk(size, self.loop_chance, self.get_chunk_rng('chunk', cx, cy))
+        for y in self.get_border_doors('east', cx, cy):
+            masks[(size - 1) * size + y] |= EAST
+        for y in self.get_border_doors('east', cx - 1, cy):
+            masks[y] |= WEST
+        for x in self.get_border_doors('south', cx, cy):
+            masks[x * size + size - 1] |= SOUTH
+        for x in self.get_border_doors('south', cx, cy - 1):
+            masks[x * size] |= NORTH
+
+        self.chunks[key] = masks
+        self.chunks_generated += 1
+        return masks
+
+    def find_goal(self, distance):
+        """A room exactly distance exits from the start, picked by seed among all such rooms"""
+        distances = {self.start_room_id: 0}
+        queue = deque([self.start_room_id])
+        while queue:
+            room_id = queue.popleft()
+            if distances[room_id] >= distance:
+                continue
+            for neighbor_id in self.get_connections(room_id).values():
+                if neighbor_id not in distances:
+                    distances[neighbor_id] = distances[room_id] + 1
+                    queue.append(neighbor_id)
+        farthest = max(distances.values())
+        ring = sorted(room_id for room_id, d in distances.items() if d == farthest)
+        return self.get_chunk_rng('goal').choice(ring)
+
+    def build_distance_field(self, radius):
+        """{room_id: distance * 4 + DIRECTIONS index toward the goal} for rooms within radius of the goal"""
+        field = {self.goal_room_id: 0}
+        queue = deque([self.goal_room_id])
+        while queue:
+            room_id = queue.popleft()
+            distance = (field[room_id] >> 2) + 1
+            if distance > radius:
+                continue
+            for direction, neighbor_id in self.get_connections(room_id).items():
+                if neighbor_id not in field:
+                    field[neighbor_id] = distance << 2 | OPPOSITE[DIRECTIONS.index(direction)]
+                    queue.append(neighbor_id)
+        return field
+
+    def distance_to_goal(self, room_id):
+        """Exits on the shortest path from room_id to the goal, or -1 outside the distance field"""
+        entry = self.goal_field.get(room_id)
+        return -1 if entry is None else entry >> 2
+
+    def next_direction(self, room_id):
+        """Exit of room_id that starts a shortest path to the goal (None at the goal or outside the field)"""
+        entry = self.goal_field.get(room_id)
+        return None if not entry else DIRECTIONS[entry & 3]
+
+    def get_chunk_key(self, x, y):
+        return (x // self.chunk_size, y // self.chunk_size)
+
+    def visit(self, room_id):
+        """Make room_id's chunk the focus and drop chunks too far from it"""
+        x, y = room_id_to_position(room_id)
+        self.focus_chunk = fx, fy = self.get_chunk_key(x, y)
+        self.get_chunk(fx, fy)
+        for key in list(self.chunks):
+            if max(abs(key[0] - fx), abs(key[1] - fy)) > self.keep_radius:
+                del self.chunks[key]
+                self.chunks_evicted += 1
+        for live_id in list(self.live_rooms):
+            key = self.get_chunk_key(*room_id_to_position(live_id))
+            if key not in self.chunks:
+                del self.live_rooms[live_id]
+
+    def get_stats(self):
+        return {
+            'chunks_loaded': len(self.chunks),
+            'chunks_generated': self.chunks_generated,
+            'chunks_evicted': self.chunks_evicted,
+            'live_rooms': len(self.live_rooms)
+        }
+
+    def has_room(self, room_id):
+        return isinstance(room_id, int) and room_id >= 0
+
+    def room_ids(self):
+        """Ids of the rooms in the loaded chunks"""
+        size = self.chunk_size
+        return [position_to_room_id(cx * size + x, cy * size + y)
+                for cx, cy in self.chunks for x in range(size) for y in range(size)]
+
+    def get_position(self, room_id):
+        return room_id_to_position(room_id)
+
+    def room_at(self, x, y):
+        return position_to_room_id(x, y)
+
+    def get_connections(self, room_id):
+        """{direction: room_id} read from the room's chunk"""
+        x, y = room_id_to_position(room_id)
+        cx, cy = self.get_chunk_key(x, y)
+        size = self.chunk_size
+        mask = self.get_chunk(cx, cy)[(x - cx * size) * size + y - cy * size]
+        return {direction: position_to_room_id(x + DIRECTION_DX[d], y + DIRECTION_DY[d])
+                for d, direction in enumerate(DIRECTIONS) if mask & (1 << d)}
+
+    def get_room_rng(self, room_id):
+        """Deterministic RNG for one room's flavor"""
+        return random.Random(self.seed * 1_000_003 + room_id)
+
+    def get_room(self, room_id):
+        room = self.live_rooms.get(room_id)
+        if room is not None:
+            return room
+        if not self.has_room(room_id):
+            return None
+
+        room = Room(room_id, room_id == self.goal_room_id, rng=self.get_room_rng(room_id))
+        room.connections.update(self.get_connections(room_id))
+        self.live_rooms[room_id] = room
+        return room
+
+    def release_room(self, room):
+        """Forget a materialized room; get_room rebuilds the same one from the maze seed"""
+        if self.live_rooms.get(room.id) is room:
+            del self.live_rooms[room.id]
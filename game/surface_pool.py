@@ -0,0 +1,116 @@
+import pygame
+
+class ScratchSurface:
+    """Context manager lending a pooled surface for the duration of a with block"""
+
+    def __init__(self, pool, size, flags, clear):
+        self.pool = pool
+        self.size = size
+        self.flags = flags
+        self.clear = clear
+        self.surface = None
+
+    def __enter__(self):
+        self.surface = self.pool.acquire(self.size, self.flags, self.clear)
+        return self.surface
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.pool.release(self.surface)
+        self.surface = None
+        return False
+
+class SurfacePool:
+    """Reusable scratch surfaces keyed by (size, flags), plus prebuilt overlays.
+
+    acquire() hands out a free surface of the right size and flags, and
+    only allocates when none is free; release() returns it for the next
+    caller. Unless clear is False, an acquired surface is filled with
+    black, or with transparency when it has per-pixel alpha, so it looks
+    exactly like a new one. Overlays of one solid color are built once and
+    only get their alpha changed afterwards.
+
+    Allocations are counted per frame (end_frame() closes a frame), so a
+    steady state that allocates no surfaces shows up as zero.
+    """
+
+    def __init__(self):
+        self.free = {}  # (size, flags): [Surface]
+        self.overlays = {}  # (size, color, alpha or None, border_radius): Surface
+
+        # Statistics
+        self.allocations = 0
+        self.reuses = 0
+        self.frame_allocations = 0
+        self.last_frame_allocations = 0
+
+    def allocate(self, size, flags):
+        self.allocations += 1
+        self.frame_allocations += 1
+        surface = pygame.Surface(size, flags)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if flags & pygame.SRCALPHA else surface.convert()
+        return surface
+
+    def acquire(self, size, flags=0, clear=True):
+        """A surface of size and flags, from the pool if one is free"""
+        size = (int(size[0]), int(size[1]))
+        surfaces = self.free.get((size, flags))
+        if surfaces:
+            surface = surfaces.pop()
+            self.reuses += 1
+            if clear:
+                surface.fill((0, 0, 0, 0) if flags & pygame.SRCALPHA else (0, 0, 0))
+            return surface
+        return self.allocate(size, flags)
+
+    def release(self, surface):
+        """Give a surface back once nothing draws to it anymore"""
+        key = (surface.get_size(), surface.get_flags() & pygame.SRCALPHA)
+        self.free.setdefault(key, []).append(surface)
+
+    def scratch(self, size, flags=0, clear=True):
+        """with pool.scratch(size) as surface: ... releases the surface afterwards"""
+        return ScratchSurface(self, size, flags, clear)
+
+    def get_overlay(self, size, color, alpha=255, border_radius=0):
+        """A rectangle of one color to blit translucently, built on first use.
+
+        Square overlays share one surface per color and get alpha applied on
+        each call; rounded ones bake alpha into their pixels.
+        """
+        size = (int(size[0]), int(size[1]))
+        color = tuple(color)
+        key = (size, color, alpha if border_radius else None, border_radius)
+        overlay = self.overlays.get(key)
+        if overlay is None:
+            if border_radius:
+                overlay = self.allocate(size, pygame.SRCALPHA)
+                overlay.fill((0, 0, 0, 0))
+                pygame.draw.rect(overlay, (*color, alpha), overlay.get_rect(), border_radius=border_radius)
+            else:
+                overlay = self.allocate(size, 0)
+                overlay.fill(color)
+            self.overlays[key] = overlay
+        if not border_radius:
+            overlay.set_alpha(alpha)
+        return overlay
+
+    def end_frame(self):
+        self.last_frame_allocations = self.frame_allocations
+        self.frame_allocations = 0
+
+    def clear(self):
+        self.free.clear()
+        self.overlays.clear()
+
+    def get_stats(self):
+        return {
+            'pooled': sum(len(surfaces) for surfaces in self.free.values()),
+            'overlays': len(self.overlays),
+            'allocations': self.allocations,
+            'reuses': self.reuses,
+            'last_frame_allocations': self.last_frame_allocations
+        }
+
+# Shared pool used by every per-frame drawing path
+surface_pool = SurfacePool()
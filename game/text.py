@@ -0,0 +1,62 @@
+import pygame
+from collections import OrderedDict
+
+class TextCache:
+    """Loads each font size once and keeps an LRU cache of rendered text surfaces"""
+
+    def __init__(self, max_surfaces=512):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}  # size: pygame.font.Font
+        self.surfaces = OrderedDict()  # (text, size, color, antialias): Surface
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_font(self, size):
+        """Return the default font at the given size, loading it on first use"""
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color, antialias=True):
+        """Return a rendered text surface, reusing a cached one when possible"""
+        key = (text, size, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.get_font(size).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        """Drop all rendered surfaces (fonts are kept)"""
+        self.surfaces.clear()
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            'fonts': len(self.fonts),
+            'surfaces': len(self.surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+# Shared cache used by every draw path
+text_cache = TextCache()
+
+def render_text(text, size, color, antialias=True):
+    """Render text through the shared cache"""
+    return text_cache.render(text, size, color, antialias)
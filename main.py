@@ -1,10 +1,18 @@
+import argparse
 import pygame
 import sys
 from game.game import Game
 
 def main():
+    parser = argparse.ArgumentParser(description="Re:Invent Maze")
+    parser.add_argument('--seed', type=int, help="seed for the maze and everything random in the game")
+    parser.add_argument('--snapshot', help="play a maze saved with python -m game.maze_snapshot")
+    parser.add_argument('--record', metavar='PATH', help="record this session's inputs to PATH on exit")
+    parser.add_argument('--replay', metavar='PATH', help="replay a recorded session in real time")
+    args = parser.parse_args()
+    
     pygame.init()
-    game = Game()
+    game = Game(**{name: value for name, value in vars(args).items() if value is not None})
     game.run()
     pygame.quit()
     sys.exit()